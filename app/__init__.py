@@ -15,12 +15,28 @@ def create_app(config_class=Config):
 
     db.init_app(app)
     migrate.init_app(app, db)
+
+    from app.services import metrics
+    metrics.configure(app)
     from app.routes.main import main_bp
+    from app.routes.api import api_bp
     
     app.register_blueprint(main_bp)
+    app.register_blueprint(api_bp, url_prefix='/api')
+
+    from app.cli import register_commands
+    register_commands(app)
+
+    if app.config.get('REFRESH_INTERVAL_MINUTES'):
+        from app.services.refresh import start_scheduler
+        start_scheduler(app)
 
     @app.context_processor
     def inject_now():
         return {'now': datetime.utcnow()}
 
+    # Cards are assembled from cached fragments (app/services/fragments.py)
+    from app.services.fragments import card_fragment
+    app.jinja_env.globals['card_fragment'] = card_fragment
+
     return app
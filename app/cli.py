@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import click
+
+
+def register_commands(app):
+    @app.cli.command('refresh-games')
+    @click.option('--max-age-hours', type=float, default=None,
+                  help='Refresh games older than this (default: REFRESH_MAX_AGE_HOURS).')
+    @click.option('--limit', type=int, default=None,
+                  help='Maximum number of games to refresh (default: REFRESH_LIMIT).')
+    def refresh_games(max_age_hours, limit):
+        """Re-fetch the stalest games from BGG."""
+        from app.services.refresh import refresh_stale_games
+
+        max_age = timedelta(hours=max_age_hours) if max_age_hours is not None else None
+        count = refresh_stale_games(max_age=max_age, limit=limit)
+        click.echo(f"Refreshed {count} games.")
+
+    @app.cli.command('profile-deck')
+    @click.argument('username')
+    @click.option('--ids', default=None, help='Comma-separated game IDs (default: the whole collection).')
+    @click.option('--limit', type=int, default=None, help='Profile only the first N games.')
+    @click.option('--per-card/--no-per-card', default=True,
+                  help='Also render each card on its own to measure its PDF size.')
+    @click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON.')
+    def profile_deck(username, ids, limit, per_card, as_json):
+        """Render a deck under tracemalloc and report memory, timings and per-card costs."""
+        import json
+        from app.services import deck
+        from app.services.profiler import format_report, profile_deck as run_profile
+
+        try:
+            game_ids = deck.resolve_ids(username, ids.split(',') if ids else None)
+        except deck.DeckError as e:
+            raise click.ClickException(str(e))
+        if limit:
+            game_ids = game_ids[:limit]
+        games = deck.load_games(game_ids)
+        options = {'include_players': True, 'include_time': True, 'include_weight': True}
+        report = run_profile(games, options, per_card=per_card)
+        click.echo(json.dumps(report, indent=2) if as_json else format_report(report))
+
+    @app.cli.command('export-decks')
+    @click.argument('usernames', nargs=-1)
+    @click.option('--file', 'user_file', type=click.Path(exists=True, dir_okay=False),
+                  help='File of usernames, one per line.')
+    @click.option('--output', '-o', default='decks', show_default=True, help='Directory to write the PDFs to.')
+    @click.option('--combined', default=None, help='Write one PDF of every user\'s games under this file name.')
+    @click.option('--fetch-workers', type=int, default=None,
+                  help='Concurrent collection/detail fetches (default: BATCH_FETCH_WORKERS).')
+    @click.option('--render-workers', type=int, default=None,
+                  help='Decks rendered at once (default: BATCH_RENDER_WORKERS).')
+    @click.option('--report', 'report_path', default=None, help='Also write the summary report as JSON here.')
+    def export_decks(usernames, user_file, output, combined, fetch_workers, render_workers, report_path):
+        """Export deck PDFs for many BGG users, fetching each game once."""
+        import json
+        from app.services.batch import export_decks as run_export, format_report, read_usernames
+
+        names = read_usernames(usernames, user_file)
+        if not names:
+            raise click.UsageError('Give usernames as arguments or with --file.')
+        options = {'include_players': True, 'include_time': True, 'include_weight': True}
+        report = run_export(names, output, options, combined=combined,
+                            fetch_workers=fetch_workers, render_workers=render_workers)
+        if report_path:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        click.echo(format_report(report))
@@ -1,6 +1,26 @@
 from . import db
 from datetime import datetime
 
+game_designers = db.Table(
+    'game_designers',
+    db.Column('game_id', db.Integer, db.ForeignKey('games.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('person_id', db.Integer, db.ForeignKey('people.id', ondelete='CASCADE'), primary_key=True, index=True),
+    db.Column('position', db.Integer, nullable=False, default=0),
+)
+
+game_artists = db.Table(
+    'game_artists',
+    db.Column('game_id', db.Integer, db.ForeignKey('games.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('person_id', db.Integer, db.ForeignKey('people.id', ondelete='CASCADE'), primary_key=True, index=True),
+    db.Column('position', db.Integer, nullable=False, default=0),
+)
+
+class Person(db.Model):
+    """A designer or artist credited on BGG."""
+    __tablename__ = 'people'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, unique=True, nullable=False)
+
 class Game(db.Model):
     __tablename__ = 'games'
     id = db.Column(db.Integer, primary_key=True)
@@ -9,11 +29,97 @@ class Game(db.Model):
     image = db.Column(db.String)
     thumbnail = db.Column(db.String)
     description = db.Column(db.Text)
-    year_published = db.Column(db.String)
-    min_players = db.Column(db.String)
-    max_players = db.Column(db.String)
-    playing_time = db.Column(db.String)
+    year_published = db.Column(db.Integer, index=True)
+    min_players = db.Column(db.Integer, index=True)
+    max_players = db.Column(db.Integer, index=True)
+    playing_time = db.Column(db.Integer, index=True)
+    average_weight = db.Column(db.Float, index=True)
+    last_updated = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    # Credits are written in bulk by app.services.bgg.upsert_games
+    designers = db.relationship('Person', secondary=game_designers, order_by=game_designers.c.position,
+                                lazy='selectin', viewonly=True)
+    artists = db.relationship('Person', secondary=game_artists, order_by=game_artists.c.position,
+                              lazy='selectin', viewonly=True)
+
+# Case-insensitive name sort
+db.Index('ix_games_name_lower', db.func.lower(Game.name))
+
+class CollectionEntry(db.Model):
+    """A game owned by a BGG user, with the collection's own sort fields."""
+    __tablename__ = 'collection_entries'
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String, nullable=False)  # lowercased
+    bgg_id = db.Column(db.Integer, nullable=False, index=True)
+    name = db.Column(db.String)
+    year_published = db.Column(db.Integer)
+    min_players = db.Column(db.Integer)
+    playing_time = db.Column(db.Integer)
     average_weight = db.Column(db.Float)
-    designers = db.Column(db.String) # Stored as JSON string or comma-separated
-    artists = db.Column(db.String)   # Stored as JSON string or comma-separated
-    last_updated = db.Column(db.DateTime, default=datetime.utcnow)
+    added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('username', 'bgg_id', name='_collection_username_game_unique'),
+        db.Index('ix_collection_entries_username_name', 'username', 'name'),
+    )
+
+class CollectionSync(db.Model):
+    """Per-user sync state for CollectionEntry rows."""
+    __tablename__ = 'collection_syncs'
+    username = db.Column(db.String, primary_key=True)  # lowercased
+    synced_at = db.Column(db.DateTime)  # last full or incremental sync
+    full_synced_at = db.Column(db.DateTime)  # last full diff (only these detect removals)
+    total = db.Column(db.Integer, default=0)
+
+class CacheEntry(db.Model):
+    __tablename__ = 'cache_entries'
+    id = db.Column(db.Integer, primary_key=True)
+    namespace = db.Column(db.String, nullable=False)
+    key = db.Column(db.String, nullable=False)
+    value = db.Column(db.Text)  # JSON payload
+    etag = db.Column(db.String)
+    last_modified = db.Column(db.String)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    last_accessed = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('namespace', 'key', name='_cache_namespace_key_unique'),
+        db.Index('ix_cache_entries_last_accessed', 'namespace', 'last_accessed'),
+    )
+
+    @property
+    def is_fresh(self):
+        return self.expires_at is not None and self.expires_at > datetime.utcnow()
+
+class FetchLease(db.Model):
+    """Marks an upstream fetch in flight so other processes wait for its result."""
+    __tablename__ = 'fetch_leases'
+    key = db.Column(db.String, primary_key=True)
+    owner = db.Column(db.String(32), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    waiters = db.Column(db.Integer, nullable=False, default=0)
+
+class PdfJob(db.Model):
+    __tablename__ = 'pdf_jobs'
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    username = db.Column(db.String, nullable=False)
+    params = db.Column(db.Text)  # JSON: ids, download_all, options
+    status = db.Column(db.String, nullable=False, default='queued')  # queued, running, done, failed
+    stage = db.Column(db.String)
+    progress = db.Column(db.Integer, default=0)  # percent
+    result_key = db.Column(db.String(64), index=True)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'error': self.error,
+        }
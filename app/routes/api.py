@@ -1,7 +1,87 @@
-from flask import Blueprint
+import json
+from flask import Blueprint, Response, request, url_for, send_file
+from app.services import jobs, metrics
+from app.services.fragments import get_cache
+from app.services.deck import options_from_form
+from app.services.workers import get_executor
 
 api_bp = Blueprint('api', __name__)
 
 @api_bp.route('/ping')
 def ping():
     return {'status': 'ok'}
+
+# Queue depth and per-host load of the shared outbound pool
+@api_bp.route('/executor')
+def executor_stats():
+    return get_executor().stats()
+
+# Prometheus scrape target: spans, cache counters and pool gauges
+@api_bp.route('/metrics')
+def prometheus_metrics():
+    executor = get_executor().stats()
+    fragments = get_cache().stats()
+    gauges = {
+        'outbound_workers': executor['workers'],
+        'outbound_queued': executor['queued'],
+        'outbound_active': executor['active'],
+        'outbound_host_in_use': {(('host', host),): n for host, n in executor['hosts'].items()},
+        'card_fragment_entries': fragments['entries'],
+    }
+    return Response(metrics.render_prometheus(gauges), mimetype='text/plain; version=0.0.4')
+
+@api_bp.route('/pdf/jobs', methods=['POST'])
+def submit_pdf_job():
+    username = request.form.get('username')
+    if not username:
+        return {'error': 'Username required'}, 400
+
+    download_all = request.form.get('download_all') == 'true'
+    ids = []
+    if not download_all and request.form.get('selected_ids'):
+        try:
+            ids = json.loads(request.form.get('selected_ids'))
+        except ValueError:
+            pass
+
+    job = jobs.submit(username, ids, download_all, options_from_form(request.form))
+    return _job_payload(job), 202
+
+@api_bp.route('/pdf/jobs/<job_id>')
+def pdf_job_status(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return {'error': 'Job not found'}, 404
+    return _job_payload(job)
+
+@api_bp.route('/pdf/jobs/<job_id>/progress')
+def pdf_job_progress(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return {'error': 'Job not found'}, 404
+    return {'status': job.status, 'stage': job.stage, 'progress': job.progress}
+
+@api_bp.route('/pdf/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_pdf_job(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return {'error': 'Job not found'}, 404
+    return _job_payload(jobs.cancel(job))
+
+@api_bp.route('/pdf/jobs/<job_id>/download')
+def pdf_job_download(job_id):
+    job = jobs.get_job(job_id)
+    path = jobs.result_path(job)
+    if path is None:
+        return {'error': 'PDF not ready'}, 404
+    return send_file(path, mimetype='application/pdf', as_attachment=True,
+                     download_name=f'bgg_deck_{job.username}.pdf', conditional=True, etag=job.result_key)
+
+def _job_payload(job):
+    payload = job.to_dict()
+    payload['status_url'] = url_for('api.pdf_job_status', job_id=job.id)
+    payload['progress_url'] = url_for('api.pdf_job_progress', job_id=job.id)
+    payload['cancel_url'] = url_for('api.cancel_pdf_job', job_id=job.id)
+    if job.status == 'done':
+        payload['download_url'] = url_for('api.pdf_job_download', job_id=job.id)
+    return payload
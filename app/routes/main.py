@@ -1,9 +1,18 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
-from app.services.bgg import fetch_collection, fetch_things, scrape_description
+import re
+from flask import Blueprint, current_app, render_template, request, flash, redirect, url_for, send_file
+from app.services.bgg import fetch_things, process_games_data
+from app.services.catalog import (filters_from_args, has_games, missing_count, paginate_games, sorted_ids,
+                                  stored_records)
+from app.services.collection import CollectionQueued, entry_ids, paginate_entries, sync_collection
+from app.services import metrics, prefetch
+from app.services.deck import content_key, options_from_form, page_keys, save_deck_pdf, stored_pdf_path
+from app.services.records import GameRecord
 from datetime import datetime
 
 main_bp = Blueprint('main', __name__)
 
+PDF_KEY = re.compile(r'[0-9a-f]{64}')
+
 @main_bp.context_processor
 def inject_now():
     return {'now': datetime.utcnow()}
@@ -22,87 +31,70 @@ def collection():
     if not username:
         return redirect(url_for('main.index'))
 
-    # 1. Fetch Collection
-    data = fetch_collection(username)
-    
-    if data and data.get('status') == 202:
+    # 1. Sync the user's collection into local rows
+    try:
+        state = sync_collection(username)
+    except CollectionQueued:
         return render_template('processing.html', username=username)
 
-    if not data or 'items' not in data or 'item' not in data['items']:
+    if state is None or not state.total:
         flash(f"No games found for user '{username}' or user does not exist.", "error")
         return redirect(url_for('main.index'))
-        
-    # 2. Extract IDs
-    items = data['items']['item']
-    if isinstance(items, dict):
-        items = [items]
-        
-    # Pagination Logic
+
     # Sorting Logic (Before Pagination)
     sort_by = request.args.get('sort', 'name') # Default to name
     order = request.args.get('order', 'asc')
-    
-    def get_sort_key(item, key):
-        # Helper to safely extract values from BGG XML dict structure
-        try:
-            if key == 'name':
-                val = item.get('name', {}).get('#text', '')
-                return val.lower() if val else ''
-            elif key == 'year':
-                val = item.get('yearpublished', {}).get('#text', 0)
-                return int(val) if val else 0
-            elif key == 'players':
-                # stats -> @minplayers
-                val = item.get('stats', {}).get('@minplayers', 0)
-                return int(val) if val else 0
-            elif key == 'time':
-                # stats -> @playingtime
-                val = item.get('stats', {}).get('@playingtime', 0)
-                return int(val) if val else 0
-            elif key == 'weight':
-                # stats -> rating -> averageweight -> @value
-                rating = item.get('stats', {}).get('rating', {})
-                val = rating.get('averageweight', {}).get('@value', 0)
-                return float(val) if val else 0
-            return 0
-        except:
-            return 0
-
-    reverse = (order == 'desc')
-    items.sort(key=lambda x: get_sort_key(x, sort_by), reverse=reverse)
+    filters = filters_from_args(request.args)
 
     page = request.args.get('page', 1, type=int)
     per_page = 24 # 4x6 grid
-    total_items = len(items)
-    total_pages = (total_items + per_page - 1) // per_page
-    
-    start = (page - 1) * per_page
-    end = start + per_page
-    
-    current_items = items[start:end]
-    ids = [g['@objectid'] for g in current_items]
-    
+
+    # Every game already cached: sort, filter and paginate with indexed SQL joined on the collection
+    if has_games(username):
+        pagination = paginate_games(page=page, per_page=per_page, username=username,
+                                    sort=sort_by, order=order, **filters)
+        all_ids = sorted_ids(username=username, sort=sort_by, order=order, **filters)
+        return render_template('collection.html',
+                               games=[GameRecord.from_model(g).to_context() for g in pagination.items],
+                               username=username,
+                               page=page,
+                               total_pages=pagination.pages,
+                               total_items=pagination.total,
+                               all_ids=all_ids,
+                               current_sort=sort_by,
+                               current_order=order,
+                               filters=filters)
+
+    # Otherwise page through the collection's own sort fields
+    pagination = paginate_entries(username, page=page, per_page=per_page, sort=sort_by, order=order)
+    ids = [str(e.bgg_id) for e in pagination.items]
+
     # Global ID list for "Select All"
-    all_ids = [g['@objectid'] for g in items]
-    
-    # 3. Fetch Details
-    details = fetch_things(ids)
+    all_ids = entry_ids(username, sort=sort_by, order=order)
     
-    # 4. Process for Template
-    processed_games = []
-    if details and 'items' in details and 'item' in details['items']:
-        from app.services.bgg import process_games_data
-        processed_games = process_games_data(details['items']['item'])
-        
+    # 2. Details: games already stored (e.g. prefetched neighbours) are read from the DB, the rest fetched
+    stored = stored_records(ids)
+    missing = [i for i in ids if i not in stored]
+    fetched = {str(game.bgg_id): game for game in process_games_data(fetch_things(missing))} if missing else {}
+    processed_games = [stored.get(i) or fetched[i] for i in ids if i in stored or i in fetched]
+
+    # 3. Warm neighbouring pages (and the rest of the collection) in the background
+    prefetch.schedule(username, page, per_page, sort=sort_by, order=order)
+
+    # Filters need every game's stats; keep them in the form and say how many games are still loading
+    filters_pending = missing_count(username) if any(v is not None for v in filters.values()) else 0
+
     return render_template('collection.html', 
-                           games=processed_games, 
+                           games=[game.to_context() for game in processed_games], 
                            username=username,
                            page=page,
-                           total_pages=total_pages,
-                           total_items=total_items,
+                           total_pages=pagination.pages,
+                           total_items=pagination.total,
                            all_ids=all_ids,
                            current_sort=sort_by,
-                           current_order=order)
+                           current_order=order,
+                           filters=filters,
+                           filters_pending=filters_pending)
 
 @main_bp.route('/pdf', methods=['POST'])
 @main_bp.route('/pdf', methods=['POST'])
@@ -123,64 +115,45 @@ def download_pdf():
             pass
             
     if download_all or not ids:
-        # Fetch full collection if download_all is requested or as fallback
-        data = fetch_collection(username)
-        if not data or 'items' not in data or 'item' not in data['items']:
+        # Every owned game (download_all or fallback), from the synced collection rows
+        try:
+            state = sync_collection(username)
+        except CollectionQueued:
+            return "BGG is still processing this collection. Please try again.", 202
+        if state is None or not state.total:
             return "No games found", 404
-        items = data['items']['item']
-        if isinstance(items, dict):
-            items = [items]
-            
-        # If specific IDs were requested (and valid), use them. 
-        # Otherwise (download_all or fallback), use all IDs.
-        if not ids: 
-             ids = [g['@objectid'] for g in items]
+        ids = entry_ids(username)
 
     # Fetch details for selected IDs
-    details = fetch_things(ids)
-    
-    processed_games = []
-    if details and 'items' in details and 'item' in details['items']:
-        from app.services.bgg import process_games_data
-        processed_games = process_games_data(details['items']['item'])
-
-    # Render template to string
-    import os
-    from flask import current_app
-    
-    # We don't strictly need to pass inline CSS if we use WeasyPrint's stylesheets arg,
-    # but the layout expects it. Let's try to read the tailwind output.
-    css_path = os.path.join(current_app.static_folder, 'dist', 'output.css')
-    css_content = ""
-    if os.path.exists(css_path):
-        with open(css_path, 'r') as f:
-            css_content = f.read()
-    else:
-        # Fallback to style.css
-        legacy_css_path = os.path.join(current_app.static_folder, 'style.css')
-        if os.path.exists(legacy_css_path):
-            with open(legacy_css_path, 'r') as f:
-                css_content = f.read()
+    processed_games = process_games_data(fetch_things(ids))
 
     # Card Content Options
-    options = {
-        'include_players': request.form.get('include_players') == 'on',
-        'include_time': request.form.get('include_time') == 'on',
-        'include_weight': request.form.get('include_weight') == 'on',
-    }
-
-    html_content = render_template('layouts/pdf.html', 
-                                   games=processed_games, 
-                                   css_content=css_content,
-                                   options=options)
-    
-    from app.services.pdf import generate_pdf
-    from flask import make_response
-    
-    pdf_bytes = generate_pdf(html_content)
-    
-    response = make_response(pdf_bytes)
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = f'attachment; filename=bgg_deck_{username}.pdf'
-    
-    return response
+    options = options_from_form(request.form)
+
+    # Profiling mode (?profile=1|cards): report memory, timings and per-card costs instead of the PDF
+    profile = request.values.get('profile')
+    if profile and current_app.config.get('PDF_PROFILING_ENABLED'):
+        from app.services.profiler import profile_deck
+        return profile_deck(processed_games, options, per_card=profile == 'cards')
+
+    # Content-addressed: an unchanged deck is served from the store without rendering
+    keys = page_keys(processed_games, options)
+    key = content_key(processed_games, options, keys)
+    stored = stored_pdf_path(key) is not None
+    metrics.cache_result('pdf_deck', stored)
+    if not stored:
+        save_deck_pdf(key, processed_games, options, keys)
+    return redirect(url_for('main.pdf_file', key=key, name=username), code=303)
+
+@main_bp.route('/pdf/<key>')
+def pdf_file(key):
+    """
+    Streams a stored deck from disk with Content-Length, Range support and
+    ETag (its content key), so repeat downloads get 304 and broken ones resume.
+    """
+    path = stored_pdf_path(key) if PDF_KEY.fullmatch(key) else None
+    if path is None:
+        return "PDF not found", 404
+    name = request.args.get('name') or 'deck'
+    return send_file(path, mimetype='application/pdf', as_attachment=True,
+                     download_name=f'bgg_deck_{name}.pdf', conditional=True, etag=key)
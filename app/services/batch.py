@@ -0,0 +1,193 @@
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from app import db
+from app.services import deck
+
+
+def read_usernames(names=(), path=None):
+    """
+    Usernames from names plus a file with one per line ('#' starts a
+    comment), in order, without case-insensitive repeats.
+    """
+    names = list(names)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            names += [line.split('#', 1)[0] for line in f]
+    seen = set()
+    usernames = []
+    for name in names:
+        name = name.strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            usernames.append(name)
+    return usernames
+
+
+def filename_for(username):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', username) + '.pdf'
+
+
+def filenames_for(usernames):
+    """
+    {username: PDF file name}. Names that collide once unsafe characters are
+    replaced (e.g. "a b" and "a_b"), or only differ in case, get -2, -3...
+    """
+    taken = set()
+    names = {}
+    for username in usernames:
+        stem = filename_for(username)[:-len('.pdf')]
+        filename, n = f"{stem}.pdf", 1
+        while filename.lower() in taken:
+            n += 1
+            filename = f"{stem}-{n}.pdf"
+        taken.add(filename.lower())
+        names[username] = filename
+    return names
+
+
+def _in_app(app, fn, *args):
+    # Pool threads get their own app context, and so their own DB session
+    with app.app_context():
+        try:
+            return fn(*args)
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def _run_all(app, workers, fn, items):
+    """fn(item) for each item on a pool of workers threads: [(item, result, error)] in order."""
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+        futures = [pool.submit(_in_app, app, fn, item) for item in items]
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append((item, future.result(), None))
+            except Exception as e:
+                results.append((item, None, e))
+        return results
+
+
+def _write(games, options, target):
+    """Copies the deck's stored PDF (rendering it first if needed) to target. Returns (bytes, cached)."""
+    keys = deck.page_keys(games, options)
+    key = deck.content_key(games, options, keys)
+    path = deck.stored_pdf_path(key)
+    cached = path is not None
+    if not cached:
+        path = deck.save_deck_pdf(key, games, options, keys)
+    shutil.copyfile(path, target)
+    return os.path.getsize(target), cached
+
+
+def export_decks(usernames, output_dir, options, combined=None, fetch_workers=None,
+                 render_workers=None, batch_size=None):
+    """
+    Writes a deck PDF per user into output_dir, or with combined (a file
+    name) one PDF of every user's games. Collections are resolved and game
+    details fetched on a pool of fetch_workers threads, the union of all
+    users' game IDs once in batches of batch_size; decks are rendered on
+    a pool of render_workers threads through the deck store, so a deck
+    rendered before is only copied. Returns a report dict (see format_report).
+    """
+    app = current_app._get_current_object()
+    config = app.config
+    fetch_workers = fetch_workers or config.get('BATCH_FETCH_WORKERS', 4)
+    render_workers = render_workers or config.get('BATCH_RENDER_WORKERS', 2)
+    batch_size = batch_size or config.get('BATCH_FETCH_SIZE', 100)
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    users = {name: {'username': name, 'games': 0, 'missing': 0, 'path': None,
+                    'bytes': 0, 'cached': False, 'error': None} for name in usernames}
+
+    # 1. Every user's owned game IDs
+    collections = {}
+    for name, ids, error in _run_all(app, fetch_workers, lambda name: deck.resolve_ids(name, download_all=True),
+                                     usernames):
+        if error is not None:
+            users[name]['error'] = str(error)
+        else:
+            collections[name] = [str(gid) for gid in ids]
+
+    # 2. Details for the union of IDs, each game fetched once
+    unique = list(dict.fromkeys(gid for ids in collections.values() for gid in ids))
+    batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+    records = {}
+    for batch, games, error in _run_all(app, fetch_workers, deck.load_games, batches):
+        if error is not None:
+            print(f"Error fetching games {batch[0]}..{batch[-1]}: {error}")
+            continue
+        records.update((str(game.bgg_id), game) for game in games)
+    fetched = time.perf_counter()
+
+    # 3. Render and write
+    decks = {}
+    for name, ids in collections.items():
+        games = [records[gid] for gid in ids if gid in records]
+        users[name].update(games=len(games), missing=len(ids) - len(games))
+        decks[name] = games
+    if combined:
+        all_games = list({str(game.bgg_id): game for games in decks.values() for game in games}.values())
+        jobs = [(None, combined, all_games)] if all_games else []
+    else:
+        filenames = filenames_for(usernames)
+        jobs = [(name, filenames[name], games) for name, games in decks.items() if games]
+
+    def render(job):
+        _, filename, games = job
+        return _write(games, options, os.path.join(output_dir, filename))
+
+    combined_file = None
+    for (name, filename, games), result, error in _run_all(app, render_workers, render, jobs):
+        entry = {'path': None, 'games': len(games), 'bytes': 0, 'cached': False, 'error': None}
+        if error is not None:
+            print(f"Error rendering {filename}: {error}")
+            entry['error'] = str(error)
+        else:
+            entry.update(path=os.path.join(output_dir, filename), bytes=result[0], cached=result[1])
+        if name is None:
+            combined_file = entry
+        else:
+            users[name].update(path=entry['path'], bytes=entry['bytes'], cached=entry['cached'],
+                               error=entry['error'])
+
+    finished = time.perf_counter()
+    return {
+        'users': list(users.values()),
+        'combined': combined_file,
+        'unique_games': len(unique),
+        'total_games': sum(len(ids) for ids in collections.values()),
+        'fetch_seconds': fetched - started,
+        'render_seconds': finished - fetched,
+    }
+
+
+def format_report(report):
+    """Plain-text summary of an export_decks report."""
+    lines = [
+        f"Users: {len(report['users'])}  Games: {report['total_games']} "
+        f"({report['unique_games']} unique)  Fetch: {report['fetch_seconds']:.1f}s  "
+        f"Render: {report['render_seconds']:.1f}s",
+        "",
+        f"{'username':<24} {'games':>6} {'missing':>7} {'KB':>8}  result",
+    ]
+    for user in report['users']:
+        if user['error']:
+            result = f"error: {user['error']}"
+        elif user['path']:
+            result = user['path'] + (' (stored)' if user['cached'] else '')
+        else:
+            result = '-'
+        lines.append(f"{user['username']:<24} {user['games']:>6} {user['missing']:>7} "
+                     f"{user['bytes'] / 1024:>8.0f}  {result}")
+    combined = report['combined']
+    if combined:
+        result = f"error: {combined['error']}" if combined['error'] else combined['path']
+        lines += ["", f"Combined: {combined['games']} games  {combined['bytes'] / 1024:.0f} KB  {result}"
+                  + (' (stored)' if combined['cached'] else '')]
+    return '\n'.join(lines)
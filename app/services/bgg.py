@@ -1,235 +1,472 @@
-import requests
-import xmltodict
-from bs4 import BeautifulSoup
-from functools import lru_cache
+import codecs
+from html.parser import HTMLParser
+from io import BytesIO
 
 import os
 from dotenv import load_dotenv
+from flask import current_app, has_app_context
+from app.services import cache, leases, metrics
+from app.services.bgg_client import SingleFlight, get_client
+from app.services.bgg_xml import CollectionItem, iter_collection, iter_things
 
 load_dotenv()
 
-BGG_API_BASE = "https://boardgamegeek.com/xmlapi2"
+BGG_SITE_BASE = "https://boardgamegeek.com"
+BGG_API_BASE = f"{BGG_SITE_BASE}/xmlapi2"
 # CRITICAL: BGG blocks requests without a custom User-Agent
 HEADERS = {
     "User-Agent": "LaMatatena/1.0 (contact@example.com)",
     "Authorization": f"Bearer {os.environ.get('BGG_API_KEY')}"
 }
 
-def fetch_collection(username):
-    """Fetches owned games for a user."""
-    url = f"{BGG_API_BASE}/collection"
+# Cached values are lists of CollectionItem fields
+COLLECTION_CACHE_NAMESPACE = "collection.items"
+# GameRecord fields handed from a lease holder to other processes waiting on it
+THING_CACHE_NAMESPACE = "thing"
+
+
+class BGGQueued(Exception):
+    """BGG accepted the request but is still building the response (HTTP 202)."""
+
+
+def _cache_settings():
+    if not has_app_context():
+        return 3600, 500
+    return (current_app.config.get('COLLECTION_CACHE_TTL', 3600),
+            current_app.config.get('COLLECTION_CACHE_MAX_ENTRIES', 500))
+
+def _lease_settings():
+    config = current_app.config if has_app_context() else {}
+    return (config.get('FETCH_LEASES_ENABLED', True),
+            config.get('FETCH_LEASE_TTL', 60),
+            config.get('FETCH_LEASE_WAIT', 30))
+
+_inflight = SingleFlight()
+
+def coalesce(keys, fetch, shared, publish=None):
+    """
+    Single-flight for upstream fetches keyed per username / game ID.
+    fetch(keys) -> {key: value} runs at most once at a time per key: keys
+    another thread is already fetching are awaited in-process. Keys leased
+    here are fetched (and their leases released) first; keys whose
+    fetch_leases row is held by another process are then awaited until it
+    is released, and read back with shared(keys) -> {key: value}. Anything
+    still missing is fetched here. When other processes wait on keys this
+    call fetched, publish({key: value}) makes those results readable to
+    their shared(). Returns {key: value}; absent results are None.
+    """
+    owned, waiting = _inflight.claim(keys)
+    results = {}
+    try:
+        if owned:
+            enabled, ttl, wait = _lease_settings()
+            owner, leased = leases.acquire(owned, ttl) if enabled else (None, owned)
+            # Our own leases first, so nobody waiting on them also waits on the keys we wait for
+            try:
+                if leased:
+                    results.update(fetch(leased))
+                if owner is not None and publish is not None:
+                    watched = leases.watched(owner)
+                    if watched:
+                        publish({key: results.get(key) for key in watched})
+            finally:
+                if owner is not None:
+                    leases.release(owner)
+            for key in leased:
+                _inflight.resolve(key, results.get(key))
+
+            held = set(leased)
+            foreign = [key for key in owned if key not in held]
+            if foreign:
+                leases.wait(foreign, wait)
+                results.update(shared(foreign))
+                todo = [key for key in foreign if key not in results]
+                if todo:
+                    results.update(fetch(todo))
+                for key in foreign:
+                    _inflight.resolve(key, results.get(key))
+    except BaseException as e:
+        for key in owned:
+            _inflight.fail(key, e)
+        raise
+    for key, future in waiting.items():
+        results[key] = future.result()
+    return results
+
+def _collection_request(username, modified_since):
     params = {
         "username": username,
         "own": 1,
         "stats": 1,
         "excludesubtype": "boardgameexpansion"
     }
-    # print(f"DEBUG: Fetching collection for {username} from {url}")
+    if modified_since is not None:
+        params["modifiedsince"] = modified_since.strftime("%y-%m-%d %H:%M:%S")
+    # BGG usernames are case-insensitive; make_key lowercases the username part
+    key = cache.make_key(username, **{k: v for k, v in params.items() if k != "username"})
+    return params, key
+
+def fetch_collection(username, modified_since=None):
+    """
+    Fetches owned games for a user as a list of CollectionItem records, or
+    None if BGG has no such collection. The response is streamed through
+    iter_collection, so the XML is never held as a tree.
+    Parsed records are cached per (username, params); stale entries are
+    revalidated with If-None-Match / If-Modified-Since before refetching.
+    With modified_since (a datetime) only games changed since then are
+    requested; these small deltas bypass the cache.
+    Concurrent fetches of one user's collection, in any thread or worker
+    process, share a single upstream request (see coalesce).
+    Raises BGGQueued if BGG is still building the collection and there is
+    no cached copy to fall back on.
+    """
+    _, key = _collection_request(username, modified_since)
+    if modified_since is None:
+        entry = cache.lookup(COLLECTION_CACHE_NAMESPACE, key)
+        fresh = entry is not None and entry.is_fresh
+        metrics.cache_result(COLLECTION_CACHE_NAMESPACE, fresh)
+        if fresh:
+            return _load_items(entry)
+
+    flight = f"collection:{username.strip().lower()}"
+    if modified_since is not None:
+        flight += f"@{modified_since.isoformat()}"
+
+    def shared(keys):
+        # The lease holder stored the full collection in the cache
+        entry = cache.lookup(COLLECTION_CACHE_NAMESPACE, key) if modified_since is None else None
+        return {flight: _load_items(entry)} if entry is not None and entry.is_fresh else {}
+
+    with metrics.span('bgg.collection'):
+        return coalesce([flight], lambda keys: {flight: _fetch_collection(username, modified_since)},
+                        shared)[flight]
+
+def _fetch_collection(username, modified_since):
+    url = f"{BGG_API_BASE}/collection"
+    params, key = _collection_request(username, modified_since)
+    ttl, max_entries = _cache_settings()
+    entry = cache.lookup(COLLECTION_CACHE_NAMESPACE, key) if modified_since is None else None
+    if entry is not None and entry.is_fresh:
+        return _load_items(entry)
+
+    headers = dict(HEADERS)
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
     try:
-        response = requests.get(url, params=params, headers=HEADERS)
-        # print(f"DEBUG: Response Status: {response.status_code}")
-        
-        if response.status_code == 202:
-            # print("DEBUG: BGG returned 202 Accepted (Processing)")
-            return {"status": 202, "message": "Queued. Please try again."}
-        
-        if response.status_code == 200:
-            # force_list ensures 'item' is always a list, even if only 1 game exists
-            data = xmltodict.parse(
-                response.content, 
-                force_list=('item', 'link', 'name', 'poll', 'result')
-            )
-            return data
-        
-        # print(f"DEBUG: Error {response.status_code}: {response.text}")
+        response = get_client(HEADERS).get_with_retry(url, params=params, headers=headers, stream=True)
+        try:
+            if response.status_code == 304 and entry is not None:
+                cache.revalidated(entry, ttl)
+                return _load_items(entry)
+
+            if response.status_code == 202:
+                # BGG still queued the collection after the client's retries
+                # Serve the stale copy while BGG rebuilds the collection
+                if entry is not None:
+                    return _load_items(entry)
+                raise BGGQueued(username)
+
+            if response.status_code == 200:
+                # The body is streamed, so this span covers download and parse
+                with metrics.span('xml.collection'):
+                    items = list(iter_collection(response.raw))
+                if modified_since is None:
+                    cache.store(
+                        COLLECTION_CACHE_NAMESPACE, key, items, ttl,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                        max_entries=max_entries
+                    )
+                return items
+        finally:
+            response.close()
+
         return None
+    except BGGQueued:
+        raise
     except Exception as e:
         print(f"Error fetching collection: {e}")
+        if entry is not None:
+            return _load_items(entry)
         return None
 
+def _load_items(entry):
+    return [CollectionItem(*fields) for fields in cache.load(entry)]
+
+# fetch_things result for IDs whose chunk failed (network error, or 429/5xx after retries)
+FETCH_FAILED = object()
+
 def fetch_things(ids):
-    """Fetches detailed stats for a list of game IDs."""
+    """
+    Fetches detailed stats for a list of game IDs as GameRecords (without descriptions), in order.
+    Chunks are requested concurrently on the shared BGG client. Each game ID
+    is fetched once however many threads or worker processes ask for it at
+    the same time (see coalesce).
+    """
+    return fetch_things_checked(ids)[0]
+
+def fetch_things_checked(ids):
+    """
+    fetch_things, also telling failed requests apart from games BGG doesn't
+    return: (GameRecords in order, IDs whose chunk failed).
+    """
+    keys = {f"thing:{str(bgg_id).strip()}": bgg_id for bgg_id in ids}
+
+    def shared(found):
+        entries = cache.lookup_many(THING_CACHE_NAMESPACE, found)
+        # None: the holder got nothing back for that ID, so don't ask again
+        return {key: GameRecord(*fields) if fields else None
+                for key, fields in ((key, cache.load(entry)) for key, entry in entries.items() if entry.is_fresh)}
+
+    def publish(found):
+        # Failed IDs aren't published, so waiting processes fetch them again
+        _, ttl, _ = _lease_settings()
+        cache.store_many(THING_CACHE_NAMESPACE,
+                         {key: thing.to_fields() if thing else None
+                          for key, thing in found.items() if thing is not FETCH_FAILED}, ttl)
+
+    found = coalesce(list(keys), lambda todo: _fetch_things([keys[key] for key in todo]), shared, publish)
+    things = [found[key] for key in keys if found.get(key) not in (None, FETCH_FAILED)]
+    failed = [bgg_id for key, bgg_id in keys.items() if found.get(key) is FETCH_FAILED]
+    return things, failed
+
+def _fetch_things(ids):
     # Chunk IDs into batches of 20 (BGG limit)
     chunk_size = 20
-    all_items = []
-    
-    for i in range(0, len(ids), chunk_size):
-        chunk = ids[i:i + chunk_size]
+    chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+    url = f"{BGG_API_BASE}/thing"
+    client = get_client(HEADERS)
+
+    def fetch_chunk(chunk):
         id_str = ",".join(map(str, chunk))
-        url = f"{BGG_API_BASE}/thing"
         params = {"id": id_str, "stats": 1}
-        
         try:
-            response = requests.get(url, params=params, headers=HEADERS)
+            # Chunks are small, so the body is read whole and shared by identical concurrent requests
+            with metrics.span('bgg.thing_chunk'):
+                response = client.get_with_retry(url, params=params)
             if response.status_code == 200:
-                data = xmltodict.parse(
-                    response.content,
-                    force_list=('item', 'link', 'name', 'poll', 'result')
-                )
-                if data and 'items' in data and 'item' in data['items']:
-                    items = data['items']['item']
-                    if isinstance(items, dict):
-                        items = [items]
-                    all_items.extend(items)
-            else:
-                print(f"DEBUG: fetch_things chunk failed with status {response.status_code}: {response.text}")
+                with metrics.span('xml.things'):
+                    return list(iter_things(BytesIO(response.content)))
+            print(f"DEBUG: fetch_things chunk {id_str} failed after retries with status {response.status_code}")
         except Exception as e:
             print(f"Error fetching chunk: {e}")
-            
-    if all_items:
-        return {'items': {'item': all_items}}
-    return None
+        return None
+
+    things = {}
+    for chunk, chunk_things in zip(chunks, client.map(fetch_chunk, chunks)):
+        if chunk_things is None:
+            things.update((f"thing:{str(bgg_id).strip()}", FETCH_FAILED) for bgg_id in chunk)
+        else:
+            things.update((f"thing:{thing.bgg_id}", thing) for thing in chunk_things)
+    return things
+
+# Stop scanning a page for its meta description after this many bytes
+HEAD_SCAN_LIMIT = 256 * 1024
+
+class _HeadMetaParser(HTMLParser):
+    """Collects description meta tags and flags when <head> is over."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            name = attrs.get('name') or attrs.get('property')
+            if name in ('description', 'og:description') and attrs.get('content'):
+                self.meta.setdefault(name, attrs['content'].strip())
+        elif tag == 'body':
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.done = True
 
-@lru_cache(maxsize=500)
 def scrape_description(bgg_id):
-    """Scrapes the short meta description from the BGG website."""
-    url = f"https://boardgamegeek.com/boardgame/{bgg_id}"
+    """
+    Scrapes the short meta description from the BGG website.
+    Only the page's <head> is downloaded and parsed; the connection is
+    closed as soon as it ends. Fallback for games whose /thing response
+    had no <description>.
+    """
+    with metrics.span('bgg.scrape'):
+        return _scrape_description(bgg_id)
+
+def _scrape_description(bgg_id):
+    url = f"{BGG_SITE_BASE}/boardgame/{bgg_id}"
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=5)
-        if resp.status_code != 200:
-            return None
-            
-        soup = BeautifulSoup(resp.content, 'html.parser')
-        
-        # Priority 1: Standard meta description
-        meta = soup.find('meta', attrs={'name': 'description'})
-        if meta and meta.get('content'):
-            return meta['content'].strip()
-            
-        # Priority 2: OpenGraph description
-        meta = soup.find('meta', attrs={'property': 'og:description'})
-        if meta and meta.get('content'):
-            return meta['content'].strip()
-            
-        return None
+        resp = get_client(HEADERS).get_with_retry(url, timeout=5, stream=True)
+        try:
+            if resp.status_code != 200:
+                return None
+
+            parser = _HeadMetaParser()
+            decoder = codecs.getincrementaldecoder(resp.encoding or 'utf-8')(errors='replace')
+            read = 0
+            for chunk in resp.iter_content(chunk_size=8192):
+                parser.feed(decoder.decode(chunk))
+                read += len(chunk)
+                if parser.done or read >= HEAD_SCAN_LIMIT:
+                    break
+        finally:
+            resp.close()
+
+        # Priority 1: Standard meta description, Priority 2: OpenGraph description
+        return parser.meta.get('description') or parser.meta.get('og:description')
     except Exception as e:
         print(f"Error scraping {bgg_id}: {e}")
         return None
 
-import concurrent.futures
-import json
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
 from app import db
-from app.models import Game
+from app.models import Game, Person, game_designers, game_artists
+from app.services.records import GameRecord
 
-def process_games_data(items):
+def process_games_data(games):
     """
-    Processes a list of BGG game items (from fetch_things) into a list of game dictionaries.
-    Checks DB for existing games, fetches missing descriptions in parallel, and saves new games.
+    Completes GameRecords from fetch_things, keeping their order.
+    Games already in the DB are served from their rows; the rest get
+    their descriptions from app.services.descriptions and are saved.
     """
-    if not items:
+    if not games:
         return []
 
-    if isinstance(items, dict):
-        items = [items]
-
-    # 1. Identify IDs
-    # items contains the raw XML data from BGG
-    item_map = {item['@id']: item for item in items}
-    all_ids = list(item_map.keys())
-    
-    # 2. Check DB for existing games
-    existing_games_db = Game.query.filter(Game.bgg_id.in_(all_ids)).all()
-    existing_ids = {str(g.bgg_id) for g in existing_games_db}
-    
-    # 3. Filter for missing games
-    missing_ids = [gid for gid in all_ids if gid not in existing_ids]
-    missing_items = [item_map[gid] for gid in missing_ids]
-    
-    processed_games = []
-    
-    # Convert DB models to dicts
-    for g in existing_games_db:
-        processed_games.append({
-            'id': str(g.bgg_id),
-            'name': g.name,
-            'image': g.image,
-            'thumbnail': g.thumbnail,
-            'description': g.description,
-            'yearpublished': g.year_published,
-            'minplayers': g.min_players,
-            'maxplayers': g.max_players,
-            'playingtime': g.playing_time,
-            'averageweight': str(g.average_weight) if g.average_weight else None,
-            'designers': json.loads(g.designers) if g.designers else [],
-            'artists': json.loads(g.artists) if g.artists else []
-        })
-
-    if not missing_items:
-        return processed_games
-
-    # 4. Process missing games
-    # Helper to safely get value from XML dict
-    def get_val(obj, key, default=None):
-        return obj.get(key, {}).get('@value', default)
-
-    # Pre-process basic data
-    temp_games = []
-    for item in missing_items:
-        game = {
-            'id': item['@id'],
-            'name': item['name'][0]['@value'] if isinstance(item['name'], list) else item['name']['@value'],
-            'image': item.get('image'),
-            'thumbnail': item.get('thumbnail'),
-            'yearpublished': get_val(item, 'yearpublished'),
-            'minplayers': get_val(item, 'minplayers'),
-            'maxplayers': get_val(item, 'maxplayers'),
-            'playingtime': get_val(item, 'playingtime'),
-            'averageweight': item.get('statistics', {}).get('ratings', {}).get('averageweight', {}).get('@value'),
-            'designers': [],
-            'artists': []
-        }
-        
-        # Extract designers and artists
-        links = item.get('link', [])
-        if isinstance(links, dict):
-            links = [links]
-        for link in links:
-            if link.get('@type') == 'boardgamedesigner':
-                game['designers'].append(link.get('@value'))
-            elif link.get('@type') == 'boardgameartist':
-                game['artists'].append(link.get('@value'))
-        
-        temp_games.append(game)
-
-    # Fetch descriptions in parallel
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        # Create a map of future -> game
-        future_to_game = {executor.submit(scrape_description, game['id']): game for game in temp_games}
-        
-        for future in concurrent.futures.as_completed(future_to_game):
-            game = future_to_game[future]
-            try:
-                game['description'] = future.result()
-            except Exception as exc:
-                print(f"Description fetch generated an exception for {game['name']}: {exc}")
-                game['description'] = None
-            
-            # Save to DB
-            try:
-                new_game = Game(
-                    bgg_id=int(game['id']),
-                    name=game['name'],
-                    image=game['image'],
-                    thumbnail=game['thumbnail'],
-                    description=game['description'],
-                    year_published=game['yearpublished'],
-                    min_players=game['minplayers'],
-                    max_players=game['maxplayers'],
-                    playing_time=game['playingtime'],
-                    average_weight=float(game['averageweight']) if game['averageweight'] else 0.0,
-                    designers=json.dumps(game['designers']),
-                    artists=json.dumps(game['artists'])
-                )
-                db.session.add(new_game)
-                processed_games.append(game)
-            except Exception as e:
-                print(f"Error saving game {game['name']} to DB: {e}")
-
-    # Commit all new games
-    try:
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error committing games to DB: {e}")
-    
-    return processed_games
+    # 1. Check DB for existing games
+    with metrics.span('db.query'):
+        existing = {g.bgg_id: GameRecord.from_model(g)
+                    for g in Game.query.filter(Game.bgg_id.in_([game.bgg_id for game in games]))}
+
+    # 2. Process missing games: descriptions from /thing, the description cache or a scrape
+    new_games = [game for game in games if game.bgg_id not in existing]
+    if new_games:
+        from app.services.descriptions import describe
+        describe(new_games)
+
+        # Write all new games in a few chunked upserts
+        with metrics.span('db.commit'):
+            save_games(new_games)
+
+    return [existing.get(game.bgg_id, game) for game in games]
+
+def save_games(games):
+    """Saves GameRecords (rows plus designer/artist credits). Returns rows written."""
+    rows = [game.to_row() for game in games]
+    for game, row in zip(games, rows):
+        game.last_updated = row['last_updated']
+    credits = {game.bgg_id: (game.designers, game.artists) for game in games}
+    return upsert_games(rows, credits)
+
+# SQLite builds before 3.32 cap bound parameters per statement at 999
+SQLITE_MAX_VARIABLES = 999
+
+def upsert_games(rows, credits=None):
+    """
+    Writes game rows with INSERT ... ON CONFLICT (bgg_id) DO UPDATE.
+    Rows are written in chunks (one transaction each) so large collections take
+    a few statements and concurrent workers inserting the same game don't hit
+    unique-constraint failures. An existing description is kept when the new
+    row has none. credits ({bgg_id: (designers, artists)}) replaces the games'
+    designer/artist links in the same transaction. Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        insert = postgresql.insert
+    elif dialect == 'sqlite':
+        insert = sqlite.insert
+    else:
+        insert = None
+
+    chunk_size = current_app.config.get('GAME_UPSERT_CHUNK_SIZE', 500) if has_app_context() else 500
+    if dialect == 'sqlite':
+        chunk_size = min(chunk_size, SQLITE_MAX_VARIABLES // len(rows[0]))
+
+    written = 0
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        try:
+            if insert is None:
+                for row in chunk:
+                    _save_game(row)
+            else:
+                db.session.execute(_upsert_statement(insert, chunk))
+            _write_credits(insert, chunk, credits)
+            db.session.commit()
+            written += len(chunk)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error upserting games chunk, retrying row by row: {e}")
+            written += _upsert_rows_individually(insert, chunk, credits)
+    return written
+
+def _upsert_statement(insert, rows):
+    table = Game.__table__
+    stmt = insert(table).values(rows)
+    update = {name: stmt.excluded[name] for name in rows[0] if name != 'bgg_id'}
+    if 'description' in update:
+        update['description'] = func.coalesce(stmt.excluded.description, table.c.description)
+    return stmt.on_conflict_do_update(index_elements=['bgg_id'], set_=update)
+
+def _save_game(row):
+    # ORM fallback for dialects without ON CONFLICT support
+    game = Game.query.filter_by(bgg_id=row['bgg_id']).first() or Game()
+    for name, value in row.items():
+        if name != 'description' or value is not None:
+            setattr(game, name, value)
+    db.session.add(game)
+
+def _write_credits(insert, rows, credits):
+    # Replace the designer/artist links of the games in rows
+    if not credits:
+        return
+    chunk_credits = {row['bgg_id']: credits[row['bgg_id']] for row in rows if row['bgg_id'] in credits}
+    if not chunk_credits:
+        return
+
+    names = {name for pair in chunk_credits.values() for names in pair for name in names if name}
+    if names:
+        if insert is None:
+            known = {name for (name,) in db.session.query(Person.name).filter(Person.name.in_(names))}
+            db.session.add_all(Person(name=name) for name in names - known)
+            db.session.flush()
+        else:
+            db.session.execute(insert(Person.__table__)
+                               .values([{'name': name} for name in names])
+                               .on_conflict_do_nothing(index_elements=['name']))
+    people = dict(db.session.query(Person.name, Person.id).filter(Person.name.in_(names))) if names else {}
+    game_ids = dict(db.session.query(Game.bgg_id, Game.id).filter(Game.bgg_id.in_(chunk_credits)))
+
+    for table, index in ((game_designers, 0), (game_artists, 1)):
+        db.session.execute(table.delete().where(table.c.game_id.in_(game_ids.values())))
+        links = [
+            {'game_id': game_ids[bgg_id], 'person_id': people[name], 'position': position}
+            for bgg_id, pair in chunk_credits.items() if bgg_id in game_ids
+            for position, name in enumerate(dict.fromkeys(pair[index])) if name in people
+        ]
+        if links:
+            db.session.execute(table.insert(), links)
+
+def _upsert_rows_individually(insert, rows, credits=None):
+    written = 0
+    for row in rows:
+        try:
+            if insert is None:
+                _save_game(row)
+            else:
+                db.session.execute(_upsert_statement(insert, [row]))
+            _write_credits(insert, [row], credits)
+            db.session.commit()
+            written += 1
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error saving game {row.get('name')} to DB: {e}")
+    return written
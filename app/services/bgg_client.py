@@ -0,0 +1,221 @@
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app, has_app_context
+from app.services.workers import get_executor
+
+BGG_HOST = "boardgamegeek.com"
+
+
+class RateLimiter:
+    """Spaces outgoing requests at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RetryBudget:
+    """Allows at most `limit` retries per host in any rolling `window` seconds."""
+
+    def __init__(self, limit, window=60):
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._spent = defaultdict(deque)
+
+    def acquire(self, host):
+        now = time.monotonic()
+        with self._lock:
+            spent = self._spent[host]
+            while spent and now - spent[0] > self.window:
+                spent.popleft()
+            if len(spent) >= self.limit:
+                return False
+            spent.append(now)
+            return True
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one execution.
+    The first caller runs fn; callers arriving while it is in flight wait for
+    and share its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def claim(self, keys):
+        """
+        Claims every key not already in flight. Returns (owned, waiting):
+        owned keys must be settled with resolve()/fail() by the caller;
+        waiting maps keys another caller owns to their Future.
+        """
+        owned, waiting = [], {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                if key in self._calls:
+                    waiting[key] = self._calls[key]
+                else:
+                    self._calls[key] = Future()
+                    owned.append(key)
+        return owned, waiting
+
+    def resolve(self, key, result):
+        with self._lock:
+            future = self._calls.pop(key, None)
+        if future is not None:
+            future.set_result(result)
+
+    def fail(self, key, exc):
+        with self._lock:
+            future = self._calls.pop(key, None)
+        if future is not None:
+            future.set_exception(exc)
+
+
+# 202: BGG queued the request; 429/5xx: throttled or temporarily unavailable
+RETRY_STATUSES = (202, 429, 500, 502, 503, 504)
+
+
+class BGGClient:
+    """
+    Pooled HTTP client for BoardGameGeek.
+    One keep-alive Session is shared by every call, all requests go through a
+    process-wide rate limiter and chunked work runs on a bounded thread pool.
+    Queued (202) and throttled (429/5xx) responses are retried server-side.
+    """
+
+    def __init__(self, headers, max_workers=4, rate=5.0, pool_size=10, timeout=30,
+                 max_attempts=5, base_delay=1.0, max_delay=16.0, retry_budget=60):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers)
+        self.limiter = RateLimiter(rate)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = RetryBudget(retry_budget)
+        self.inflight = SingleFlight()
+        # Caps concurrent BGG calls on the shared outbound pool
+        get_executor().set_host_limit(BGG_HOST, max_workers)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        self.limiter.wait()
+        return self.session.get(url, **kwargs)
+
+    def get_with_retry(self, url, params=None, headers=None, retry_statuses=RETRY_STATUSES,
+                       stream=False, **kwargs):
+        """
+        GETs url, retrying queued/throttled responses with exponential backoff
+        and jitter until max_attempts or the host's retry budget runs out.
+        Identical concurrent requests share a single upstream call, except
+        with stream=True, where the caller reads the body from response.raw.
+        """
+        def call():
+            host = urlsplit(url).hostname
+            attempt = 0
+            while True:
+                response = self.get(url, params=params, headers=headers, stream=stream, **kwargs)
+                if stream:
+                    response.raw.decode_content = True
+                else:
+                    response.content  # read the body once so waiters can share it
+                attempt += 1
+                if response.status_code not in retry_statuses:
+                    return response
+                if attempt >= self.max_attempts or not self.budget.acquire(host):
+                    return response
+                if stream:
+                    response.close()
+                time.sleep(self.backoff(attempt, response))
+
+        if stream:
+            return call()
+        key = (url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())))
+        return self.inflight.do(key, call)
+
+    def backoff(self, attempt, response=None):
+        """Delay before retry number `attempt`, honouring Retry-After when sent."""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and str(retry_after).isdigit():
+            return min(float(retry_after), self.max_delay)
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def map(self, fn, iterable):
+        """
+        Runs fn over iterable on the shared outbound pool with at most
+        max_workers BGG calls in flight process-wide, preserving order.
+        """
+        return get_executor().map(fn, iterable, host=BGG_HOST)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(headers):
+    """Returns the process-wide BGGClient, built from app config on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            config = current_app.config if has_app_context() else {}
+            _client = BGGClient(
+                headers,
+                max_workers=config.get("BGG_MAX_CONCURRENCY", 4),
+                rate=config.get("BGG_RATE_LIMIT", 5.0),
+                pool_size=config.get("BGG_POOL_SIZE", 10),
+                timeout=config.get("BGG_TIMEOUT", 30),
+                max_attempts=config.get("BGG_RETRY_MAX_ATTEMPTS", 5),
+                base_delay=config.get("BGG_RETRY_BASE_DELAY", 1.0),
+                max_delay=config.get("BGG_RETRY_MAX_DELAY", 16.0),
+                retry_budget=config.get("BGG_RETRY_BUDGET", 60),
+            )
+        return _client
@@ -0,0 +1,64 @@
+import xml.etree.ElementTree as ET
+from typing import NamedTuple, Optional
+
+from app.services.records import GameRecord, element_text, element_value, number
+
+
+class CollectionItem(NamedTuple):
+    """The fields we use from a /collection <item>."""
+    bgg_id: int
+    name: Optional[str]
+    year_published: Optional[int]
+    min_players: Optional[int]
+    playing_time: Optional[int]
+    average_weight: Optional[float]
+
+
+def collection_item(elem):
+    stats = elem.find('stats')
+    stats = stats if stats is not None else ET.Element('stats')
+    return CollectionItem(
+        bgg_id=int(elem.get('objectid')),
+        name=element_text(elem.find('name')),
+        year_published=number(element_text(elem.find('yearpublished'))),
+        min_players=number(stats.get('minplayers')),
+        playing_time=number(stats.get('playingtime')),
+        average_weight=element_value(stats.find('rating/averageweight'), float),
+    )
+
+
+def iter_items(stream, convert):
+    """
+    Streams the <item> children of an <items> document from a file-like
+    object, yielding convert(elem) for each. Every finished item (and any
+    bulky <poll> inside it) is cleared straight away, so memory stays flat
+    however many items the response holds. Raises ValueError if the
+    document isn't an <items> list (e.g. BGG's <errors> reply).
+    """
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                if elem.tag != 'items':
+                    raise ValueError(f"Unexpected BGG response <{elem.tag}>")
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1 and elem.tag == 'item':
+            try:
+                yield convert(elem)
+            except (TypeError, ValueError) as e:
+                print(f"Error parsing BGG item {elem.get('id') or elem.get('objectid')}: {e}")
+            root.clear()
+        elif elem.tag == 'poll':
+            elem.clear()
+
+
+def iter_collection(stream):
+    return iter_items(stream, collection_item)
+
+
+def iter_things(stream):
+    return iter_items(stream, GameRecord.from_xml)
@@ -0,0 +1,137 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from flask import has_app_context
+from app import db
+from app.models import CacheEntry
+
+
+def make_key(*parts, **params):
+    """Builds a stable cache key from positional parts and query params."""
+    raw = json.dumps([[str(p).lower() for p in parts], params], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def lookup(namespace, key):
+    """
+    Returns the CacheEntry for (namespace, key), fresh or stale, or None.
+    Stale entries are still useful for conditional revalidation.
+    """
+    if not has_app_context():
+        return None
+    try:
+        entry = CacheEntry.query.filter_by(namespace=namespace, key=key).first()
+        if entry:
+            entry.last_accessed = datetime.utcnow()
+            db.session.commit()
+        return entry
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error reading cache {namespace}: {e}")
+        return None
+
+
+def lookup_many(namespace, keys, chunk_size=500):
+    """Returns {key: CacheEntry} for the keys present in namespace, fresh or stale."""
+    if not has_app_context() or not keys:
+        return {}
+    keys = list(keys)
+    found = {}
+    try:
+        for i in range(0, len(keys), chunk_size):
+            entries = CacheEntry.query.filter(CacheEntry.namespace == namespace,
+                                              CacheEntry.key.in_(keys[i:i + chunk_size])).all()
+            found.update((entry.key, entry) for entry in entries)
+        if found:
+            now = datetime.utcnow()
+            for entry in found.values():
+                entry.last_accessed = now
+            db.session.commit()
+        return found
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error reading cache {namespace}: {e}")
+        return {}
+
+
+def load(entry):
+    """Decodes the JSON payload stored in an entry."""
+    if entry is None or entry.value is None:
+        return None
+    return json.loads(entry.value)
+
+
+def store(namespace, key, value, ttl, etag=None, last_modified=None, max_entries=None):
+    """Inserts or replaces a cache entry and enforces the namespace size bound."""
+    if not has_app_context():
+        return None
+    now = datetime.utcnow()
+    try:
+        entry = CacheEntry.query.filter_by(namespace=namespace, key=key).first()
+        if entry is None:
+            entry = CacheEntry(namespace=namespace, key=key, created_at=now)
+            db.session.add(entry)
+        entry.value = json.dumps(value)
+        entry.etag = etag
+        entry.last_modified = last_modified
+        entry.expires_at = now + timedelta(seconds=ttl)
+        entry.last_accessed = now
+        db.session.commit()
+        if max_entries:
+            evict(namespace, max_entries)
+        return entry
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error writing cache {namespace}: {e}")
+        return None
+
+
+def store_many(namespace, values, ttl, chunk_size=500):
+    """Inserts or replaces {key: value} entries in one transaction per chunk."""
+    if not has_app_context() or not values:
+        return
+    now = datetime.utcnow()
+    keys = list(values)
+    try:
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            CacheEntry.query.filter(CacheEntry.namespace == namespace,
+                                    CacheEntry.key.in_(chunk)).delete(synchronize_session=False)
+            db.session.add_all(
+                CacheEntry(namespace=namespace, key=key, value=json.dumps(values[key]), created_at=now,
+                           expires_at=now + timedelta(seconds=ttl), last_accessed=now)
+                for key in chunk
+            )
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error writing cache {namespace}: {e}")
+
+
+def revalidated(entry, ttl):
+    """Extends the lifetime of an entry the upstream confirmed is unchanged."""
+    try:
+        entry.expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error refreshing cache entry: {e}")
+
+
+def evict(namespace, max_entries):
+    """Deletes the least recently used entries beyond max_entries."""
+    try:
+        stale_ids = [
+            row.id for row in CacheEntry.query
+            .filter_by(namespace=namespace)
+            .order_by(CacheEntry.last_accessed.desc())
+            .offset(max_entries)
+            .with_entities(CacheEntry.id)
+        ]
+        if stale_ids:
+            CacheEntry.query.filter(CacheEntry.id.in_(stale_ids)).delete(synchronize_session=False)
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error evicting cache {namespace}: {e}")
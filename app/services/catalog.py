@@ -0,0 +1,102 @@
+from sqlalchemy import func
+from app import db
+from app.models import CollectionEntry, Game
+from app.services.records import GameRecord
+
+# /collection sort keys -> indexed Game columns
+SORT_COLUMNS = {
+    'name': func.lower(Game.name),
+    'year': Game.year_published,
+    'players': Game.min_players,
+    'time': Game.playing_time,
+    'weight': Game.average_weight,
+}
+
+
+def filters_from_args(args):
+    """Player count / time / weight filters from request args (missing or invalid values are ignored)."""
+    return {
+        'players': args.get('players', type=int),
+        'max_time': args.get('max_time', type=int),
+        'min_weight': args.get('min_weight', type=float),
+        'max_weight': args.get('max_weight', type=float),
+    }
+
+
+def _user_key(username):
+    # collection_entries stores usernames lowercased (BGG usernames are case-insensitive)
+    return username.strip().lower()
+
+
+def query_games(username=None, ids=None, sort='name', order='asc', players=None, max_time=None,
+                min_weight=None, max_weight=None):
+    """
+    Builds a Game query sorted and filtered in SQL, limited to a user's
+    collection (joined on collection_entries) or to a short list of ids.
+    Missing values sort first ascending and last descending, matching the
+    old in-Python sort that treated them as 0.
+    """
+    query = Game.query
+    if username is not None:
+        query = query.join(CollectionEntry, CollectionEntry.bgg_id == Game.bgg_id) \
+            .filter(CollectionEntry.username == _user_key(username))
+    if ids is not None:
+        query = query.filter(Game.bgg_id.in_([int(i) for i in ids]))
+    if players:
+        query = query.filter(Game.min_players <= players, Game.max_players >= players)
+    if max_time:
+        query = query.filter(Game.playing_time <= max_time)
+    if min_weight is not None:
+        query = query.filter(Game.average_weight >= min_weight)
+    if max_weight is not None:
+        query = query.filter(Game.average_weight <= max_weight)
+
+    column = SORT_COLUMNS.get(sort, SORT_COLUMNS['name'])
+    if order == 'desc':
+        query = query.order_by(column.desc().nullslast(), Game.bgg_id)
+    else:
+        query = query.order_by(column.asc().nullsfirst(), Game.bgg_id)
+    return query
+
+
+def paginate_games(page=1, per_page=24, **kwargs):
+    """query_games() paginated with LIMIT/OFFSET; kwargs are passed through."""
+    return query_games(**kwargs).paginate(page=page, per_page=per_page, error_out=False)
+
+
+def sorted_ids(**kwargs):
+    """All matching BGG IDs (as strings) in query order, without loading full rows."""
+    return [str(bgg_id) for (bgg_id,) in query_games(**kwargs).with_entities(Game.bgg_id)]
+
+
+def missing_count(username):
+    """Number of the user's collection entries without a Game row yet."""
+    return (db.session.query(func.count(CollectionEntry.id))
+            .outerjoin(Game, Game.bgg_id == CollectionEntry.bgg_id)
+            .filter(CollectionEntry.username == _user_key(username), Game.id.is_(None))
+            .scalar())
+
+
+def has_games(username):
+    """True when every game in the user's collection has a Game row, so it can be served from SQL."""
+    has_entries = db.session.query(CollectionEntry.id).filter(
+        CollectionEntry.username == _user_key(username)).first() is not None
+    return has_entries and not missing_count(username)
+
+
+def missing_ids(ids, chunk_size=500):
+    """The IDs in ids (in order) that have no Game row yet."""
+    ids = list(ids)
+    known = set()
+    for i in range(0, len(ids), chunk_size):
+        chunk = {int(bgg_id) for bgg_id in ids[i:i + chunk_size]}
+        known.update(bgg_id for (bgg_id,) in db.session.query(Game.bgg_id).filter(Game.bgg_id.in_(chunk)))
+    return [bgg_id for bgg_id in ids if int(bgg_id) not in known]
+
+
+def stored_records(ids):
+    """GameRecords for the IDs in ids (a page's worth) that have a Game row, keyed by str ID."""
+    if not ids:
+        return {}
+    rows = Game.query.filter(Game.bgg_id.in_([int(i) for i in ids]))
+    return {str(game.bgg_id): GameRecord.from_model(game) for game in rows}
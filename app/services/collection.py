@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models import CollectionEntry, CollectionSync
+from app.services import bgg
+
+# /collection sort keys -> CollectionEntry columns (used until every game has a Game row)
+SORT_COLUMNS = {
+    'name': func.lower(CollectionEntry.name),
+    'year': CollectionEntry.year_published,
+    'players': CollectionEntry.min_players,
+    'time': CollectionEntry.playing_time,
+    'weight': CollectionEntry.average_weight,
+}
+
+DELETE_CHUNK_SIZE = 500
+
+
+class CollectionQueued(Exception):
+    """Raised when BGG is still building a collection we have never synced."""
+
+
+def _key(username):
+    # BGG usernames are case-insensitive
+    return username.strip().lower()
+
+
+def apply_items(username, items, full=False):
+    """
+    Writes CollectionItem records as entries: new games are added, known
+    ones updated. With full=True the items are the whole collection, so
+    entries missing from it are removed. Returns (added, removed) counts.
+    """
+    key = _key(username)
+    fresh = {item.bgg_id: item._asdict() for item in items}
+
+    existing = {e.bgg_id: e for e in CollectionEntry.query.filter_by(username=key)}
+    added = 0
+    for bgg_id, fields in fresh.items():
+        entry = existing.get(bgg_id)
+        if entry is None:
+            db.session.add(CollectionEntry(username=key, **fields))
+            added += 1
+        else:
+            for column, value in fields.items():
+                setattr(entry, column, value)
+
+    removed = [bgg_id for bgg_id in existing if bgg_id not in fresh] if full else []
+    for i in range(0, len(removed), DELETE_CHUNK_SIZE):
+        (CollectionEntry.query
+         .filter(CollectionEntry.username == key,
+                 CollectionEntry.bgg_id.in_(removed[i:i + DELETE_CHUNK_SIZE]))
+         .delete(synchronize_session=False))
+
+    now = datetime.utcnow()
+    state = db.session.get(CollectionSync, key) or CollectionSync(username=key)
+    state.synced_at = now
+    if full:
+        state.full_synced_at = now
+    state.total = len(existing) + added - len(removed)
+    db.session.add(state)
+    db.session.commit()
+    return added, len(removed)
+
+
+def sync_collection(username, force=False):
+    """
+    Brings the user's CollectionEntry rows up to date and returns their
+    CollectionSync state, or None if BGG has no such collection.
+    Within COLLECTION_SYNC_TTL the stored rows are used as-is. After that
+    only games modified since the last sync are requested, except every
+    COLLECTION_FULL_SYNC_HOURS (or with force) when the full collection is
+    diffed against the stored one to pick up removals.
+    Raises CollectionQueued if BGG is still building a never-synced collection.
+    """
+    config = current_app.config
+    key = _key(username)
+    state = db.session.get(CollectionSync, key)
+    now = datetime.utcnow()
+
+    if state is not None and not force:
+        if state.synced_at and now - state.synced_at < timedelta(seconds=config.get('COLLECTION_SYNC_TTL', 900)):
+            return state
+        full_age = timedelta(hours=config.get('COLLECTION_FULL_SYNC_HOURS', 24))
+        if state.full_synced_at and now - state.full_synced_at < full_age:
+            # A failed or queued delta just leaves the stored rows in place
+            try:
+                items = bgg.fetch_collection(username, modified_since=state.synced_at)
+            except bgg.BGGQueued:
+                items = None
+            if items is not None:
+                apply_items(username, items)
+            return state
+
+    try:
+        items = bgg.fetch_collection(username)
+    except bgg.BGGQueued:
+        if state is None:
+            raise CollectionQueued(username)
+        return state
+    if items is None:
+        return state
+    apply_items(username, items, full=True)
+    return db.session.get(CollectionSync, key)
+
+
+def query_entries(username, sort='name', order='asc'):
+    """The user's entries sorted in SQL; missing values sort first ascending, last descending."""
+    query = CollectionEntry.query.filter_by(username=_key(username))
+    column = SORT_COLUMNS.get(sort, SORT_COLUMNS['name'])
+    if order == 'desc':
+        return query.order_by(column.desc().nullslast(), CollectionEntry.bgg_id)
+    return query.order_by(column.asc().nullsfirst(), CollectionEntry.bgg_id)
+
+
+def paginate_entries(username, page=1, per_page=24, sort='name', order='asc'):
+    return query_entries(username, sort, order).paginate(page=page, per_page=per_page, error_out=False)
+
+
+def entry_ids(username, sort='name', order='asc'):
+    """All of the user's BGG IDs (as strings) in sort order, e.g. for Select All / download all."""
+    rows = query_entries(username, sort, order).with_entities(CollectionEntry.bgg_id)
+    return [str(bgg_id) for (bgg_id,) in rows]
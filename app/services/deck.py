@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from flask import current_app, render_template
+from app.services import bgg, collection, images, metrics
+
+PDF_TEMPLATES = ('layouts/pdf.html', 'layouts/cards.html', 'components/card.html')
+
+
+class DeckError(Exception):
+    """Raised when a deck cannot be built (e.g. BGG still processing the collection)."""
+
+
+def options_from_form(form):
+    """Card content options as posted by the collection page."""
+    return {
+        'include_players': form.get('include_players') == 'on',
+        'include_time': form.get('include_time') == 'on',
+        'include_weight': form.get('include_weight') == 'on',
+    }
+
+
+def resolve_ids(username, ids=None, download_all=False):
+    """Returns the requested IDs, or every owned game ID for download_all / empty selections."""
+    if ids and not download_all:
+        return ids
+    try:
+        state = collection.sync_collection(username)
+    except collection.CollectionQueued:
+        raise DeckError("BGG is still processing this collection. Please try again.")
+    if state is None or not state.total:
+        raise DeckError("No games found")
+    return collection.entry_ids(username)
+
+
+def load_games(ids):
+    """Fetches details for ids and returns completed GameRecords."""
+    return bgg.process_games_data(bgg.fetch_things(ids))
+
+
+def render_deck_html(games, options):
+    return render_template('layouts/pdf.html',
+                           games=[game.to_context() for game in games],
+                           options=options,
+                           cards_per_page=current_app.config.get('PDF_CARDS_PER_PAGE', 9))
+
+
+def shard_games(games, cards_per_shard):
+    return [games[i:i + cards_per_shard] for i in range(0, len(games), cards_per_shard)]
+
+
+def render_deck_pdf(games, options):
+    """
+    Renders the deck to PDF bytes.
+    With PDF_PAGE_CACHE, each page is stored as its own PDF keyed by its
+    content (see render_deck_pages); otherwise decks larger than one shard
+    are split into batches of whole pages, rendered in the process pool and merged.
+    With PDF_BACKEND = 'imposition', cards are rendered once each and placed
+    on print sheets instead (see app.services.imposition).
+    """
+    from app.services.pdf import generate_pdf, generate_pdf_sharded, merge_pdfs
+
+    config = current_app.config
+    if config.get('PDF_BACKEND', 'weasyprint') == 'imposition':
+        from app.services import imposition
+        return imposition.render_deck(games, options)
+    if config.get('PDF_PAGE_CACHE', True):
+        pages = render_deck_pages(games, options)
+        return pages[0] if len(pages) == 1 else merge_pdfs(pages)
+
+    # Fetch and resize covers up front, concurrently, instead of one by one during layout
+    images.prefetch([g.image for g in games], images.cache_settings())
+
+    shard_size = config.get('PDF_CARDS_PER_PAGE', 9) * config.get('PDF_SHARD_PAGES', 4)
+    if config.get('PDF_RENDER_PROCESSES', 0) != 1 and len(games) > shard_size:
+        return generate_pdf_sharded([render_deck_html(batch, options)
+                                     for batch in shard_games(games, shard_size)])
+    return generate_pdf(render_deck_html(games, options))
+
+
+def render_deck_pages(games, options, keys=None):
+    """
+    Returns the deck as a list of single-page PDFs (bytes), one per sheet
+    of PDF_CARDS_PER_PAGE cards. Pages are stored under a hash of their
+    HTML (plus template and image settings), so only pages whose cards or
+    options changed since the last export are rendered; they are laid out
+    in whole-page shards of PDF_SHARD_PAGES and split back into pages.
+    keys are the deck's page_keys when the caller already has them.
+    """
+    from app.services.pdf import render_pdfs, split_pdf
+
+    config = current_app.config
+    pages = shard_games(games, config.get('PDF_CARDS_PER_PAGE', 9))
+    if keys is None:
+        keys = page_keys(games, options)
+    found = {key: stored_page(key) for key in set(keys)}
+    # Identical pages (e.g. duplicate selections) are rendered once
+    first = {}
+    for i, key in enumerate(keys):
+        first.setdefault(key, i)
+    missing = [i for key, i in first.items() if found[key] is None]
+    metrics.cache_result('pdf_page', True, len(first) - len(missing))
+    metrics.cache_result('pdf_page', False, len(missing))
+
+    if missing:
+        images.prefetch([g.image for i in missing for g in pages[i]], images.cache_settings())
+        shard_pages = max(1, config.get('PDF_SHARD_PAGES', 4))
+        batches = [missing[i:i + shard_pages] for i in range(0, len(missing), shard_pages)]
+        rendered = render_pdfs([render_deck_html([g for i in batch for g in pages[i]], options)
+                                for batch in batches])
+        for batch, pdf_bytes in zip(batches, rendered):
+            parts = split_pdf(pdf_bytes) if len(batch) > 1 else [pdf_bytes]
+            if len(parts) != len(batch):
+                # A card overflowed its sheet; render those pages one at a time
+                parts = render_pdfs([render_deck_html(pages[i], options) for i in batch])
+            for i, part in zip(batch, parts):
+                found[keys[i]] = part
+                save_page(keys[i], part)
+        evict_pages(config.get('PDF_PAGE_CACHE_MAX_FILES', 5000))
+
+    return [found[key] for key in keys]
+
+
+def page_keys(games, options):
+    """Content keys of the deck's pages, in order (one Jinja pass per page)."""
+    salt = page_salt()
+    return [page_key(render_deck_html(page, options), salt)
+            for page in shard_games(games, current_app.config.get('PDF_CARDS_PER_PAGE', 9))]
+
+
+def content_key(games, options, keys=None):
+    """
+    Hash of everything the deck's PDF depends on (the same inputs as its
+    page keys, which can be passed in). Names the stored PDF and is its
+    ETag, so a repeat download is answered without rendering.
+    """
+    digest = hashlib.sha256()
+    for key in keys if keys is not None else page_keys(games, options):
+        digest.update(key.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def save_deck_pdf(key, games, options, keys=None):
+    """
+    Renders the deck into the store under key and returns its path.
+    Stored pages are merged straight into a temp file beside the target,
+    so the whole deck is never held as one bytes object. keys are the
+    page_keys content_key was computed from, so pages aren't hashed twice.
+    """
+    from app.services.pdf import merge_pdfs
+
+    path = os.path.join(store_dir(), f"{key}.pdf")
+    if current_app.config.get('PDF_BACKEND', 'weasyprint') == 'imposition':
+        from app.services import imposition
+        with _atomic_file(path) as f:
+            imposition.render_deck(games, options, output=f)
+        evict_decks()
+        return path
+    if not current_app.config.get('PDF_PAGE_CACHE', True):
+        return save_pdf(key, render_deck_pdf(games, options))
+    pages = render_deck_pages(games, options, keys)
+    with _atomic_file(path) as f:
+        if len(pages) == 1:
+            f.write(pages[0])
+        else:
+            merge_pdfs(pages, f)
+    evict_decks()
+    return path
+
+
+def page_salt():
+    """What a page's PDF depends on besides its HTML: templates/CSS, cover image and backend settings."""
+    config = current_app.config
+    backend = {name: config.get(name) for name in ('PDF_BACKEND', 'PDF_SHEET_SIZE', 'IMPOSITION_BLEED_MM',
+                                                     'IMPOSITION_MIN_MARGIN_MM', 'IMPOSITION_CROP_MARKS')}
+    return template_version() + json.dumps([images.cache_settings(), backend], sort_keys=True, default=str)
+
+
+def page_key(page_html, salt):
+    """Content key for one stored page."""
+    return hashlib.sha256((salt + page_html).encode('utf-8')).hexdigest()
+
+
+def template_version():
+    """Hash of the PDF templates and stylesheet; any change invalidates stored PDFs."""
+    env = current_app.jinja_env
+    digest = hashlib.sha256()
+    for name in PDF_TEMPLATES:
+        source, _, _ = env.loader.get_source(env, name)
+        digest.update(source.encode('utf-8'))
+    css_path = os.path.join(current_app.static_folder, 'dist', 'output.css')
+    if os.path.exists(css_path):
+        digest.update(str(os.path.getmtime(css_path)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def store_dir():
+    path = current_app.config.get('PDF_CACHE_DIR') or os.path.join(current_app.instance_path, 'pdf_cache')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def stored_pdf_path(key):
+    """Path of the stored PDF for key, or None if it has not been built yet. Marks it as used."""
+    if not key:
+        return None
+    path = os.path.join(store_dir(), f"{key}.pdf")
+    try:
+        os.utime(path)  # mtime is the LRU clock for evict_decks
+    except OSError:
+        return None
+    return path
+
+
+def save_pdf(key, pdf_bytes):
+    path = _write_atomic(os.path.join(store_dir(), f"{key}.pdf"), pdf_bytes)
+    evict_decks()
+    return path
+
+
+def evict_decks(max_files=None):
+    """Deletes the least recently used stored decks beyond PDF_DECK_CACHE_MAX_FILES."""
+    if max_files is None:
+        max_files = current_app.config.get('PDF_DECK_CACHE_MAX_FILES', 200)
+    _evict(store_dir(), max_files)
+
+
+@contextmanager
+def _atomic_file(path):
+    # Readers only ever see complete files
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_atomic(path, data):
+    with _atomic_file(path) as f:
+        f.write(data)
+    return path
+
+
+def page_dir(folder='pages'):
+    path = os.path.join(store_dir(), folder)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def stored_page(key, folder='pages'):
+    """The stored single-page PDF for key (bytes), or None. Imposed cards live in folder='cards'."""
+    path = os.path.join(page_dir(folder), f"{key}.pdf")
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    os.utime(path)  # mtime is the LRU clock for evict_pages
+    return data
+
+
+def save_page(key, pdf_bytes, folder='pages'):
+    return _write_atomic(os.path.join(page_dir(folder), f"{key}.pdf"), pdf_bytes)
+
+
+def evict_pages(max_files, folder='pages'):
+    """Deletes the least recently used stored pages beyond max_files."""
+    _evict(page_dir(folder), max_files)
+
+
+def _evict(path, max_files):
+    # Keeps the max_files most recently used PDFs directly in path (0 keeps all)
+    if not max_files:
+        return
+    with os.scandir(path) as entries:
+        files = [entry for entry in entries if entry.name.endswith('.pdf') and entry.is_file()]
+    if len(files) <= max_files:
+        return
+    files.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in files[max_files:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
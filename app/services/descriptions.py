@@ -0,0 +1,96 @@
+import html
+import re
+
+from flask import current_app, has_app_context
+from app.services import bgg, cache, metrics
+
+DESCRIPTION_CACHE_NAMESPACE = "description"
+
+_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _settings():
+    config = current_app.config if has_app_context() else {}
+    return {
+        'max_length': config.get('DESCRIPTION_MAX_LENGTH', 500),
+        'scrape': config.get('DESCRIPTION_SCRAPE', True),
+        'ttl': config.get('DESCRIPTION_CACHE_TTL', 30 * 24 * 3600),
+        'negative_ttl': config.get('DESCRIPTION_NEGATIVE_TTL', 24 * 3600),
+        'max_entries': config.get('DESCRIPTION_CACHE_MAX_ENTRIES', 50000),
+    }
+
+
+def clean_description(text, max_length=0):
+    """
+    Turns a BGG description into plain card text: entities decoded (BGG
+    double-escapes line breaks as &amp;#10;), tags dropped, whitespace
+    collapsed and, with max_length, cut at a word boundary with an ellipsis.
+    """
+    if not text:
+        return None
+    text = html.unescape(html.unescape(text))
+    text = _WHITESPACE.sub(' ', _TAG.sub(' ', text)).strip()
+    if not text:
+        return None
+    if max_length and len(text) > max_length:
+        cut = text[:max_length - 1]
+        if ' ' in cut:
+            cut = cut.rsplit(' ', 1)[0]
+        text = cut.rstrip(' ,;:.') + '…'
+    return text
+
+
+def describe(games, scrape=None):
+    """
+    Fills in GameRecord.description in place, cleaned to card length.
+    Descriptions that came with the /thing response are used first. The
+    rest are read from the shared description cache, and only cache misses
+    are scraped from BGG (on the BGG client's bounded pool). Scrape results
+    are cached with DESCRIPTION_CACHE_TTL, failures with the shorter
+    DESCRIPTION_NEGATIVE_TTL so they are retried later.
+    """
+    settings = _settings()
+    if scrape is None:
+        scrape = settings['scrape']
+    missing = []
+    for game in games:
+        game.description = clean_description(game.description, settings['max_length'])
+        if game.description is None:
+            missing.append(game)
+    if not missing or not scrape:
+        return games
+
+    entries = cache.lookup_many(DESCRIPTION_CACHE_NAMESPACE, {str(game.bgg_id) for game in missing})
+    to_scrape = []
+    for game in missing:
+        entry = entries.get(str(game.bgg_id))
+        if entry is not None and entry.is_fresh:
+            game.description = clean_description(cache.load(entry), settings['max_length'])
+        else:
+            to_scrape.append(game)
+    metrics.cache_result(DESCRIPTION_CACHE_NAMESPACE, True, len(missing) - len(to_scrape))
+    metrics.cache_result(DESCRIPTION_CACHE_NAMESPACE, False, len(to_scrape))
+    if not to_scrape:
+        return games
+
+    def scrape_many(keys):
+        ids = [key.split(':', 1)[1] for key in keys]
+        scraped = bgg.get_client(bgg.HEADERS).map(bgg.scrape_description, ids)
+        for bgg_id, text in zip(ids, scraped):
+            cache.store(DESCRIPTION_CACHE_NAMESPACE, bgg_id, text,
+                        settings['ttl'] if text else settings['negative_ttl'])
+        cache.evict(DESCRIPTION_CACHE_NAMESPACE, settings['max_entries'])
+        return dict(zip(keys, scraped))
+
+    def shared(keys):
+        # Another process scraped these and stored them in the description cache
+        entries = cache.lookup_many(DESCRIPTION_CACHE_NAMESPACE, [key.split(':', 1)[1] for key in keys])
+        return {f"description:{bgg_id}": cache.load(entry)
+                for bgg_id, entry in entries.items() if entry.is_fresh}
+
+    # One scrape per game, however many requests are describing it at once
+    scraped = bgg.coalesce([f"description:{game.bgg_id}" for game in to_scrape], scrape_many, shared)
+    for game in to_scrape:
+        game.description = clean_description(scraped.get(f"description:{game.bgg_id}"), settings['max_length'])
+    return games
@@ -0,0 +1,102 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from markupsafe import Markup
+from app.services import metrics
+
+CARD_TEMPLATE = 'components/card.html'
+CARD_OPTIONS = ('include_players', 'include_time', 'include_weight')
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered HTML fragments, bounded by entry count."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process-wide card fragment cache, sized from app config on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            config = current_app.config if has_app_context() else {}
+            _cache = FragmentCache(config.get('CARD_FRAGMENT_CACHE_SIZE', 5000))
+        return _cache
+
+
+# Template objects are rebuilt when their source changes, so each gets hashed once
+_template_hashes = weakref.WeakKeyDictionary()
+
+
+def _template_hash(template):
+    digest = _template_hashes.get(template)
+    if digest is None:
+        env = template.environment
+        source, _, _ = env.loader.get_source(env, template.name)
+        digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+        _template_hashes[template] = digest
+    return digest
+
+
+def card_fragment(game, options=None):
+    """
+    The render_card macro's HTML for a GameRecord.to_context() mapping.
+    Rendered once per (bgg_id, last_updated, card options, card template
+    hash) and then served from the LRU; games not yet saved (no
+    last_updated) are rendered every time.
+    """
+    options = options or {}
+    template = current_app.jinja_env.get_template(CARD_TEMPLATE)
+    render_card = template.module.render_card
+    cache = get_cache()
+    if game.get('last_updated') is None or not cache.max_entries:
+        return render_card(game, options)
+
+    key = (game['id'], game['last_updated'],
+           tuple(bool(options.get(name, True)) for name in CARD_OPTIONS),
+           _template_hash(template))
+    html = cache.get(key)
+    metrics.cache_result('card_fragment', html is not None)
+    if html is None:
+        html = str(render_card(game, options))
+        cache.put(key, html)
+    return Markup(html)
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import requests
+from PIL import Image, ImageOps
+from flask import current_app
+from app.services.workers import get_executor
+
+MM_PER_INCH = 25.4
+# Card width x image band height (h-[55%] of 88.9mm) in components/card.html
+CARD_IMAGE_MM = (63.5, 88.9 * 0.55)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+
+def is_image_url(url):
+    return url.startswith(('http://', 'https://')) and url.split('?')[0].lower().endswith(IMAGE_EXTENSIONS)
+
+
+def target_size(dpi):
+    """Pixel size of the card image band at the given print DPI."""
+    return tuple(round(mm / MM_PER_INCH * dpi) for mm in CARD_IMAGE_MM)
+
+
+class ImageCache:
+    """
+    Content-addressed on-disk cache of card cover images.
+    Each remote image is fetched once, cropped/resized to the card's image
+    band at print DPI and stored as a JPEG under objects/<sha256>.jpg;
+    refs/ maps (url, size, quality) to the object it produced.
+    """
+
+    def __init__(self, root, dpi=300, quality=85, timeout=10):
+        self.root = root
+        self.size = target_size(dpi)
+        self.quality = quality
+        self.timeout = timeout
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'refs'), exist_ok=True)
+
+    def _ref_path(self, url):
+        ref = hashlib.sha1(f"{url}|{self.size[0]}x{self.size[1]}|q{self.quality}".encode('utf-8')).hexdigest()
+        return os.path.join(self.root, 'refs', ref)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', f"{digest}.jpg")
+
+    def lookup(self, url):
+        """Path of the cached image for url, or None."""
+        try:
+            with open(self._ref_path(url), 'r') as f:
+                path = self._object_path(f.read().strip())
+        except OSError:
+            return None
+        return path if os.path.exists(path) else None
+
+    def get(self, url):
+        """Path of the processed image for url, fetching it on a miss. None on failure."""
+        path = self.lookup(url)
+        if path:
+            return path
+        try:
+            resp = requests.get(url, timeout=self.timeout)
+            if resp.status_code != 200:
+                return None
+            data = self.process(resp.content)
+        except Exception as e:
+            print(f"Error caching image {url}: {e}")
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        try:
+            if not os.path.exists(path):
+                _atomic_write(path, data)
+            _atomic_write(self._ref_path(url), digest.encode('utf-8'))
+        except OSError as e:
+            # Another thread or process storing the same cover is harmless; a real write failure isn't fatal
+            print(f"Error storing image {url}: {e}")
+            return path if os.path.exists(path) else None
+        return path
+
+    def process(self, data):
+        """Crops to the card's aspect ratio (object-cover), resizes and recompresses."""
+        with Image.open(BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img = ImageOps.fit(img, self.size, method=Image.LANCZOS)
+            output = BytesIO()
+            img.save(output, format='JPEG', quality=self.quality, optimize=True, progressive=True)
+            return output.getvalue()
+
+
+def _atomic_write(path, data):
+    # Per thread, so concurrent writers of one file never share a temp file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cache_settings():
+    """ImageCache kwargs from app config (picklable for render workers), or None if disabled."""
+    config = current_app.config
+    if not config.get('IMAGE_CACHE_ENABLED', True):
+        return None
+    return {
+        'root': config.get('IMAGE_CACHE_DIR') or os.path.join(current_app.instance_path, 'image_cache'),
+        'dpi': config.get('IMAGE_PRINT_DPI', 300),
+        'quality': config.get('IMAGE_JPEG_QUALITY', 85),
+    }
+
+
+def prefetch(urls, settings):
+    """
+    Warms the cache for urls on the shared outbound pool (bounded per image
+    host) so renders only read local files.
+    """
+    urls = {url for url in urls if url and is_image_url(url)}
+    if not settings or not urls:
+        return
+    image_cache = ImageCache(**settings)
+    missing = [url for url in urls if not image_cache.lookup(url)]
+    if not missing:
+        return
+    get_executor().map(image_cache.get, missing, host=lambda url: urlsplit(url).hostname)
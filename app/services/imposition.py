@@ -0,0 +1,179 @@
+from io import BytesIO
+from typing import NamedTuple
+
+from flask import current_app, render_template
+from pypdf import PageObject, PdfReader, PdfWriter, Transformation
+from pypdf.generic import DecodedStreamObject
+from app.services import deck, images, metrics
+
+MM = 72 / 25.4
+# Sheet sizes and the poker card trim size (components/card.html), in mm
+SHEETS = {'A4': (210.0, 297.0), 'LETTER': (215.9, 279.4)}
+CARD_MM = (63.5, 88.9)
+CROP_MARK_MM = 5.0
+# Marks shorter than this (for lack of sheet margin) aren't worth printing
+CROP_MARK_MIN_MM = 2.0
+CROP_MARK_GAP_MM = 0.5
+
+
+class SheetLayout(NamedTuple):
+    """Card slots on one sheet, in PDF points from the sheet's lower-left corner."""
+    width: float
+    height: float
+    cols: int
+    rows: int
+    bleed: float
+    slots: list  # (x, y) of each card's bleed box, row by row from the top left
+
+
+def sheet_layout(sheet='A4', bleed_mm=1.5, min_margin_mm=5.0, marks=False):
+    """
+    Fits as many bleed-boxed cards on the sheet as the minimum margin allows
+    and centres the grid. Neighbouring cards' bleed boxes touch, so every
+    card is cut cleanly on its own trim line. With marks, raises ValueError
+    when the margins are too thin for crop marks.
+    """
+    width, height = SHEETS[sheet.upper()]
+    cell_w, cell_h = CARD_MM[0] + 2 * bleed_mm, CARD_MM[1] + 2 * bleed_mm
+    cols = int((width - 2 * min_margin_mm) // cell_w)
+    rows = int((height - 2 * min_margin_mm) // cell_h)
+    if cols < 1 or rows < 1:
+        raise ValueError(f"A {CARD_MM[0]}x{CARD_MM[1]}mm card does not fit on {sheet}")
+    left = (width - cols * cell_w) / 2
+    top = (height - rows * cell_h) / 2
+    if marks and min(left, top) - CROP_MARK_GAP_MM - 1 < CROP_MARK_MIN_MM:
+        raise ValueError(f"{sheet} margins of {min(left, top):.1f}mm leave no room for crop marks; "
+                         f"raise IMPOSITION_MIN_MARGIN_MM")
+    slots = [((left + col * cell_w) * MM, (height - top - (row + 1) * cell_h) * MM)
+             for row in range(rows) for col in range(cols)]
+    return SheetLayout(width * MM, height * MM, cols, rows, bleed_mm * MM, slots)
+
+
+def crop_marks(layout):
+    """Content stream operators for trim marks in the margins around the grid."""
+    trim_w, trim_h = CARD_MM[0] * MM, CARD_MM[1] * MM
+    left, bottom = layout.slots[-layout.cols][0], layout.slots[-1][1]
+    right = left + layout.cols * (trim_w + 2 * layout.bleed)
+    top = bottom + layout.rows * (trim_h + 2 * layout.bleed)
+    gap = CROP_MARK_GAP_MM * MM
+    # Marks stop 1mm short of the sheet edge
+    length_x = min(CROP_MARK_MM * MM, left - gap - MM)
+    length_y = min(CROP_MARK_MM * MM, bottom - gap - MM)
+
+    ops = ['q', '0.25 w', '0 G']
+    if length_y > 0:
+        for col in range(layout.cols):
+            x0 = left + col * (trim_w + 2 * layout.bleed) + layout.bleed
+            for x in (x0, x0 + trim_w):
+                ops.append(f'{x:.2f} {top + gap:.2f} m {x:.2f} {top + gap + length_y:.2f} l S')
+                ops.append(f'{x:.2f} {bottom - gap:.2f} m {x:.2f} {bottom - gap - length_y:.2f} l S')
+    if length_x > 0:
+        for row in range(layout.rows):
+            y0 = bottom + row * (trim_h + 2 * layout.bleed) + layout.bleed
+            for y in (y0, y0 + trim_h):
+                ops.append(f'{left - gap:.2f} {y:.2f} m {left - gap - length_x:.2f} {y:.2f} l S')
+                ops.append(f'{right + gap:.2f} {y:.2f} m {right + gap + length_x:.2f} {y:.2f} l S')
+    ops.append('Q')
+    return '\n'.join(ops).encode('ascii')
+
+
+def impose(cards, layout, marks=True, output=None):
+    """
+    Places single-page card PDFs (bytes, in deck order) on sheets. Each
+    distinct card is parsed once; repeats reuse its page. Returns the PDF
+    bytes, or writes to the binary file output when given.
+    """
+    writer = PdfWriter()
+    pages = {}
+    marks_page = None
+    if marks:
+        marks_page = PageObject.create_blank_page(width=layout.width, height=layout.height)
+        stream = DecodedStreamObject()
+        stream.set_data(crop_marks(layout))
+        marks_page.replace_contents(stream)
+
+    per_sheet = len(layout.slots)
+    for start in range(0, len(cards), per_sheet):
+        sheet = writer.add_blank_page(width=layout.width, height=layout.height)
+        for (x, y), card in zip(layout.slots, cards[start:start + per_sheet]):
+            page = pages.get(id(card))
+            if page is None:
+                page = pages[id(card)] = PdfReader(BytesIO(card)).pages[0]
+            sheet.merge_transformed_page(page, Transformation().translate(x, y))
+        if marks_page is not None:
+            sheet.merge_page(marks_page)
+
+    if output is not None:
+        writer.write(output)
+        return None
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _settings():
+    config = current_app.config
+    return {
+        'sheet': config.get('PDF_SHEET_SIZE', 'A4'),
+        'bleed': config.get('IMPOSITION_BLEED_MM', 1.5),
+        'min_margin': config.get('IMPOSITION_MIN_MARGIN_MM', 5.0),
+        'marks': config.get('IMPOSITION_CROP_MARKS', True),
+    }
+
+
+def card_pdfs(games, options, bleed_mm):
+    """
+    Single-page PDFs for each game, trim plus bleed with the card's edge
+    artwork running into the bleed, in order. Cards are
+    stored under a hash of their HTML, so each distinct card is laid out
+    by WeasyPrint once; missing cards are rendered many to a document and
+    split apart.
+    """
+    from app.services.pdf import render_pdfs, split_pdf
+
+    config = current_app.config
+    page_width, page_height = CARD_MM[0] + 2 * bleed_mm, CARD_MM[1] + 2 * bleed_mm
+    salt = deck.page_salt()
+    contexts = [game.to_context() for game in games]
+
+    def document(batch):
+        return render_template('layouts/cards.html', games=batch, options=options, page_width=page_width,
+                               page_height=page_height, trim_height=CARD_MM[1], bleed=bleed_mm)
+
+    keys = [deck.page_key(document([ctx]), salt) for ctx in contexts]
+    found = {key: deck.stored_page(key, 'cards') for key in set(keys)}
+    first = {}
+    for i, key in enumerate(keys):
+        first.setdefault(key, i)
+    missing = [i for key, i in first.items() if found[key] is None]
+    metrics.cache_result('pdf_card', True, len(first) - len(missing))
+    metrics.cache_result('pdf_card', False, len(missing))
+
+    if missing:
+        images.prefetch([games[i].image for i in missing], images.cache_settings())
+        batch_size = config.get('PDF_CARDS_PER_PAGE', 9) * max(1, config.get('PDF_SHARD_PAGES', 4))
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        rendered = render_pdfs([document([contexts[i] for i in batch]) for batch in batches])
+        for batch, pdf_bytes in zip(batches, rendered):
+            parts = split_pdf(pdf_bytes) if len(batch) > 1 else [pdf_bytes]
+            if len(parts) != len(batch):
+                # A card overflowed its page; render those cards one at a time
+                parts = render_pdfs([document([contexts[i]]) for i in batch])
+            for i, part in zip(batch, parts):
+                found[keys[i]] = part
+                deck.save_page(keys[i], part, 'cards')
+        deck.evict_pages(config.get('PDF_PAGE_CACHE_MAX_FILES', 5000), 'cards')
+
+    return [found[key] for key in keys]
+
+
+def render_deck(games, options, output=None):
+    """
+    The imposition backend: cached per-card PDFs placed on PDF_SHEET_SIZE
+    sheets with bleed and crop marks. Returns PDF bytes, or writes to output.
+    """
+    settings = _settings()
+    layout = sheet_layout(settings['sheet'], settings['bleed'], settings['min_margin'], settings['marks'])
+    with metrics.span('render.impose'):
+        cards = card_pdfs(games, options, settings['bleed'])
+        return impose(cards, layout, marks=settings['marks'], output=output)
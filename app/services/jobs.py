@@ -0,0 +1,131 @@
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from app import db
+from app.models import PdfJob
+from app.services import deck
+from app.services.workers import Cancelled, cancel_scope, check_cancelled
+
+_executor = None
+_executor_lock = threading.Lock()
+# Cancel events of the jobs running or queued in this process
+_cancel_events = {}
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('PDF_JOB_WORKERS', 2),
+                thread_name_prefix="pdf-job"
+            )
+        return _executor
+
+
+def submit(username, ids, download_all, options):
+    """
+    Queues a PDF build and returns its PdfJob. Decks already in the store
+    finish at the 'cached' stage without rendering.
+    """
+    job = PdfJob(
+        id=uuid.uuid4().hex,
+        username=username,
+        params=json.dumps({'ids': ids, 'download_all': download_all, 'options': options}),
+        status='queued',
+        stage='queued',
+        progress=0
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    _cancel_events[job.id] = threading.Event()
+    if app.config.get('PDF_JOBS_EAGER'):
+        _run(app, job.id)
+        db.session.refresh(job)
+    else:
+        _get_executor().submit(_run, app, job.id)
+    return job
+
+
+def get_job(job_id):
+    return db.session.get(PdfJob, job_id)
+
+
+def cancel(job):
+    """
+    Cancels a queued or running job, e.g. when the page that started it
+    is closed. The job stops at its next checkpoint: immediately for
+    outbound work in this process, at the next stage otherwise.
+    """
+    if job.status not in ('queued', 'running'):
+        return job
+    event = _cancel_events.get(job.id)
+    if event is not None:
+        event.set()
+    _update(job, status='cancelled', stage='cancelled')
+    return job
+
+
+def result_path(job):
+    """Path of a finished job's PDF, or None."""
+    if job is None or job.status != 'done':
+        return None
+    return deck.stored_pdf_path(job.result_key)
+
+
+def _update(job, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.session.commit()
+
+
+def _checkpoint(job, **fields):
+    """Stage update that first stops the job if it was cancelled (here or by another process)."""
+    check_cancelled()
+    db.session.refresh(job)
+    if job.status == 'cancelled':
+        raise Cancelled()
+    _update(job, **fields)
+
+
+def _run(app, job_id):
+    with app.app_context(), cancel_scope(_cancel_events.get(job_id)):
+        job = db.session.get(PdfJob, job_id)
+        if job is None:
+            return
+        params = json.loads(job.params)
+        options = params['options']
+        try:
+            # 1. Resolve the game IDs (collection fetch for "download all")
+            _checkpoint(job, status='running', stage='collection', progress=5)
+            ids = deck.resolve_ids(job.username, params['ids'], params['download_all'])
+
+            # 2. Fetch details and descriptions
+            _checkpoint(job, stage='details', progress=15)
+            games = deck.load_games(ids)
+
+            # 3. Serve an identical deck (same cards, data and templates) from the store
+            keys = deck.page_keys(games, options)
+            key = deck.content_key(games, options, keys)
+            if deck.stored_pdf_path(key):
+                _update(job, status='done', stage='cached', progress=100, result_key=key)
+                return
+
+            # 4. Render into the store (pages merged straight to disk)
+            _checkpoint(job, stage='render', progress=70)
+            deck.save_deck_pdf(key, games, options, keys)
+            _update(job, status='done', stage='done', progress=100, result_key=key)
+        except Cancelled:
+            db.session.rollback()
+            print(f"PDF job {job_id} cancelled")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error building PDF for job {job_id}: {e}")
+            _update(job, status='failed', stage='failed', error=str(e))
+        finally:
+            _cancel_events.pop(job_id, None)
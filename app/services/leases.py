@@ -0,0 +1,115 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import has_app_context
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import FetchLease
+from app.services.workers import check_cancelled
+
+# Keys per IN (...) / multi-row INSERT (SQLite caps bound parameters at 999)
+CHUNK_SIZE = 250
+
+
+def _chunks(keys):
+    keys = list(keys)
+    for i in range(0, len(keys), CHUNK_SIZE):
+        yield keys[i:i + CHUNK_SIZE]
+
+
+def acquire(keys, ttl):
+    """
+    Takes the lease on every key that is free or whose holder's lease expired.
+    Returns (owner, taken keys); pass owner to release(). Without an app
+    context, or if the table can't be written, every key counts as taken so
+    the caller simply fetches.
+    """
+    owner = uuid.uuid4().hex
+    keys = list(keys)
+    if not has_app_context() or not keys:
+        return owner, keys
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    try:
+        dialect = db.session.get_bind().dialect.name
+        insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(dialect)
+        for chunk in _chunks(keys):
+            FetchLease.query.filter(FetchLease.key.in_(chunk), FetchLease.expires_at <= now) \
+                .delete(synchronize_session=False)
+            rows = [{'key': key, 'owner': owner, 'expires_at': expires_at, 'waiters': 0} for key in chunk]
+            if insert is not None:
+                db.session.execute(insert(FetchLease.__table__).values(rows).on_conflict_do_nothing())
+                db.session.commit()
+            else:
+                for row in rows:
+                    try:
+                        db.session.add(FetchLease(**row))
+                        db.session.commit()
+                    except IntegrityError:
+                        db.session.rollback()
+        taken = set()
+        for chunk in _chunks(keys):
+            taken.update(key for (key,) in db.session.query(FetchLease.key)
+                         .filter(FetchLease.key.in_(chunk), FetchLease.owner == owner))
+        return owner, [key for key in keys if key in taken]
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error acquiring fetch leases: {e}")
+        return owner, keys
+
+
+def wait(keys, timeout, poll=0.2):
+    """
+    Blocks until no live lease is held on keys (True) or timeout seconds
+    pass (False). Registers as a waiter so the holder publishes its results.
+    """
+    if not has_app_context() or not keys:
+        return True
+    deadline = time.monotonic() + timeout
+    try:
+        for chunk in _chunks(keys):
+            FetchLease.query.filter(FetchLease.key.in_(chunk)) \
+                .update({FetchLease.waiters: FetchLease.waiters + 1}, synchronize_session=False)
+        db.session.commit()
+        while True:
+            now = datetime.utcnow()
+            held = sum(FetchLease.query.filter(FetchLease.key.in_(chunk), FetchLease.expires_at > now).count()
+                       for chunk in _chunks(keys))
+            db.session.commit()  # end the read so the next poll sees the holder's writes
+            if not held:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            check_cancelled()
+            time.sleep(poll)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error waiting for fetch leases: {e}")
+        return False
+
+
+def watched(owner):
+    """Keys leased by owner that another process is waiting on."""
+    if not has_app_context():
+        return set()
+    try:
+        return {key for (key,) in db.session.query(FetchLease.key)
+                .filter(FetchLease.owner == owner, FetchLease.waiters > 0)}
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error reading fetch leases: {e}")
+        return set()
+
+
+def release(owner):
+    """Drops every lease held by owner."""
+    if not has_app_context():
+        return
+    try:
+        FetchLease.query.filter_by(owner=owner).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error releasing fetch leases: {e}")
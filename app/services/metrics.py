@@ -0,0 +1,161 @@
+import threading
+import time
+from contextlib import nullcontext
+
+from flask import g, has_request_context
+
+# Histogram bucket bounds (seconds) for span durations
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Flipped by configure(); when False, span() and count() return immediately
+ENABLED = False
+
+_lock = threading.Lock()
+_spans = {}     # name -> [bucket counts..., count, sum]
+_counters = {}  # (name, labels) -> value
+_null = nullcontext()
+_local = threading.local()
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    """Times a block under name: `with metrics.span('bgg.collection'): ...`."""
+    return _Span(name) if ENABLED else _null
+
+
+def observe(name, seconds):
+    """Records one duration for span name, and for the current request's Server-Timing."""
+    with _lock:
+        series = _spans.get(name)
+        if series is None:
+            series = _spans[name] = [0] * (len(BUCKETS) + 2) + [0.0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                series[i] += 1
+        series[-3] += 1  # +Inf
+        series[-2] += 1
+        series[-1] += seconds
+    if has_request_context():
+        timings = g.get('_server_timing')
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + seconds
+
+
+def count(name, value=1, **labels):
+    """Adds value to counter name, e.g. count('cache_lookups', namespace='description', result='hit')."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def cache_result(namespace, hit, value=1):
+    count('cache_lookups', value, namespace=namespace, result='hit' if hit else 'miss')
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{str(value)}"' for name, value in pairs) + '}'
+
+
+def render_prometheus(gauges=None):
+    """
+    The collected spans (as histograms), counters and the given gauges
+    ({name: value} or {name: {label tuple: value}}) in Prometheus text format.
+    """
+    with _lock:
+        spans = {name: list(series) for name, series in _spans.items()}
+        counters = dict(_counters)
+
+    lines = [
+        '# HELP bggdeck_span_seconds Time spent in instrumented sections.',
+        '# TYPE bggdeck_span_seconds histogram',
+    ]
+    for name, series in sorted(spans.items()):
+        for bound, value in zip(BUCKETS, series):
+            lines.append(f'bggdeck_span_seconds_bucket{{span="{name}",le="{bound}"}} {value}')
+        lines.append(f'bggdeck_span_seconds_bucket{{span="{name}",le="+Inf"}} {series[-3]}')
+        lines.append(f'bggdeck_span_seconds_count{{span="{name}"}} {series[-2]}')
+        lines.append(f'bggdeck_span_seconds_sum{{span="{name}"}} {series[-1]:.6f}')
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f'# TYPE bggdeck_{name}_total counter')
+        for (counter, labels), value in sorted(counters.items()):
+            if counter == name:
+                lines.append(f'bggdeck_{name}_total{_labels(labels)} {value}')
+
+    for name, value in sorted((gauges or {}).items()):
+        lines.append(f'# TYPE bggdeck_{name} gauge')
+        if isinstance(value, dict):
+            for labels, sample in sorted(value.items()):
+                lines.append(f'bggdeck_{name}{_labels(labels)} {sample}')
+        else:
+            lines.append(f'bggdeck_{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _template_started(sender, template, context, **extra):
+    stack = getattr(_local, 'templates', None)
+    if stack is None:
+        stack = _local.templates = []
+    stack.append(time.perf_counter())
+
+
+def _template_rendered(sender, template, context, **extra):
+    stack = getattr(_local, 'templates', None)
+    if stack:
+        observe('render.template', time.perf_counter() - stack.pop())
+
+
+def configure(app):
+    """
+    Turns instrumentation on for the process when METRICS_ENABLED, times
+    every render_template call, and (with SERVER_TIMING) adds a
+    Server-Timing header with the request's spans to each response.
+    """
+    global ENABLED
+    ENABLED = bool(app.config.get('METRICS_ENABLED', True))
+    if not ENABLED:
+        return
+
+    from flask import before_render_template, template_rendered
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_rendered, app)
+
+    if not app.config.get('SERVER_TIMING', True):
+        return
+
+    @app.before_request
+    def start_server_timing():
+        g._server_timing = {}
+
+    @app.after_request
+    def add_server_timing(response):
+        timings = g.get('_server_timing')
+        if timings:
+            response.headers['Server-Timing'] = ', '.join(
+                f'{name.replace(".", "-")};dur={seconds * 1000:.1f}' for name, seconds in timings.items()
+            )
+        return response
@@ -1,28 +1,141 @@
-from weasyprint import HTML, CSS
+from weasyprint import HTML
+from weasyprint.urls import URLFetcher, URLFetcherResponse
 from flask import current_app
+from app.services.images import ImageCache, cache_settings, is_image_url
+from app.services import metrics
+from app.services.styles import deck_css, get_stylesheet
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pypdf import PdfReader, PdfWriter
+import multiprocessing
 import os
+import threading
+import time
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _css_path():
+    # Define the path to the compiled CSS
+    return os.path.join(current_app.static_folder, 'dist', 'output.css')
+
+
+class CachedImageFetcher(URLFetcher):
+    """Serves remote card images from the local ImageCache, resized for print."""
+
+    def __init__(self, image_cache, **kwargs):
+        super().__init__(**kwargs)
+        self.image_cache = image_cache
+
+    def fetch(self, url, headers=None):
+        if is_image_url(url):
+            path = self.image_cache.get(url)
+            if path:
+                return URLFetcherResponse(url, open(path, 'rb'), {'Content-Type': 'image/jpeg'})
+        return super().fetch(url, headers)
+
+
+def _document(html_content, base_url, css_text, image_settings=None):
+    # css_text is None when the compiled CSS doesn't exist (it should be built by Tailwind)
+    stylesheets = [get_stylesheet(css_text, base_url)] if css_text else []
+    url_fetcher = CachedImageFetcher(ImageCache(**image_settings)) if image_settings else None
+
+    # base_url is crucial for resolving local images (e.g. /static/images/...)
+    # We set it to the static folder or root path
+    return HTML(string=html_content, base_url=base_url, url_fetcher=url_fetcher), stylesheets
+
+
+def _render(html_content, base_url, css_text, image_settings=None):
+    html, stylesheets = _document(html_content, base_url, css_text, image_settings)
+    return html.write_pdf(stylesheets=stylesheets)
+
+
+def layout_pdf(html_content):
+    """
+    Renders HTML content in two timed steps for profiling: returns
+    (layout seconds, write seconds, PDF bytes).
+    """
+    html, stylesheets = _document(html_content, current_app.static_folder, deck_css(_css_path()), cache_settings())
+    start = time.perf_counter()
+    document = html.render(stylesheets=stylesheets)
+    laid_out = time.perf_counter()
+    pdf_bytes = document.write_pdf()
+    return laid_out - start, time.perf_counter() - laid_out, pdf_bytes
+
 
 def generate_pdf(html_content):
     """
     Renders HTML content to a PDF using WeasyPrint.
     """
-    # Define the path to the compiled CSS
-    css_path = os.path.join(current_app.static_folder, 'dist', 'output.css')
-    
-    # Ensure the CSS file exists (it should be built by Tailwind)
-    if not os.path.exists(css_path):
-        # Fallback to src/input.css or style.css if dist doesn't exist (dev mode)
-        # But for WeasyPrint we really need the full CSS.
-        # Let's assume output.css exists or fallback to empty list
-        stylesheets = []
-    else:
-        stylesheets = [CSS(filename=css_path)]
-
-    # Generate PDF
-    # base_url is crucial for resolving local images (e.g. /static/images/...)
-    # We set it to the static folder or root path
-    pdf_bytes = HTML(string=html_content, base_url=current_app.static_folder).write_pdf(
-        stylesheets=stylesheets
-    )
-    
-    return pdf_bytes
+    with metrics.span('render.pdf'):
+        return _render(html_content, current_app.static_folder, deck_css(_css_path()), cache_settings())
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: workers must not inherit the parent's threads/DB connections.
+            # Recycling workers keeps per-process peak memory bounded.
+            _pool = ProcessPoolExecutor(
+                max_workers=current_app.config.get('PDF_RENDER_PROCESSES') or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+                max_tasks_per_child=current_app.config.get('PDF_RENDER_TASKS_PER_CHILD', 20)
+            )
+        return _pool
+
+
+def merge_pdfs(parts, output=None):
+    """
+    Concatenates PDF documents (bytes) in order into one PDF. Returns the
+    bytes, or writes to the binary file `output` when given.
+    """
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(BytesIO(part)))
+    if output is not None:
+        writer.write(output)
+        return None
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def split_pdf(data):
+    """Splits a PDF (bytes) into one single-page PDF per page."""
+    pages = []
+    for page in PdfReader(BytesIO(data)).pages:
+        writer = PdfWriter()
+        writer.add_page(page)
+        output = BytesIO()
+        writer.write(output)
+        pages.append(output.getvalue())
+    return pages
+
+
+def render_pdfs(html_docs):
+    """
+    Renders each HTML document to PDF bytes, in order. Several documents
+    are rendered in parallel in the process pool unless PDF_RENDER_PROCESSES is 1.
+    """
+    if len(html_docs) == 1 or current_app.config.get('PDF_RENDER_PROCESSES', 0) == 1:
+        return [generate_pdf(html) for html in html_docs]
+
+    base_url = current_app.static_folder
+    css_text = deck_css(_css_path())
+    image_settings = cache_settings()
+    pool = _get_pool()
+    with metrics.span('render.pdf_pool'):
+        futures = [pool.submit(_render, html, base_url, css_text, image_settings) for html in html_docs]
+        return [future.result() for future in futures]
+
+
+def generate_pdf_sharded(html_shards):
+    """
+    Renders each HTML shard (a whole number of pages) in the process pool
+    and merges the partial PDFs in order.
+    """
+    if len(html_shards) == 1:
+        return generate_pdf(html_shards[0])
+    return merge_pdfs(render_pdfs(html_shards))
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from app import db
+from app.services import bgg, catalog, collection
+
+_executor = None
+_executor_lock = threading.Lock()
+# Users with a warmup queued or running in this process
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('PREFETCH_WORKERS', 1),
+                thread_name_prefix="prefetch"
+            )
+        return _executor
+
+
+def schedule(username, page, per_page, sort='name', order='asc'):
+    """
+    Queues a background warmup of the Game table after a /collection page
+    is served (see warm). Returns False when prefetching is disabled or a
+    warmup for this user is already queued or running.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get('PREFETCH_PAGES', 1) and not app.config.get('PREFETCH_WARMUP', True):
+        return False
+    key = username.strip().lower()
+    with _pending_lock:
+        if key in _pending:
+            return False
+        _pending.add(key)
+    _get_executor().submit(_run, app, key, username, page, per_page, sort, order)
+    return True
+
+
+def _run(app, key, username, page, per_page, sort, order):
+    with app.app_context():
+        try:
+            count = warm(username, page, per_page, sort, order)
+            print(f"Prefetched details for {count} games of {username}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error prefetching collection of {username}: {e}")
+        finally:
+            with _pending_lock:
+                _pending.discard(key)
+
+
+def neighbour_pages(page, depth, pages):
+    """Pages within depth of page, nearest first, next before previous."""
+    neighbours = []
+    for distance in range(1, depth + 1):
+        for candidate in (page + distance, page - distance):
+            if 1 <= candidate <= pages:
+                neighbours.append(candidate)
+    return neighbours
+
+
+def warm(username, page, per_page, sort='name', order='asc'):
+    """
+    Fetches and stores details for the games on the PREFETCH_PAGES pages
+    either side of page, so flipping to them is a DB-only read. With
+    PREFETCH_WARMUP the rest of the collection follows, in batches of
+    PREFETCH_BATCH_SIZE; once every game has a row, /collection sorts and
+    filters on the full stats in SQL. Returns the number of games fetched.
+    """
+    config = current_app.config
+    depth = config.get('PREFETCH_PAGES', 1)
+    batch_size = config.get('PREFETCH_BATCH_SIZE', 100)
+
+    ids = []
+    if depth:
+        pages = collection.paginate_entries(username, page=page, per_page=per_page, sort=sort, order=order).pages
+        for neighbour in neighbour_pages(page, depth, pages):
+            entries = collection.paginate_entries(username, page=neighbour, per_page=per_page,
+                                                  sort=sort, order=order).items
+            ids.extend(str(entry.bgg_id) for entry in entries)
+    fetched = _fill(ids, batch_size)
+    if config.get('PREFETCH_WARMUP', True):
+        fetched += _fill(collection.entry_ids(username, sort=sort, order=order), batch_size)
+    return fetched
+
+
+def _fill(ids, batch_size):
+    missing = catalog.missing_ids(ids)
+    for i in range(0, len(missing), batch_size):
+        bgg.process_games_data(bgg.fetch_things(missing[i:i + batch_size]))
+    return len(missing)
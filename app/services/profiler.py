@@ -0,0 +1,127 @@
+import time
+import tracemalloc
+from io import BytesIO
+
+import requests
+from PIL import Image
+from flask import current_app
+from app.services import images
+from app.services.deck import render_deck_html
+
+
+def _peak_during(fn, *args):
+    """(result, seconds, peak traced bytes above the starting level) of fn(*args)."""
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return result, elapsed, max(0, peak - base)
+
+
+def _image_cost(url, settings):
+    """Fetch and decode/resize cost of one cover, measured outside the image cache."""
+    cost = {'image_bytes': None, 'image_pixels': None, 'fetch_ms': None,
+            'decode_ms': None, 'decode_peak': None, 'processed_bytes': None}
+    if not url or not images.is_image_url(url):
+        return cost
+    try:
+        response, fetch_seconds, _ = _peak_during(lambda: requests.get(url, timeout=10))
+        response.raise_for_status()
+        data = response.content
+        cost.update(image_bytes=len(data), fetch_ms=fetch_seconds * 1000)
+        with Image.open(BytesIO(data)) as img:
+            cost['image_pixels'] = img.width * img.height
+        cache = images.ImageCache(**settings) if settings else None
+        if cache is not None:
+            processed, decode_seconds, decode_peak = _peak_during(cache.process, data)
+            cost.update(decode_ms=decode_seconds * 1000, decode_peak=decode_peak, processed_bytes=len(processed))
+    except Exception as e:
+        print(f"Error profiling image {url}: {e}")
+    return cost
+
+
+def profile_deck(games, options, per_card=True, top=10):
+    """
+    Renders a deck (GameRecords) under tracemalloc and timing probes.
+    Returns a report with the deck's peak traced memory, HTML/layout/write
+    times, PDF size and the largest allocation sites left afterwards, and
+    per card: cover fetch and decode cost, description length and, with
+    per_card, the size of the card rendered as a PDF on its own.
+    """
+    from app.services.pdf import layout_pdf
+
+    settings = images.cache_settings()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(current_app.config.get('PROFILE_TRACEBACK_DEPTH', 1))
+    try:
+        cards = []
+        for game in games:
+            card = {'bgg_id': game.bgg_id, 'name': game.name,
+                    'description_chars': len(game.description or '')}
+            card.update(_image_cost(game.image, settings))
+            cards.append(card)
+
+        # Warm the cover cache first so the layout measurement is the layout alone
+        images.prefetch([game.image for game in games], settings)
+
+        tracemalloc.clear_traces()
+        html, html_seconds, html_peak = _peak_during(render_deck_html, games, options)
+        (layout_seconds, write_seconds, pdf_bytes), _, render_peak = _peak_during(layout_pdf, html)
+        snapshot = tracemalloc.take_snapshot()
+
+        if per_card:
+            for game, card in zip(games, cards):
+                (_, _, card_pdf), card_seconds, card_peak = _peak_during(
+                    layout_pdf, render_deck_html([game], options))
+                card.update(pdf_bytes=len(card_pdf), render_ms=card_seconds * 1000, render_peak=card_peak)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    return {
+        'cards': len(games),
+        'peak_memory': max(html_peak, render_peak),
+        'html_ms': html_seconds * 1000,
+        'layout_ms': layout_seconds * 1000,
+        'write_ms': write_seconds * 1000,
+        'pdf_bytes': len(pdf_bytes),
+        'top_allocations': [
+            {'site': str(stat.traceback), 'bytes': stat.size, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:top]
+        ],
+        'card_details': cards,
+    }
+
+
+def format_report(report, limit=20):
+    """Plain-text rendering of a profile_deck report, heaviest cards first."""
+    mb = 1024 * 1024
+    lines = [
+        f"Cards: {report['cards']}  PDF: {report['pdf_bytes'] / mb:.2f} MB  "
+        f"Peak traced memory: {report['peak_memory'] / mb:.1f} MB",
+        f"HTML: {report['html_ms']:.0f} ms  Layout: {report['layout_ms']:.0f} ms  "
+        f"Write: {report['write_ms']:.0f} ms",
+        "",
+        "Largest allocation sites still live after rendering:",
+    ]
+    lines += [f"  {a['bytes'] / mb:8.2f} MB  {a['count']:>7}  {a['site']}" for a in report['top_allocations']]
+
+    def weight(card):
+        return (card.get('pdf_bytes') or 0, card.get('decode_peak') or 0, card.get('image_bytes') or 0)
+
+    def num(value, scale=1, fmt='{:.0f}'):
+        return fmt.format(value / scale) if value is not None else '-'
+
+    lines += ["", f"{'bgg_id':>8} {'pdf KB':>8} {'render ms':>9} {'image KB':>8} {'megapx':>6} "
+                  f"{'fetch ms':>8} {'decode ms':>9} {'decode MB':>9} {'desc':>5}  name"]
+    for card in sorted(report['card_details'], key=weight, reverse=True)[:limit]:
+        lines.append(
+            f"{card['bgg_id']:>8} {num(card.get('pdf_bytes'), 1024):>8} {num(card.get('render_ms')):>9} "
+            f"{num(card['image_bytes'], 1024):>8} {num(card['image_pixels'], 1e6, '{:.1f}'):>6} "
+            f"{num(card['fetch_ms']):>8} {num(card['decode_ms']):>9} {num(card['decode_peak'], mb, '{:.1f}'):>9} "
+            f"{card['description_chars']:>5}  {card['name']}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,141 @@
+from datetime import datetime
+
+
+def number(value, cast=int):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def element_text(elem):
+    if elem is None or elem.text is None:
+        return None
+    return elem.text.strip() or None
+
+
+def element_value(elem, cast=int):
+    return number(elem.get('value'), cast) if elem is not None else None
+
+
+class GameRecord:
+    """
+    One game as it moves between BGG, the games table and the templates.
+    Slotted so large collections don't pay for a dict per game.
+    """
+
+    FIELDS = ('bgg_id', 'name', 'image', 'thumbnail', 'description', 'year_published',
+              'min_players', 'max_players', 'playing_time', 'average_weight',
+              'designers', 'artists')
+    # last_updated is the games row's timestamp (None until saved); it versions
+    # rendered card fragments and is not part of the game's data
+    __slots__ = FIELDS + ('last_updated',)
+
+    def __init__(self, bgg_id, name, image=None, thumbnail=None, description=None,
+                 year_published=None, min_players=None, max_players=None, playing_time=None,
+                 average_weight=None, designers=(), artists=(), last_updated=None):
+        self.bgg_id = bgg_id
+        self.name = name
+        self.image = image
+        self.thumbnail = thumbnail
+        self.description = description
+        self.year_published = year_published
+        self.min_players = min_players
+        self.max_players = max_players
+        self.playing_time = playing_time
+        self.average_weight = average_weight
+        self.designers = tuple(designers)
+        self.artists = tuple(artists)
+        self.last_updated = last_updated
+
+    def __repr__(self):
+        return f"<GameRecord {self.bgg_id} {self.name!r}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, GameRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+
+    @classmethod
+    def from_xml(cls, elem):
+        """From a /thing <item> element."""
+        names = elem.findall('name')
+        primary = next((n for n in names if n.get('type') == 'primary'), names[0] if names else None)
+        designers, artists = [], []
+        for link in elem.iterfind('link'):
+            if link.get('type') == 'boardgamedesigner':
+                designers.append(link.get('value'))
+            elif link.get('type') == 'boardgameartist':
+                artists.append(link.get('value'))
+        return cls(
+            bgg_id=int(elem.get('id')),
+            name=primary.get('value') if primary is not None else None,
+            image=element_text(elem.find('image')),
+            thumbnail=element_text(elem.find('thumbnail')),
+            description=element_text(elem.find('description')),
+            year_published=element_value(elem.find('yearpublished')),
+            min_players=element_value(elem.find('minplayers')),
+            max_players=element_value(elem.find('maxplayers')),
+            playing_time=element_value(elem.find('playingtime')),
+            average_weight=element_value(elem.find('statistics/ratings/averageweight'), float),
+            designers=designers,
+            artists=artists,
+        )
+
+    @classmethod
+    def from_model(cls, game):
+        """From a Game row (credits come from its eagerly loaded relationships)."""
+        return cls(
+            bgg_id=game.bgg_id,
+            name=game.name,
+            image=game.image,
+            thumbnail=game.thumbnail,
+            description=game.description,
+            year_published=game.year_published,
+            min_players=game.min_players,
+            max_players=game.max_players,
+            playing_time=game.playing_time,
+            average_weight=game.average_weight,
+            designers=[p.name for p in game.designers],
+            artists=[p.name for p in game.artists],
+            last_updated=game.last_updated,
+        )
+
+    def to_row(self):
+        """A `games` table row (credits are written separately)."""
+        return {
+            'bgg_id': self.bgg_id,
+            'name': self.name,
+            'image': self.image,
+            'thumbnail': self.thumbnail,
+            'description': self.description,
+            'year_published': self.year_published,
+            'min_players': self.min_players,
+            'max_players': self.max_players,
+            'playing_time': self.playing_time,
+            'average_weight': self.average_weight or 0.0,
+            'last_updated': datetime.utcnow(),
+        }
+
+    def to_fields(self):
+        """JSON-ready field list; GameRecord(*fields) rebuilds the record."""
+        return [list(value) if isinstance(value, tuple) else value
+                for value in (getattr(self, field) for field in self.FIELDS)]
+
+    def to_context(self):
+        """The mapping the card and collection templates render."""
+        return {
+            'id': str(self.bgg_id),
+            'name': self.name,
+            'image': self.image,
+            'thumbnail': self.thumbnail,
+            'description': self.description,
+            'yearpublished': self.year_published,
+            'minplayers': self.min_players,
+            'maxplayers': self.max_players,
+            'playingtime': self.playing_time,
+            'averageweight': self.average_weight,
+            'designers': list(self.designers),
+            'artists': list(self.artists),
+            'last_updated': self.last_updated,
+        }
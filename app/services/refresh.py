@@ -0,0 +1,85 @@
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import or_
+from app import db
+from app.models import Game
+from app.services import bgg
+from app.services.descriptions import describe
+
+
+def stale_game_ids(max_age, limit):
+    """BGG IDs of the games not refreshed within max_age, stalest first."""
+    cutoff = datetime.utcnow() - max_age
+    rows = (Game.query
+            .filter(or_(Game.last_updated.is_(None), Game.last_updated < cutoff))
+            .order_by(Game.last_updated.asc().nullsfirst())
+            .limit(limit)
+            .with_entities(Game.bgg_id))
+    return [row.bgg_id for row in rows]
+
+
+def refresh_stale_games(max_age=None, limit=None, batch_size=None):
+    """
+    Re-fetches the stalest games through fetch_things and upserts them.
+    At most `limit` games are refreshed per run, `batch_size` per /thing
+    batch, so a run stays within the BGG client's rate budget. Descriptions
+    come from the /thing response; stored ones are kept when it has none.
+    Games whose /thing request failed stay stale and are retried next run.
+    Returns the number of games refreshed.
+    """
+    config = current_app.config
+    if max_age is None:
+        max_age = timedelta(hours=config.get('REFRESH_MAX_AGE_HOURS', 168))
+    limit = limit or config.get('REFRESH_LIMIT', 200)
+    batch_size = batch_size or config.get('REFRESH_BATCH_SIZE', 100)
+
+    ids = stale_game_ids(max_age, limit)
+    refreshed = 0
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i:i + batch_size]
+        try:
+            things, failed = bgg.fetch_things_checked([str(gid) for gid in batch])
+        except Exception as e:
+            print(f"Error refreshing games: {e}")
+            break
+        refreshed += bgg.save_games(describe(things, scrape=False))
+
+        # Games BGG answered for but no longer returns are stamped too, so they don't pin the
+        # head of the queue; games in failed chunks stay stale and are retried next run
+        returned = {thing.bgg_id for thing in things} | {int(gid) for gid in failed}
+        missing = [gid for gid in batch if gid not in returned]
+        if missing:
+            Game.query.filter(Game.bgg_id.in_(missing)).update(
+                {Game.last_updated: datetime.utcnow()}, synchronize_session=False)
+            db.session.commit()
+    return refreshed
+
+
+_scheduler = None
+
+
+def start_scheduler(app):
+    """Starts a daemon thread that refreshes stale games every REFRESH_INTERVAL_MINUTES."""
+    global _scheduler
+    interval = app.config.get('REFRESH_INTERVAL_MINUTES', 0)
+    if not interval or _scheduler is not None:
+        return None
+
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval * 60):
+            with app.app_context():
+                try:
+                    count = refresh_stale_games()
+                    print(f"Refreshed {count} stale games")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error refreshing stale games: {e}")
+
+    _scheduler = threading.Thread(target=run, name="game-refresh", daemon=True)
+    _scheduler.stop = stop
+    _scheduler.start()
+    return _scheduler
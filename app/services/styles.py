@@ -0,0 +1,116 @@
+import hashlib
+import os
+import re
+import threading
+
+import tinycss2
+from flask import current_app
+from app.services.deck import PDF_TEMPLATES
+
+CLASS_ATTR_RE = re.compile(r'class="([^"]*)"')
+
+_lock = threading.Lock()
+_deck_css = {}     # (path, mtime, size, templates digest) -> pruned CSS text
+_stylesheets = {}  # (CSS digest, base_url) -> weasyprint.CSS
+
+
+def template_classes(names=PDF_TEMPLATES):
+    """Static class names used in the given templates (Jinja expressions are skipped)."""
+    env = current_app.jinja_env
+    classes = set()
+    for name in names:
+        source, _, _ = env.loader.get_source(env, name)
+        for attr in CLASS_ATTR_RE.findall(source):
+            classes.update(token for token in attr.split() if '{' not in token and '}' not in token)
+    return classes
+
+
+def _split_selectors(prelude):
+    selectors, current = [], []
+    for token in prelude:
+        if token.type == 'literal' and token.value == ',':
+            selectors.append(current)
+            current = []
+        else:
+            current.append(token)
+    selectors.append(current)
+    return selectors
+
+
+def _selector_used(tokens, classes):
+    # Only top-level ".name" tokens are checked; selectors nested in
+    # functions such as :is() are kept, which errs on the side of keeping rules.
+    names = {b.value for a, b in zip(tokens, tokens[1:])
+             if a.type == 'literal' and a.value == '.' and b.type == 'ident'}
+    return names <= classes
+
+
+def _prune_rules(rules, classes):
+    for rule in rules:
+        if rule.type == 'qualified-rule':
+            kept = [tinycss2.serialize(s).strip() for s in _split_selectors(rule.prelude)
+                    if _selector_used(s, classes)]
+            if kept:
+                yield f"{','.join(kept)}{{{tinycss2.serialize(rule.content)}}}"
+        elif rule.type == 'at-rule' and rule.lower_at_keyword in ('media', 'supports') and rule.content:
+            inner = ''.join(_prune_rules(
+                tinycss2.parse_rule_list(rule.content, skip_comments=True, skip_whitespace=True), classes))
+            if inner:
+                yield f"@{rule.at_keyword}{tinycss2.serialize(rule.prelude)}{{{inner}}}"
+        elif rule.type == 'at-rule':
+            yield rule.serialize()
+
+
+def prune_css(css_text, classes):
+    """Drops rules whose class selectors never occur in `classes`."""
+    rules = tinycss2.parse_stylesheet(css_text, skip_comments=True, skip_whitespace=True)
+    return ''.join(_prune_rules(rules, classes))
+
+
+def deck_css(css_path):
+    """
+    Returns the stylesheet text for PDF renders, or None if it is missing.
+    The Tailwind output is pruned to the card templates' classes and cached
+    per process, keyed on the file's mtime/size and the templates' hash.
+    """
+    try:
+        stat = os.stat(css_path)
+    except OSError:
+        return None
+
+    prune = current_app.config.get('PDF_PRUNE_CSS', True)
+    classes = template_classes() if prune else set()
+    digest = hashlib.sha1(' '.join(sorted(classes)).encode('utf-8')).hexdigest()
+    key = (css_path, stat.st_mtime_ns, stat.st_size, prune, digest)
+
+    with _lock:
+        if key in _deck_css:
+            return _deck_css[key]
+
+    with open(css_path, 'r') as f:
+        css_text = f.read()
+    if prune:
+        css_text = prune_css(css_text, classes)
+
+    with _lock:
+        # Drop superseded versions of the same file
+        for old_key in [k for k in _deck_css if k[0] == css_path]:
+            del _deck_css[old_key]
+        _deck_css[key] = css_text
+    return css_text
+
+
+def get_stylesheet(css_text, base_url=None):
+    """Parses css_text into a WeasyPrint CSS object once per process."""
+    from weasyprint import CSS
+
+    key = (hashlib.sha1(css_text.encode('utf-8')).hexdigest(), base_url)
+    with _lock:
+        stylesheet = _stylesheets.get(key)
+    if stylesheet is None:
+        stylesheet = CSS(string=css_text, base_url=base_url)
+        with _lock:
+            if len(_stylesheets) >= 8:
+                _stylesheets.clear()
+            _stylesheets[key] = stylesheet
+    return stylesheet
@@ -0,0 +1,178 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, has_app_context
+
+
+class Cancelled(Exception):
+    """Raised when the work's cancel scope was cancelled (e.g. the client went away)."""
+
+
+_cancel_event = ContextVar('cancel_event', default=None)
+
+
+@contextmanager
+def cancel_scope(event):
+    """Makes SharedExecutor.map calls in this context stop early once event is set."""
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+def check_cancelled():
+    """Raises Cancelled if the current cancel scope has been cancelled."""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise Cancelled()
+
+
+class SharedExecutor:
+    """
+    One bounded thread pool for all outbound I/O in the process.
+    Tasks for a host wait in that host's queue and are handed to the pool
+    only while the host has a free slot, so the number of connections to
+    any one host is capped however many requests are being served, and a
+    busy host never ties up threads that other hosts' tasks could use.
+    Tasks still queued when their cancel scope is cancelled are dropped
+    without running.
+    """
+
+    def __init__(self, max_workers=16, per_host=4):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="outbound")
+        self._lock = threading.Lock()
+        self._limits = {}
+        self._pending = {}  # host -> deque of (future, fn, item, cancel) waiting for a slot
+        self._in_use = {}
+        self._queued = 0
+        self._active = 0
+        self._local = threading.local()
+
+    def set_host_limit(self, host, limit):
+        with self._lock:
+            self._limits[host] = limit
+        self._dispatch(host)
+
+    def _submit(self, fn, item, host, cancel):
+        if not host:
+            return self._pool.submit(self._run, fn, item, cancel)
+        future = Future()
+        with self._lock:
+            self._pending.setdefault(host, deque()).append((future, fn, item, cancel))
+        self._dispatch(host)
+        return future
+
+    def _dispatch(self, host):
+        # Moves the host's queued tasks onto the pool while it has free slots
+        while True:
+            with self._lock:
+                pending = self._pending.get(host)
+                if not pending or self._in_use.get(host, 0) >= self._limits.get(host, self.per_host):
+                    return
+                future, fn, item, cancel = pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue  # cancelled while queued; map() already uncounted it
+                self._in_use[host] = self._in_use.get(host, 0) + 1
+            self._pool.submit(self._run_hosted, future, fn, item, host, cancel)
+
+    def _run_hosted(self, future, fn, item, host, cancel):
+        error = result = None
+        try:
+            result = self._run(fn, item, cancel)
+        except BaseException as e:
+            error = e
+        # Free the slot before the caller sees the result
+        with self._lock:
+            self._in_use[host] -= 1
+        self._dispatch(host)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _run(self, fn, item, cancel):
+        with self._lock:
+            self._queued -= 1
+        if cancel is not None and cancel.is_set():
+            return None
+        with self._lock:
+            self._active += 1
+        self._local.worker = True
+        try:
+            return fn(item)
+        finally:
+            self._local.worker = False
+            with self._lock:
+                self._active -= 1
+
+    def map(self, fn, items, host=None):
+        """
+        Runs fn over items on the pool, preserving order. host is a hostname
+        or a function of the item. Raises Cancelled if the caller's cancel
+        scope is cancelled while waiting.
+        """
+        items = list(items)
+        cancel = _cancel_event.get()
+        host_of = host if callable(host) else (lambda item: host)
+        # Nested calls from a pool thread run inline so they can't starve the pool
+        if len(items) <= 1 or getattr(self._local, 'worker', False):
+            results = []
+            for item in items:
+                check_cancelled()
+                results.append(fn(item))
+            return results
+
+        with self._lock:
+            self._queued += len(items)
+        futures = [self._submit(fn, item, host_of(item), cancel) for item in items]
+        try:
+            results = []
+            for future in futures:
+                while True:
+                    if cancel is not None and cancel.is_set():
+                        raise Cancelled()
+                    try:
+                        results.append(future.result(timeout=0.5 if cancel is not None else None))
+                        break
+                    except FutureTimeout:
+                        continue
+            return results
+        except Cancelled:
+            for future in futures:
+                if future.cancel():
+                    with self._lock:
+                        self._queued -= 1
+            raise
+
+    def stats(self):
+        """Pool size, tasks waiting for a thread or host slot, tasks running, and slots in use per host."""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'queued': self._queued,
+                'active': self._active,
+                'hosts': dict(self._in_use),
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the process-wide SharedExecutor, sized from app config on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            config = current_app.config if has_app_context() else {}
+            _executor = SharedExecutor(
+                max_workers=config.get('OUTBOUND_WORKERS', 16),
+                per_host=config.get('OUTBOUND_PER_HOST', 4),
+            )
+        return _executor
@@ -0,0 +1,7 @@
+"""
+Offline benchmarks: the app against a local stand-in for BoardGameGeek.
+
+    python -m benchmarks --sizes 10,500,5000 --latency 0.05 --queued 1 --throttle 0.05
+
+See benchmarks/__main__.py for the options. Results go to stdout and bench_output.txt.
+"""
@@ -0,0 +1,190 @@
+"""
+Runs the benchmark scenarios against a local BGG stand-in and reports
+latency percentiles, peak RSS and upstream request counts.
+
+    python -m benchmarks [--sizes 10,500,5000] [--rounds 5] [--latency 0.05]
+                         [--queued 1] [--throttle 0.05] [--pdf-max-size 500]
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks import fixtures
+from benchmarks.server import FixtureServer
+
+SCENARIOS = ('collection_cold', 'collection_page', 'sort_change', 'ingest', 'pdf_cold', 'pdf_repeat')
+SORTS = (('weight', 'desc'), ('time', 'asc'), ('year', 'desc'), ('players', 'asc'), ('name', 'asc'))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def make_app(workdir):
+    from config import Config
+    from app import create_app, db
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        PDF_CACHE_DIR = os.path.join(workdir, 'pdf_cache')
+        IMAGE_CACHE_DIR = os.path.join(workdir, 'image_cache')
+        PDF_JOBS_EAGER = True
+        BGG_RATE_LIMIT = 0  # the stand-in server needs no politeness delay
+        BGG_RETRY_BASE_DELAY = 0.01
+        BGG_RETRY_MAX_DELAY = 0.05
+        PREFETCH_PAGES = 0  # keep background work out of the measurements
+        PREFETCH_WARMUP = False
+        REFRESH_INTERVAL_MINUTES = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def weasyprint_available():
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def reset_state(app, pdfs=True):
+    """Empties every table and, with pdfs, the stored PDFs and card fragments."""
+    from app import db
+    from app.services.fragments import get_cache
+
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        if pdfs:
+            shutil.rmtree(app.config['PDF_CACHE_DIR'], ignore_errors=True)
+            get_cache().clear()
+
+
+class Bench:
+    def __init__(self, app, server, rounds):
+        self.app = app
+        self.client = app.test_client()
+        self.server = server
+        self.rounds = rounds
+
+    def measure(self, setup, run, rounds=None):
+        """Times run(i) over rounds, calling the untimed setup(i) before each."""
+        latencies, upstream, errors = [], 0, 0
+        for i in range(rounds or self.rounds):
+            if setup:
+                setup(i)
+            self.server.reset()
+            start = time.perf_counter()
+            ok = run(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            upstream += self.server.upstream_requests()
+            errors += 0 if ok else 1
+        return {
+            'p50': percentile(latencies, 50), 'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99), 'max': max(latencies),
+            'upstream': upstream / len(latencies), 'errors': errors, 'rss': peak_rss_mb(),
+        }
+
+    def get(self, **params):
+        response = self.client.get('/collection', query_string=params)
+        return response.status_code == 200 and b'processing' not in response.data[:2000].lower()
+
+    def scenario(self, name, size):
+        username = fixtures.username_for(size)
+        per_page = 24
+        pages = max(1, -(-size // per_page))
+
+        if name == 'collection_cold':
+            return self.measure(lambda i: reset_state(self.app), lambda i: self.get(username=username))
+        if name == 'collection_page':
+            return self.measure(None, lambda i: self.get(username=username, page=i % pages + 1))
+        if name == 'sort_change':
+            return self.measure(None, lambda i: self.get(username=username, sort=SORTS[i % len(SORTS)][0],
+                                                         order=SORTS[i % len(SORTS)][1]))
+        if name == 'ingest':
+            return self.measure(lambda i: reset_state(self.app, pdfs=False), lambda i: self.ingest(size))
+        if name == 'pdf_cold':
+            return self.measure(lambda i: reset_state(self.app), lambda i: self.pdf(username))
+        if name == 'pdf_repeat':
+            return self.measure(None, lambda i: self.pdf(username))
+        raise ValueError(name)
+
+    def ingest(self, size):
+        from app.services import bgg
+
+        with self.app.app_context():
+            ids = [str(i) for i in fixtures.game_ids(size)]
+            return len(bgg.process_games_data(bgg.fetch_things(ids))) == size
+
+    def pdf(self, username):
+        response = self.client.post('/pdf', data={'username': username, 'download_all': 'true'},
+                                    follow_redirects=True)
+        return response.status_code == 200 and response.data.startswith(b'%PDF')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='10,500,5000', help='collection sizes (comma separated)')
+    parser.add_argument('--rounds', type=int, default=5, help='timed runs per scenario')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every upstream response')
+    parser.add_argument('--queued', type=int, default=0, help='202 replies before each collection is served')
+    parser.add_argument('--throttle', type=float, default=0.0, help='fraction of upstream requests answered 429')
+    parser.add_argument('--pdf-max-size', type=int, default=500, help='skip PDF scenarios above this size')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='scenarios to run (comma separated)')
+    parser.add_argument('--output', default='bench_output.txt', help='report file')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    scenarios = [name for name in args.scenarios.split(',') if name]
+    server = FixtureServer(sizes, latency=args.latency, queued=args.queued, throttle=args.throttle).start()
+    workdir = tempfile.mkdtemp(prefix='bggdeck-bench-')
+
+    from app.services import bgg
+    bgg.BGG_SITE_BASE = server.url
+    bgg.BGG_API_BASE = f"{server.url}/xmlapi2"
+
+    lines = [f"latency={args.latency}s queued={args.queued} throttle={args.throttle} rounds={args.rounds}",
+             f"{'size':>6} {'scenario':<16} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+             f"{'upstream':>9} {'errors':>6} {'peak MB':>8}"]
+    print('\n'.join(lines), flush=True)
+    try:
+        app = make_app(workdir)
+        bench = Bench(app, server, args.rounds)
+        pdf_ok = weasyprint_available()
+        for size in sizes:
+            for name in scenarios:
+                if name.startswith('pdf') and (size > args.pdf_max_size or not pdf_ok):
+                    line = f"{size:>6} {name:<16} skipped ({'WeasyPrint unavailable' if not pdf_ok else '--pdf-max-size'})"
+                else:
+                    r = bench.scenario(name, size)
+                    line = (f"{size:>6} {name:<16} {r['p50']:>9.1f} {r['p90']:>9.1f} {r['p99']:>9.1f} "
+                            f"{r['max']:>9.1f} {r['upstream']:>9.1f} {r['errors']:>6} {r['rss']:>8.1f}")
+                lines.append(line)
+                print(line, flush=True)
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+if __name__ == '__main__':
+    main()
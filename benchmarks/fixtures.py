@@ -0,0 +1,99 @@
+"""Deterministic BGG XML/HTML payloads in the shape of the live API's replies."""
+import random
+from xml.sax.saxutils import escape, quoteattr
+
+DESIGNERS = ['Klaus Teuber', 'Uwe Rosenberg', 'Reiner Knizia', 'Vital Lacerda', 'Elizabeth Hargrave',
+             'Jamey Stegmaier', 'Isaac Childres', 'Cole Wehrle', 'Friedemann Friese', 'Antoine Bauza']
+WORDS = ('trade build settle harvest explore auction draft bluff race engine tile worker '
+         'placement island empire market route deck card dice').split()
+
+
+def username_for(size):
+    return f'bench{size}'
+
+
+def game_ids(size):
+    # Spread like real BGG IDs, stable per collection size
+    rng = random.Random(size)
+    return sorted(rng.sample(range(1, 400000), size))
+
+
+def game(bgg_id):
+    """The synthetic game behind bgg_id; the same on every call."""
+    rng = random.Random(bgg_id)
+    min_players = rng.randint(1, 3)
+    return {
+        'id': bgg_id,
+        'name': ' '.join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 3))) + f' {bgg_id}',
+        'year': rng.randint(1960, 2025),
+        'minplayers': min_players,
+        'maxplayers': min_players + rng.randint(0, 5),
+        'playingtime': rng.choice([15, 20, 30, 45, 60, 90, 120, 180]),
+        'weight': round(rng.uniform(1, 5), 4),
+        'designers': rng.sample(DESIGNERS, rng.randint(1, 2)),
+        'artists': rng.sample(DESIGNERS, 1),
+        # Every tenth game has no /thing description, so describe() falls back to a scrape
+        'description': None if bgg_id % 10 == 0 else ' '.join(rng.choice(WORDS) for _ in range(120)),
+    }
+
+
+def collection_xml(ids, image_base):
+    parts = [f'<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n<items totalitems="{len(ids)}" '
+             'termsofuse="https://boardgamegeek.com/xmlapi/termsofuse" pubdate="Sat, 17 Oct 2026 12:00:00 +0000">']
+    for bgg_id in ids:
+        g = game(bgg_id)
+        parts.append(
+            f'<item objecttype="thing" objectid="{bgg_id}" subtype="boardgame" collid="{bgg_id * 7}">'
+            f'<name sortindex="1">{escape(g["name"])}</name>'
+            f'<yearpublished>{g["year"]}</yearpublished>'
+            f'<image>{image_base}/{bgg_id}.jpg</image><thumbnail>{image_base}/{bgg_id}_t.jpg</thumbnail>'
+            f'<stats minplayers="{g["minplayers"]}" maxplayers="{g["maxplayers"]}" '
+            f'minplaytime="{g["playingtime"]}" maxplaytime="{g["playingtime"]}" '
+            f'playingtime="{g["playingtime"]}" numowned="1000">'
+            f'<rating value="N/A"><usersrated value="100"/><average value="7.1"/>'
+            f'<bayesaverage value="6.5"/><stddev value="1.2"/><median value="0"/></rating></stats>'
+            f'<status own="1" prevowned="0" fortrade="0" want="0" wanttoplay="0" wanttobuy="0" '
+            f'wishlist="0" preordered="0" lastmodified="2026-01-01 10:00:00"/><numplays>0</numplays></item>'
+        )
+    parts.append('</items>')
+    return ''.join(parts).encode('utf-8')
+
+
+def thing_xml(ids, image_base):
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n<items termsofuse="https://boardgamegeek.com/xmlapi/termsofuse">']
+    for bgg_id in ids:
+        g = game(bgg_id)
+        links = ''.join(f'<link type="boardgamedesigner" id="{i}" value={quoteattr(name)}/>'
+                        for i, name in enumerate(g['designers']))
+        links += ''.join(f'<link type="boardgameartist" id="{i}" value={quoteattr(name)}/>'
+                         for i, name in enumerate(g['artists']))
+        description = f'<description>{escape(g["description"])}&amp;#10;</description>' if g['description'] else ''
+        # A player-count poll, as BGG sends, to exercise the parser's poll clearing
+        poll = ''.join(f'<results numplayers="{n}"><result value="Best" numvotes="{n * 3}"/>'
+                       f'<result value="Recommended" numvotes="{n * 5}"/></results>' for n in range(1, 7))
+        parts.append(
+            f'<item type="boardgame" id="{bgg_id}">'
+            f'<thumbnail>{image_base}/{bgg_id}_t.jpg</thumbnail><image>{image_base}/{bgg_id}.jpg</image>'
+            f'<name type="primary" sortindex="1" value={quoteattr(g["name"])}/>'
+            f'<name type="alternate" sortindex="1" value={quoteattr(g["name"].upper())}/>'
+            f'{description}'
+            f'<yearpublished value="{g["year"]}"/><minplayers value="{g["minplayers"]}"/>'
+            f'<maxplayers value="{g["maxplayers"]}"/>'
+            f'<poll name="suggested_numplayers" title="User Suggested Number of Players" totalvotes="40">{poll}</poll>'
+            f'<playingtime value="{g["playingtime"]}"/><minage value="10"/>{links}'
+            f'<statistics page="1"><ratings><usersrated value="100"/><average value="7.1"/>'
+            f'<averageweight value="{g["weight"]}"/></ratings></statistics></item>'
+        )
+    parts.append('</items>')
+    return ''.join(parts).encode('utf-8')
+
+
+def game_page_html(bgg_id):
+    g = game(bgg_id)
+    summary = f'{g["name"]} is a game about ' + ' '.join(random.Random(-bgg_id).choice(WORDS) for _ in range(30))
+    head = (f'<!DOCTYPE html><html><head><title>{escape(g["name"])} | BoardGameGeek</title>'
+            f'<meta name="description" content={quoteattr(summary)}>'
+            f'<meta property="og:description" content={quoteattr(summary)}></head>')
+    # A large body (like BGG's ~300 KB pages) the head-only scraper should never read
+    filler = '<div class="filler">' + 'x' * 1000 + '</div>'
+    return (head + '<body>' + filler * 300 + '</body></html>').encode('utf-8')
@@ -0,0 +1,139 @@
+"""A local stand-in for boardgamegeek.com serving the fixtures in benchmarks/fixtures.py."""
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks import fixtures
+
+
+def _cover_jpeg():
+    try:
+        from PIL import Image
+    except ImportError:
+        return b''
+    output = BytesIO()
+    Image.new('RGB', (600, 600), (131, 103, 199)).save(output, 'JPEG', quality=85)
+    return output.getvalue()
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients closing keep-alive or half-read connections is expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    """
+    Serves /xmlapi2/collection, /xmlapi2/thing, /boardgame/<id> and
+    /images/<id>.jpg on 127.0.0.1. Every response waits `latency` seconds;
+    the first `queued` collection requests per user get 202 (BGG queues
+    collection builds) and a `throttle` fraction of all requests get 429
+    with Retry-After: 0. Upstream requests are counted per kind and status.
+    """
+
+    def __init__(self, sizes, latency=0.0, queued=0, throttle=0.0, seed=0):
+        self.collections = {fixtures.username_for(size): fixtures.game_ids(size) for size in sizes}
+        self.latency = latency
+        self.queued = queued
+        self.throttle = throttle
+        self.cover = _cover_jpeg()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._queued_left = {}
+        self.counts = Counter()
+        self._httpd = _QuietServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="bgg-fixture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset(self):
+        """Clears the request counters and re-arms 202 injection."""
+        with self._lock:
+            self.counts.clear()
+            self._queued_left = {username: self.queued for username in self.collections}
+
+    def upstream_requests(self):
+        with self._lock:
+            return sum(n for (kind, _), n in self.counts.items() if kind != 'image')
+
+    def _respond(self, path, query):
+        """(kind, status, content type, body, headers) for a request."""
+        parts = path.strip('/').split('/')
+        image_base = f"{self.url}/images"
+        with self._lock:
+            throttled = self.throttle and self._rng.random() < self.throttle
+        if throttled:
+            return 'throttled', 429, 'text/plain', b'Rate limit exceeded', {'Retry-After': '0'}
+
+        if parts[:2] == ['xmlapi2', 'collection']:
+            username = query.get('username', [''])[0].lower()
+            if username not in self.collections:
+                return 'collection', 200, 'text/xml', b'<errors><error><message>Invalid username specified</message></error></errors>', {}
+            with self._lock:
+                left = self._queued_left.get(username, self.queued)
+                self._queued_left[username] = max(0, left - 1)
+            if left:
+                return 'collection', 202, 'text/xml', b'<message>Your request for this collection has been accepted</message>', {}
+            # Nothing changes between runs, so incremental syncs get an empty delta
+            ids = [] if 'modifiedsince' in query else self.collections[username]
+            return 'collection', 200, 'text/xml', fixtures.collection_xml(ids, image_base), {}
+
+        if parts[:2] == ['xmlapi2', 'thing']:
+            ids = [int(i) for i in query.get('id', [''])[0].split(',') if i.isdigit()]
+            return 'thing', 200, 'text/xml', fixtures.thing_xml(ids, image_base), {}
+
+        if parts[0] == 'boardgame' and len(parts) > 1 and parts[1].isdigit():
+            return 'scrape', 200, 'text/html; charset=utf-8', fixtures.game_page_html(int(parts[1])), {}
+
+        if parts[0] == 'images':
+            return 'image', 200, 'image/jpeg', self.cover, {}
+
+        return 'other', 404, 'text/plain', b'Not found', {}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                split = urlsplit(self.path)
+                if server.latency:
+                    time.sleep(server.latency)
+                kind, status, content_type, body, headers = server._respond(split.path, parse_qs(split.query))
+                with server._lock:
+                    server.counts[(kind, status)] += 1
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the head-only scraper hangs up early
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -10,3 +10,117 @@ class Config:
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
     BGG_API_KEY = os.environ.get('BGG_API_KEY')
+
+    # Collection cache (seconds / max rows kept per namespace)
+    COLLECTION_CACHE_TTL = int(os.environ.get('COLLECTION_CACHE_TTL', 3600))
+    COLLECTION_CACHE_MAX_ENTRIES = int(os.environ.get('COLLECTION_CACHE_MAX_ENTRIES', 500))
+
+    # Collection membership sync: seconds before re-syncing, hours between full diffs
+    # (incremental syncs use BGG's modifiedsince and can't see removals)
+    COLLECTION_SYNC_TTL = int(os.environ.get('COLLECTION_SYNC_TTL', 900))
+    COLLECTION_FULL_SYNC_HOURS = float(os.environ.get('COLLECTION_FULL_SYNC_HOURS', 24))
+
+    # BGG client: concurrent chunk fetches, requests/second and keep-alive pool size
+    BGG_MAX_CONCURRENCY = int(os.environ.get('BGG_MAX_CONCURRENCY', 4))
+    BGG_RATE_LIMIT = float(os.environ.get('BGG_RATE_LIMIT', 5.0))
+    BGG_POOL_SIZE = int(os.environ.get('BGG_POOL_SIZE', 10))
+    BGG_TIMEOUT = int(os.environ.get('BGG_TIMEOUT', 30))
+
+    # Shared outbound thread pool and its default per-host connection cap
+    # (BGG itself is capped by BGG_MAX_CONCURRENCY)
+    OUTBOUND_WORKERS = int(os.environ.get('OUTBOUND_WORKERS', 16))
+    OUTBOUND_PER_HOST = int(os.environ.get('OUTBOUND_PER_HOST', 4))
+
+    # Single-flight across worker processes: lease lifetime and how long other
+    # processes wait (seconds) for the holder's result before fetching themselves
+    FETCH_LEASES_ENABLED = os.environ.get('FETCH_LEASES_ENABLED', 'true').lower() == 'true'
+    FETCH_LEASE_TTL = int(os.environ.get('FETCH_LEASE_TTL', 60))
+    FETCH_LEASE_WAIT = int(os.environ.get('FETCH_LEASE_WAIT', 30))
+
+    # Server-side retries for 202/429/5xx: attempts, backoff (seconds), retries per host per minute
+    BGG_RETRY_MAX_ATTEMPTS = int(os.environ.get('BGG_RETRY_MAX_ATTEMPTS', 5))
+    BGG_RETRY_BASE_DELAY = float(os.environ.get('BGG_RETRY_BASE_DELAY', 1.0))
+    BGG_RETRY_MAX_DELAY = float(os.environ.get('BGG_RETRY_MAX_DELAY', 16.0))
+    BGG_RETRY_BUDGET = int(os.environ.get('BGG_RETRY_BUDGET', 60))
+
+    # Background PDF jobs: worker threads, finished-PDF store (defaults to instance/pdf_cache)
+    PDF_JOB_WORKERS = int(os.environ.get('PDF_JOB_WORKERS', 2))
+    PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR')
+    PDF_JOBS_EAGER = False  # run jobs inline (tests)
+
+    # Sharded PDF rendering: 3x3 cards per A4 page, pages per shard, render processes
+    # (0 = one per CPU, 1 = disable sharding) and shards rendered before a worker is recycled
+    PDF_CARDS_PER_PAGE = 9
+    PDF_SHARD_PAGES = int(os.environ.get('PDF_SHARD_PAGES', 4))
+    PDF_RENDER_PROCESSES = int(os.environ.get('PDF_RENDER_PROCESSES', 0))
+    PDF_RENDER_TASKS_PER_CHILD = int(os.environ.get('PDF_RENDER_TASKS_PER_CHILD', 20))
+
+    # Rendered card HTML kept in memory per (game, last update, options, template); 0 disables
+    CARD_FRAGMENT_CACHE_SIZE = int(os.environ.get('CARD_FRAGMENT_CACHE_SIZE', 5000))
+
+    # Incremental decks: every page is stored as its own PDF keyed by its content, so only
+    # changed pages are re-rendered; stored pages kept (least recently used are deleted)
+    PDF_PAGE_CACHE = os.environ.get('PDF_PAGE_CACHE', 'true').lower() == 'true'
+    PDF_PAGE_CACHE_MAX_FILES = int(os.environ.get('PDF_PAGE_CACHE_MAX_FILES', 5000))
+    # Finished deck PDFs kept in PDF_CACHE_DIR; the least recently downloaded are deleted
+    PDF_DECK_CACHE_MAX_FILES = int(os.environ.get('PDF_DECK_CACHE_MAX_FILES', 200))
+
+    # PDF backend: 'weasyprint' lays out whole sheets of cards; 'imposition' renders each
+    # distinct card once (cached) and places it on PDF_SHEET_SIZE sheets (A4 or LETTER)
+    # with bleed around every card (the card's artwork runs into it) and crop marks in the
+    # sheet margin. The margin keeps marks clear of the printer's unprintable edge: with the
+    # 5mm default A4 fits 3x3 cards and Letter 3x2; layouts too tight for marks are rejected
+    PDF_BACKEND = os.environ.get('PDF_BACKEND', 'weasyprint').lower()
+    PDF_SHEET_SIZE = os.environ.get('PDF_SHEET_SIZE', 'A4').upper()
+    IMPOSITION_BLEED_MM = float(os.environ.get('IMPOSITION_BLEED_MM', 1.5))
+    IMPOSITION_MIN_MARGIN_MM = float(os.environ.get('IMPOSITION_MIN_MARGIN_MM', 5))
+    IMPOSITION_CROP_MARKS = os.environ.get('IMPOSITION_CROP_MARKS', 'true').lower() == 'true'
+
+    # Prune the Tailwind output to the classes used by the PDF card templates
+    PDF_PRUNE_CSS = os.environ.get('PDF_PRUNE_CSS', 'true').lower() == 'true'
+
+    # Card cover cache: resized to the card's image band at print DPI (defaults to instance/image_cache)
+    IMAGE_CACHE_ENABLED = os.environ.get('IMAGE_CACHE_ENABLED', 'true').lower() == 'true'
+    IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR')
+    IMAGE_PRINT_DPI = int(os.environ.get('IMAGE_PRINT_DPI', 300))
+    IMAGE_JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', 85))
+
+    # Card descriptions: max characters (0 = untrimmed), scrape fallback for games whose
+    # /thing response has none, and shared cache lifetimes (seconds) for hits / failed scrapes
+    DESCRIPTION_MAX_LENGTH = int(os.environ.get('DESCRIPTION_MAX_LENGTH', 500))
+    DESCRIPTION_SCRAPE = os.environ.get('DESCRIPTION_SCRAPE', 'true').lower() == 'true'
+    DESCRIPTION_CACHE_TTL = int(os.environ.get('DESCRIPTION_CACHE_TTL', 30 * 24 * 3600))
+    DESCRIPTION_NEGATIVE_TTL = int(os.environ.get('DESCRIPTION_NEGATIVE_TTL', 24 * 3600))
+    DESCRIPTION_CACHE_MAX_ENTRIES = int(os.environ.get('DESCRIPTION_CACHE_MAX_ENTRIES', 50000))
+
+    # Rows per INSERT ... ON CONFLICT statement when saving games (capped lower on SQLite)
+    GAME_UPSERT_CHUNK_SIZE = int(os.environ.get('GAME_UPSERT_CHUNK_SIZE', 500))
+
+    # Background prefetch after a /collection page: details for this many pages either side,
+    # then the whole collection (so sorting/filtering use full stats), in batches of games
+    PREFETCH_PAGES = int(os.environ.get('PREFETCH_PAGES', 1))
+    PREFETCH_WARMUP = os.environ.get('PREFETCH_WARMUP', 'true').lower() == 'true'
+    PREFETCH_BATCH_SIZE = int(os.environ.get('PREFETCH_BATCH_SIZE', 100))
+    PREFETCH_WORKERS = int(os.environ.get('PREFETCH_WORKERS', 1))
+
+    # Deck profiling: POST /pdf?profile=1 (or profile=cards, adding per-card renders) returns a
+    # memory/timing report instead of the PDF; flask profile-deck works regardless
+    PDF_PROFILING_ENABLED = os.environ.get('PDF_PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_TRACEBACK_DEPTH = int(os.environ.get('PROFILE_TRACEBACK_DEPTH', 1))
+
+    # Timing spans and cache counters (/api/metrics) plus a Server-Timing header per response;
+    # with METRICS_ENABLED=false every instrumentation call is a no-op
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() == 'true'
+
+    # Stale game refresh (flask refresh-games); interval > 0 also runs it in-process
+    REFRESH_MAX_AGE_HOURS = float(os.environ.get('REFRESH_MAX_AGE_HOURS', 168))
+    REFRESH_LIMIT = int(os.environ.get('REFRESH_LIMIT', 200))
+    REFRESH_BATCH_SIZE = int(os.environ.get('REFRESH_BATCH_SIZE', 100))
+    REFRESH_INTERVAL_MINUTES = int(os.environ.get('REFRESH_INTERVAL_MINUTES', 0))
+
+    # Multi-user export (flask export-decks): threads resolving collections and fetching
+    # game details, /thing IDs per fetch batch, and decks rendered at once
+    BATCH_FETCH_WORKERS = int(os.environ.get('BATCH_FETCH_WORKERS', 4))
+    BATCH_FETCH_SIZE = int(os.environ.get('BATCH_FETCH_SIZE', 100))
+    BATCH_RENDER_WORKERS = int(os.environ.get('BATCH_RENDER_WORKERS', 2))
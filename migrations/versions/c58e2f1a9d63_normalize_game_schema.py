@@ -0,0 +1,120 @@
+"""Normalize game schema: typed columns, credits tables, sort indexes
+
+Revision ID: c58e2f1a9d63
+Revises: a7c41e9d2b58
+Create Date: 2026-10-17 13:40:05.117264
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c58e2f1a9d63'
+down_revision = 'a7c41e9d2b58'
+branch_labels = None
+depends_on = None
+
+INT_COLUMNS = ('year_published', 'min_players', 'max_players', 'playing_time')
+CREDIT_TABLES = (('designers', 'game_designers'), ('artists', 'game_artists'))
+
+
+def _credit_table(name):
+    return sa.table(name,
+                    sa.column('game_id', sa.Integer),
+                    sa.column('person_id', sa.Integer),
+                    sa.column('position', sa.Integer))
+
+
+def upgrade():
+    op.create_table('people',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    for _, table_name in CREDIT_TABLES:
+        op.create_table(table_name,
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('person_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['person_id'], ['people.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('game_id', 'person_id')
+        )
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table_name}_person_id'), ['person_id'], unique=False)
+
+    # Move JSON-encoded designers/artists into the credits tables
+    conn = op.get_bind()
+    people_table = sa.table('people', sa.column('id', sa.Integer), sa.column('name', sa.String))
+    people = {}
+    links = {table_name: [] for _, table_name in CREDIT_TABLES}
+    rows = conn.execute(sa.text('SELECT id, designers, artists FROM games')).mappings().all()
+    for row in rows:
+        for column, table_name in CREDIT_TABLES:
+            try:
+                names = json.loads(row[column]) if row[column] else []
+            except ValueError:
+                names = [n.strip() for n in row[column].split(',')]
+            for position, name in enumerate(dict.fromkeys(n for n in names if n)):
+                if name not in people:
+                    people[name] = conn.execute(
+                        people_table.insert().values(name=name).returning(people_table.c.id)).scalar()
+                links[table_name].append({'game_id': row['id'], 'person_id': people[name], 'position': position})
+    for table_name, table_links in links.items():
+        if table_links:
+            op.bulk_insert(_credit_table(table_name), table_links)
+
+    # Blank strings can't be cast to integers
+    for column in INT_COLUMNS:
+        conn.execute(sa.text(f"UPDATE games SET {column} = NULL WHERE trim({column}) = ''"))
+
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        for column in INT_COLUMNS:
+            batch_op.alter_column(column,
+                                  existing_type=sa.String(),
+                                  type_=sa.Integer(),
+                                  existing_nullable=True,
+                                  postgresql_using=f'{column}::integer')
+        batch_op.drop_column('designers')
+        batch_op.drop_column('artists')
+        for column in INT_COLUMNS + ('average_weight', 'last_updated'):
+            batch_op.create_index(batch_op.f(f'ix_games_{column}'), [column], unique=False)
+    # Expression indexes can't go through a batch table rebuild
+    op.create_index('ix_games_name_lower', 'games', [sa.text('lower(name)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_games_name_lower', table_name='games')
+    with op.batch_alter_table('games', schema=None) as batch_op:
+        for column in INT_COLUMNS + ('average_weight', 'last_updated'):
+            batch_op.drop_index(batch_op.f(f'ix_games_{column}'))
+        batch_op.add_column(sa.Column('artists', sa.VARCHAR(), nullable=True))
+        batch_op.add_column(sa.Column('designers', sa.VARCHAR(), nullable=True))
+        for column in INT_COLUMNS:
+            batch_op.alter_column(column,
+                                  existing_type=sa.Integer(),
+                                  type_=sa.String(),
+                                  existing_nullable=True)
+
+    # Re-encode credits as JSON
+    conn = op.get_bind()
+    for column, table_name in CREDIT_TABLES:
+        credits = {}
+        rows = conn.execute(sa.text(
+            f'SELECT l.game_id, p.name FROM {table_name} l JOIN people p ON p.id = l.person_id '
+            f'ORDER BY l.game_id, l.position')).all()
+        for game_id, name in rows:
+            credits.setdefault(game_id, []).append(name)
+        for game_id, names in credits.items():
+            conn.execute(sa.text(f'UPDATE games SET {column} = :names WHERE id = :id'),
+                         {'names': json.dumps(names), 'id': game_id})
+
+    for _, table_name in CREDIT_TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table_name}_person_id'))
+        op.drop_table(table_name)
+    op.drop_table('people')
@@ -7,10 +7,15 @@ class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    PDF_JOBS_EAGER = True
+    PREFETCH_PAGES = 0  # no background BGG calls outliving a test's mocks
+    PREFETCH_WARMUP = False
 
 @pytest.fixture
-def app():
+def app(tmp_path):
     app = create_app(TestConfig)
+    app.config['PDF_CACHE_DIR'] = str(tmp_path / 'pdf_cache')
+    app.config['IMAGE_CACHE_DIR'] = str(tmp_path / 'image_cache')
     
     with app.app_context():
         db.create_all()
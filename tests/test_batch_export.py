@@ -0,0 +1,79 @@
+import json
+import os
+from unittest.mock import patch
+from app.services import deck
+from app.services.batch import filenames_for, read_usernames
+from app.services.records import GameRecord
+
+COLLECTIONS = {'alice': ['1', '2', '3'], 'bob': ['2', '3', '4'], 'carol': ['1', '2', '3']}
+
+
+def resolve_ids(username, ids=None, download_all=False):
+    if username not in COLLECTIONS:
+        raise deck.DeckError("No games found")
+    return COLLECTIONS[username]
+
+
+def load_games(ids):
+    return [GameRecord(int(gid), f'Game {gid}', description='A game.') for gid in ids]
+
+
+def test_read_usernames_merges_file_and_drops_repeats(tmp_path):
+    path = tmp_path / 'users.txt'
+    path.write_text('bob\n# staff\nAlice  # owner\n\ncarol\n')
+
+    assert read_usernames(['alice', 'dave'], str(path)) == ['alice', 'dave', 'bob', 'carol']
+
+
+def test_colliding_usernames_get_distinct_files():
+    assert filenames_for(['a b', 'a_b', 'A/b', 'carol']) == {
+        'a b': 'a_b.pdf', 'a_b': 'a_b-2.pdf', 'A/b': 'A_b-3.pdf', 'carol': 'carol.pdf'}
+
+
+@patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4 deck')
+@patch('app.services.deck.load_games', side_effect=load_games)
+@patch('app.services.deck.resolve_ids', side_effect=resolve_ids)
+def test_export_fetches_each_game_once_and_writes_a_pdf_per_user(mock_resolve, mock_load, mock_generate,
+                                                                 app, runner, tmp_path):
+    app.config['PDF_RENDER_PROCESSES'] = 1
+    out = tmp_path / 'decks'
+    report_path = tmp_path / 'report.json'
+
+    result = runner.invoke(args=['export-decks', 'alice', 'bob', 'carol', 'nobody', '-o', str(out),
+                                 '--fetch-workers', '1', '--render-workers', '1',
+                                 '--report', str(report_path)])
+
+    assert result.exit_code == 0, result.output
+    fetched = [gid for call in mock_load.call_args_list for gid in call.args[0]]
+    assert sorted(fetched) == ['1', '2', '3', '4']
+    assert sorted(os.listdir(out)) == ['alice.pdf', 'bob.pdf', 'carol.pdf']
+    assert mock_generate.call_count == 2  # carol's deck is alice's, served from the store
+
+    report = json.loads(report_path.read_text())
+    assert report['unique_games'] == 4
+    users = {user['username']: user for user in report['users']}
+    assert users['carol']['cached'] is True
+    assert users['nobody']['error'] == 'No games found'
+    assert 'nobody' in result.output
+
+
+@patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4 all')
+@patch('app.services.deck.load_games', side_effect=load_games)
+@patch('app.services.deck.resolve_ids', side_effect=resolve_ids)
+def test_export_combined_writes_one_pdf(mock_resolve, mock_load, mock_generate, app, runner, tmp_path):
+    app.config['PDF_RENDER_PROCESSES'] = 1
+    out = tmp_path / 'decks'
+
+    result = runner.invoke(args=['export-decks', 'alice', 'bob', '-o', str(out), '--combined', 'event.pdf',
+                                 '--fetch-workers', '1', '--render-workers', '1'])
+
+    assert result.exit_code == 0, result.output
+    assert os.listdir(out) == ['event.pdf']
+    html = mock_generate.call_args.args[0]
+    assert html.count('class="card-container') == 4
+
+
+def test_export_needs_usernames(runner):
+    result = runner.invoke(args=['export-decks'])
+    assert result.exit_code != 0
+    assert 'usernames' in result.output
@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from app.services.bgg_client import BGGClient, RateLimiter
+from app.services.bgg import fetch_things
+
+THING_XML = """<?xml version="1.0" encoding="utf-8"?>
+<items>{}</items>"""
+
+
+def test_map_runs_concurrently_and_preserves_order():
+    client = BGGClient({}, max_workers=4, rate=None)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            active.append(n)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(n)
+        return n * 2
+
+    assert client.map(work, range(8)) == [n * 2 for n in range(8)]
+    assert 1 < max(peak) <= 4
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - start >= 4 / 50
+
+
+@patch('app.services.bgg.get_client')
+def test_fetch_things_merges_chunks_in_order(mock_client):
+    def fake_get(url, params=None, **kwargs):
+        ids = params['id'].split(',')
+        body = ''.join(f'<item id="{i}"><name value="Game {i}"/></item>' for i in ids)
+        response = MagicMock(status_code=200, content=THING_XML.format(body).encode())
+        return response
+
+    client = BGGClient({}, max_workers=3, rate=None)
+    client.get = fake_get
+    mock_client.return_value = client
+
+    data = fetch_things([str(i) for i in range(45)])
+
+    assert [thing.bgg_id for thing in data] == list(range(45))
+
+
+def test_get_with_retry_backs_off_until_ready():
+    client = BGGClient({}, rate=None, base_delay=0)
+    responses = [MagicMock(status_code=202, headers={}), MagicMock(status_code=429, headers={}),
+                 MagicMock(status_code=200, headers={})]
+    client.get = MagicMock(side_effect=responses)
+
+    response = client.get_with_retry('https://boardgamegeek.com/xmlapi2/collection')
+
+    assert response.status_code == 200
+    assert client.get.call_count == 3
+
+
+def test_retry_budget_is_shared_per_host():
+    client = BGGClient({}, rate=None, base_delay=0, max_attempts=10, retry_budget=2)
+    client.get = MagicMock(return_value=MagicMock(status_code=503, headers={}))
+
+    response = client.get_with_retry('https://boardgamegeek.com/xmlapi2/thing')
+
+    assert response.status_code == 503
+    assert client.get.call_count == 3  # first try + 2 budgeted retries
+
+
+def test_concurrent_identical_requests_share_one_upstream_call():
+    client = BGGClient({}, rate=None)
+    release = threading.Event()
+
+    def slow_get(url, **kwargs):
+        release.wait(1)
+        return MagicMock(status_code=200, headers={})
+
+    client.get = MagicMock(side_effect=slow_get)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        client.get_with_retry('https://boardgamegeek.com/xmlapi2/collection', params={'username': 'queued'})))
+        for _ in range(10)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert client.get.call_count == 1
+    assert len(results) == 10
@@ -0,0 +1,76 @@
+from io import BytesIO
+import pytest
+from app.services.bgg_xml import iter_collection, iter_things
+
+COLLECTION_XML = b"""<?xml version="1.0" encoding="utf-8"?>
+<items totalitems="2">
+  <item objecttype="thing" objectid="13" subtype="boardgame" collid="1">
+    <name sortindex="1">Catan</name>
+    <yearpublished>1995</yearpublished>
+    <stats minplayers="3" maxplayers="4" playingtime="120"><rating value="N/A"/></stats>
+  </item>
+  <item objecttype="thing" objectid="822" subtype="boardgame" collid="2">
+    <name sortindex="1">Carcassonne</name>
+  </item>
+</items>"""
+
+THING_XML = b"""<?xml version="1.0" encoding="utf-8"?>
+<items>
+  <item type="boardgame" id="13">
+    <thumbnail>https://example.com/t.jpg</thumbnail>
+    <image>https://example.com/i.jpg</image>
+    <name type="alternate" sortindex="1" value="Die Siedler von Catan"/>
+    <name type="primary" sortindex="1" value="Catan"/>
+    <yearpublished value="1995"/>
+    <minplayers value="3"/>
+    <maxplayers value="4"/>
+    <poll name="suggested_numplayers"><results numplayers="1"><result value="Best" numvotes="0"/></results></poll>
+    <playingtime value="120"/>
+    <link type="boardgamedesigner" id="11" value="Klaus Teuber"/>
+    <link type="boardgameartist" id="12" value="Franz Vohwinkel"/>
+    <statistics page="1"><ratings><averageweight value="2.29"/></ratings></statistics>
+  </item>
+  <item type="boardgame" id="bad"/>
+</items>"""
+
+
+def test_collection_items():
+    items = list(iter_collection(BytesIO(COLLECTION_XML)))
+
+    assert [item.bgg_id for item in items] == [13, 822]
+    assert items[0].name == 'Catan'
+    assert items[0].year_published == 1995
+    assert (items[0].min_players, items[0].playing_time) == (3, 120)
+    assert items[1].year_published is None
+
+
+def test_thing_items_skip_unparseable_entries():
+    things = list(iter_things(BytesIO(THING_XML)))
+
+    assert len(things) == 1
+    thing = things[0]
+    assert thing.name == 'Catan'
+    assert (thing.year_published, thing.min_players, thing.max_players) == (1995, 3, 4)
+    assert thing.average_weight == 2.29
+    assert thing.designers == ('Klaus Teuber',)
+    assert thing.artists == ('Franz Vohwinkel',)
+
+
+def test_error_document_is_rejected():
+    errors = b'<errors><error><message>Invalid username specified</message></error></errors>'
+    with pytest.raises(ValueError):
+        list(iter_collection(BytesIO(errors)))
+
+
+def test_game_record_round_trips_through_the_games_table(app):
+    from app.models import Game
+    from app.services.bgg import save_games
+    from app.services.records import GameRecord
+
+    thing = next(iter_things(BytesIO(THING_XML)))
+    save_games([thing])
+
+    stored = GameRecord.from_model(Game.query.filter_by(bgg_id=13).one())
+    assert stored == thing
+    assert stored.to_context()['yearpublished'] == 1995
+    assert stored.to_context()['designers'] == ['Klaus Teuber']
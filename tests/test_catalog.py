@@ -0,0 +1,102 @@
+from unittest.mock import patch
+from app.models import Game
+from app.services.bgg import upsert_games
+from app.services.bgg_xml import CollectionItem
+from app.services.records import GameRecord
+from app.services.catalog import query_games, paginate_games, sorted_ids, has_games, missing_count
+
+
+def make_game(bgg_id, name, year=2020, players=(2, 4), time=60, weight=2.5):
+    return GameRecord(bgg_id, name, year_published=year, min_players=players[0],
+                      max_players=players[1], playing_time=time, average_weight=weight)
+
+
+def seed(app):
+    upsert_games([
+        make_game(1, 'bravo', year=2010, time=30, weight=1.5).to_row(),
+        make_game(2, 'Alpha', year=2018, players=(1, 1), time=120, weight=3.8).to_row(),
+        make_game(3, 'Charlie', year=None, time=90, weight=0).to_row(),
+    ])
+
+
+def test_game_columns_are_typed(app):
+    seed(app)
+    game = Game.query.filter_by(bgg_id=1).one()
+    assert game.year_published == 2010
+    assert game.min_players == 2
+    assert Game.query.filter_by(bgg_id=3).one().year_published is None
+
+
+def test_query_sorts_in_sql(app):
+    seed(app)
+    assert [g.name for g in query_games(sort='name')] == ['Alpha', 'bravo', 'Charlie']
+    # Missing years sort first ascending, last descending
+    assert [g.bgg_id for g in query_games(sort='year')] == [3, 1, 2]
+    assert [g.bgg_id for g in query_games(sort='year', order='desc')] == [2, 1, 3]
+
+
+def test_query_filters(app):
+    seed(app)
+    assert sorted_ids(players=3) == ['1', '3']
+    assert sorted_ids(max_time=90) == ['1', '3']
+    assert sorted_ids(min_weight=1, max_weight=2) == ['1']
+    assert sorted_ids(ids=['2', '3']) == ['2', '3']
+
+
+def test_paginate_games(app):
+    seed(app)
+    pagination = paginate_games(page=2, per_page=2, sort='name')
+    assert pagination.total == 3
+    assert pagination.pages == 2
+    assert [g.name for g in pagination.items] == ['Charlie']
+
+
+def add_collection(username, ids):
+    from app.services.collection import apply_items
+    apply_items(username, [CollectionItem(i, f'Game {i}', None, None, None, None) for i in ids], full=True)
+
+
+def test_has_games(app):
+    seed(app)
+    add_collection('alice', [1, 2])
+    add_collection('bob', [1, 99])
+    assert has_games('Alice')
+    assert not has_games('bob')
+    assert missing_count('bob') == 1
+    assert not has_games('nobody')
+
+
+def test_query_is_scoped_to_the_users_collection(app):
+    seed(app)
+    add_collection('alice', [1, 3])
+    add_collection('bob', [2])
+    assert sorted_ids(username='alice', sort='name') == ['1', '3']
+    assert sorted_ids(username='ALICE', players=3, max_time=60) == ['1']
+    assert paginate_games(username='bob').total == 1
+
+
+def test_collection_served_from_sql_when_cached(app, client):
+    seed(app)
+    items = [CollectionItem(i, f'Game {i}', None, None, None, None) for i in (1, 2, 3)]
+
+    with patch('app.services.bgg.fetch_collection', return_value=items), \
+         patch('app.routes.main.fetch_things') as mock_things:
+        response = client.get('/collection?username=testuser&sort=weight&order=desc&players=2')
+
+    assert response.status_code == 200
+    mock_things.assert_not_called()
+    assert response.data.index(b'bravo') < response.data.index(b'Charlie')
+    assert b'Alpha' not in response.data
+
+
+def test_filters_are_kept_while_collection_warms_up(app, client):
+    seed(app)
+    items = [CollectionItem(i, f'Game {i}', None, None, None, None) for i in (1, 2, 3, 4)]
+
+    with patch('app.services.bgg.fetch_collection', return_value=items), \
+         patch('app.routes.main.fetch_things', return_value=[]):
+        response = client.get('/collection?username=testuser&players=2')
+
+    assert response.status_code == 200
+    assert b'name="players" min="1" value="2"' in response.data
+    assert b'(1 still loading)' in response.data
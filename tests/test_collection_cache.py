@@ -0,0 +1,58 @@
+import pytest
+from io import BytesIO
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from app.models import CacheEntry
+from app.services import cache
+from app.services.bgg import fetch_collection
+
+COLLECTION_XML = b"""<?xml version="1.0" encoding="utf-8"?>
+<items totalitems="1"><item objectid="13" subtype="boardgame"><name sortindex="1">Catan</name></item></items>"""
+
+
+def make_response(status_code, content=b'', headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.raw = BytesIO(content)
+    response.headers = headers or {}
+    return response
+
+
+@patch('app.services.bgg.get_client')
+def test_second_fetch_is_served_from_cache(mock_client, app):
+    mock_get = mock_client.return_value.get_with_retry
+    mock_get.return_value = make_response(200, COLLECTION_XML, {'ETag': '"v1"'})
+
+    first = fetch_collection('alice')
+    second = fetch_collection('Alice')
+
+    assert mock_get.call_count == 1
+    assert first == second
+    assert second[0].bgg_id == 13
+    assert second[0].name == 'Catan'
+
+
+@patch('app.services.bgg.get_client')
+def test_stale_entry_is_revalidated(mock_client, app):
+    mock_get = mock_client.return_value.get_with_retry
+    mock_get.return_value = make_response(200, COLLECTION_XML, {'ETag': '"v1"'})
+    fetch_collection('alice')
+
+    entry = CacheEntry.query.one()
+    entry.expires_at = datetime.utcnow() - timedelta(seconds=1)
+
+    mock_get.return_value = make_response(304)
+    data = fetch_collection('alice')
+
+    assert data[0].bgg_id == 13
+    assert mock_get.call_args.kwargs['headers']['If-None-Match'] == '"v1"'
+    assert CacheEntry.query.one().is_fresh
+
+
+def test_evict_keeps_most_recent_entries(app):
+    for i in range(5):
+        cache.store('test', f'k{i}', {'i': i}, ttl=60)
+    cache.evict('test', 2)
+
+    keys = {e.key for e in CacheEntry.query.all()}
+    assert len(keys) == 2
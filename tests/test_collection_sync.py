@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from app import db
+from app.models import CollectionEntry, CollectionSync
+from app.services.bgg import BGGQueued
+from app.services.bgg_xml import CollectionItem
+from app.services.collection import CollectionQueued, sync_collection, entry_ids
+
+
+def collection(*ids):
+    return [CollectionItem(i, f'Game {i}', 2000 + i, 2, 30, None) for i in ids]
+
+
+def expire(username, full=False):
+    state = db.session.get(CollectionSync, username)
+    state.synced_at -= timedelta(days=2)
+    if full:
+        state.full_synced_at -= timedelta(days=2)
+    db.session.commit()
+
+
+@patch('app.services.bgg.fetch_collection')
+def test_first_sync_stores_entries(mock_fetch, app):
+    mock_fetch.return_value = collection(2, 1)
+
+    state = sync_collection('Alice')
+
+    assert state.total == 2
+    assert entry_ids('alice') == ['1', '2']
+    assert entry_ids('alice', sort='year', order='desc') == ['2', '1']
+    assert CollectionEntry.query.filter_by(bgg_id=1).one().year_published == 2001
+
+
+@patch('app.services.bgg.fetch_collection')
+def test_fresh_sync_is_not_refetched(mock_fetch, app):
+    mock_fetch.return_value = collection(1)
+    sync_collection('alice')
+    sync_collection('ALICE')
+
+    assert mock_fetch.call_count == 1
+
+
+@patch('app.services.bgg.fetch_collection')
+def test_incremental_sync_adds_modified_games(mock_fetch, app):
+    mock_fetch.return_value = collection(1, 2)
+    sync_collection('alice')
+    expire('alice')
+    synced_at = db.session.get(CollectionSync, 'alice').synced_at
+
+    mock_fetch.return_value = collection(3)
+    state = sync_collection('alice')
+
+    mock_fetch.assert_called_with('alice', modified_since=synced_at)
+    assert state.total == 3
+    assert entry_ids('alice') == ['1', '2', '3']
+
+
+@patch('app.services.bgg.fetch_collection')
+def test_full_sync_removes_games(mock_fetch, app):
+    mock_fetch.return_value = collection(1, 2, 3)
+    sync_collection('alice')
+    expire('alice', full=True)
+
+    mock_fetch.return_value = collection(1, 3, 4)
+    state = sync_collection('alice')
+
+    mock_fetch.assert_called_with('alice')
+    assert state.total == 3
+    assert entry_ids('alice') == ['1', '3', '4']
+
+
+@patch('app.services.bgg.fetch_collection', side_effect=BGGQueued('alice'))
+def test_queued_collection(mock_fetch, app):
+    with pytest.raises(CollectionQueued):
+        sync_collection('alice')
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+from app.models import CacheEntry
+from app.services.bgg import scrape_description
+from app.services.descriptions import clean_description, describe
+from app.services.records import GameRecord
+
+
+def test_clean_description_decodes_and_truncates():
+    raw = 'Trade &amp;amp; build.&amp;#10;&amp;#10;<b>Settle</b>   the island'
+    assert clean_description(raw) == 'Trade & build. Settle the island'
+    assert clean_description('one two three four', max_length=12) == 'one two…'
+    assert clean_description('  ') is None
+
+
+@patch('app.services.bgg.scrape_description')
+def test_thing_description_is_used_without_scraping(mock_scrape, app):
+    games = describe([GameRecord(1, 'Game 1', description='From /thing')])
+
+    assert games[0].description == 'From /thing'
+    mock_scrape.assert_not_called()
+
+
+@patch('app.services.bgg.scrape_description', return_value='Scraped')
+def test_scrapes_are_cached(mock_scrape, app):
+    describe([GameRecord(1, 'Game 1')])
+    games = describe([GameRecord(1, 'Game 1')])
+
+    assert games[0].description == 'Scraped'
+    assert mock_scrape.call_count == 1
+
+
+@patch('app.services.bgg.scrape_description', return_value=None)
+def test_failed_scrapes_use_the_negative_ttl(mock_scrape, app):
+    app.config['DESCRIPTION_NEGATIVE_TTL'] = 60
+    describe([GameRecord(1, 'Game 1')])
+    describe([GameRecord(1, 'Game 1')])
+
+    entry = CacheEntry.query.filter_by(namespace='description').one()
+    assert entry.expires_at < datetime.utcnow() + timedelta(seconds=61)
+    assert mock_scrape.call_count == 1
+
+
+@patch('app.services.bgg.get_client')
+def test_scrape_stops_after_head(mock_client):
+    page = [b'<html><head><meta name="description" content="Short blurb">',
+            b'</head><body>',
+            AssertionError('read past <head>')]
+
+    def chunks(chunk_size):
+        for chunk in page:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    response = MagicMock(status_code=200, encoding='utf-8')
+    response.iter_content.side_effect = chunks
+    mock_client.return_value.get_with_retry.return_value = response
+
+    assert scrape_description(1) == 'Short blurb'
+    response.close.assert_called_once()
@@ -0,0 +1,48 @@
+from datetime import datetime
+from app.services.fragments import FragmentCache, card_fragment, get_cache
+from app.services.records import GameRecord
+
+UPDATED = datetime(2026, 1, 1)
+
+
+def context(**fields):
+    fields.setdefault('last_updated', UPDATED)
+    return GameRecord(13, 'Catan', description='Trade and build.', **fields).to_context()
+
+
+def test_fragment_is_rendered_once_per_game_version_and_options(app):
+    cache = get_cache()
+    cache.clear()
+    with app.test_request_context():
+        first = card_fragment(context())
+        second = card_fragment(context())
+        card_fragment(context(last_updated=datetime(2026, 2, 1)))
+        without_time = card_fragment(context(), {'include_time': False})
+
+    assert first == second
+    assert 'Catan' in first and 'Trade and build.' in first
+    assert 'info-time' in first and 'info-time' not in without_time
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 3
+
+
+def test_unsaved_games_are_not_cached(app):
+    cache = get_cache()
+    cache.clear()
+    with app.test_request_context():
+        html = card_fragment(context(last_updated=None))
+
+    assert 'Catan' in html
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_fragment_is_evicted():
+    cache = FragmentCache(2)
+    cache.put('a', '<a>')
+    cache.put('b', '<b>')
+    cache.get('a')
+    cache.put('c', '<c>')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == '<a>'
+    assert cache.stats()['entries'] == 2
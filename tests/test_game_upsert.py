@@ -0,0 +1,62 @@
+from unittest.mock import patch
+from app.models import Game
+from app.services.bgg import upsert_games, save_games, process_games_data
+from app.services.records import GameRecord
+
+
+def make_game(bgg_id, name, description=None, weight=2.5):
+    return GameRecord(bgg_id, name, description=description, year_published=2020, min_players=2,
+                      max_players=4, playing_time=60, average_weight=weight, designers=['Designer'])
+
+
+def test_upsert_inserts_then_updates_without_conflict(app):
+    upsert_games([make_game(1, 'Old Name', description='Keep me').to_row()])
+    upsert_games([make_game(1, 'New Name', description=None, weight=3.1).to_row()])
+
+    game = Game.query.filter_by(bgg_id=1).one()
+    assert game.name == 'New Name'
+    assert game.average_weight == 3.1
+    assert game.description == 'Keep me'
+
+
+def test_upsert_chunks_large_batches(app):
+    app.config['GAME_UPSERT_CHUNK_SIZE'] = 7
+    rows = [make_game(i, f'Game {i}').to_row() for i in range(1, 31)]
+
+    assert upsert_games(rows) == 30
+    assert Game.query.count() == 30
+
+
+def test_bad_row_does_not_roll_back_the_batch(app):
+    rows = [make_game(i, f'Game {i}').to_row() for i in range(1, 4)]
+    rows[1]['name'] = None  # violates NOT NULL
+
+    assert upsert_games(rows) == 2
+    assert {g.bgg_id for g in Game.query.all()} == {1, 3}
+
+
+@patch('app.services.bgg.scrape_description', return_value='Scraped')
+def test_process_games_data_saves_new_games(mock_scrape, app):
+    things = [GameRecord(5, 'Game 5', year_published=2019, min_players=1, max_players=4,
+                         playing_time=45, average_weight=2.0, designers=['Jane'])]
+
+    games = process_games_data(things)
+
+    assert games[0].description == 'Scraped'
+    saved = Game.query.filter_by(bgg_id=5).one()
+    assert [p.name for p in saved.designers] == ['Jane']
+    assert saved.year_published == 2019
+
+
+def test_save_games_replaces_credits_in_order(app):
+    game = make_game(1, 'Game 1')
+    game.designers = ('Ann', 'Bob')
+    game.artists = ('Cy',)
+    save_games([game])
+
+    game.designers = ('Bob', 'Dee')
+    save_games([game])
+
+    saved = Game.query.filter_by(bgg_id=1).one()
+    assert [p.name for p in saved.designers] == ['Bob', 'Dee']
+    assert [p.name for p in saved.artists] == ['Cy']
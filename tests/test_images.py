@@ -0,0 +1,78 @@
+import os
+from io import BytesIO
+from unittest.mock import patch, MagicMock
+from PIL import Image
+from app.services.images import ImageCache, target_size, prefetch
+
+COVER_URL = 'https://cf.geekdo-images.com/abc__original/img/pic1.jpg'
+
+
+def png_bytes(size=(2000, 1500), color=(200, 30, 30)):
+    output = BytesIO()
+    Image.new('RGBA', size, color + (255,)).save(output, format='PNG')
+    return output.getvalue()
+
+
+def test_target_size_matches_card_image_band():
+    assert target_size(300) == (750, 578)
+
+
+@patch('app.services.images.requests.get')
+def test_image_is_fetched_once_and_resized(mock_get, tmp_path):
+    mock_get.return_value = MagicMock(status_code=200, content=png_bytes())
+    image_cache = ImageCache(str(tmp_path), dpi=150)
+
+    path = image_cache.get(COVER_URL)
+    assert image_cache.get(COVER_URL) == path
+    assert mock_get.call_count == 1
+
+    with Image.open(path) as img:
+        assert img.format == 'JPEG'
+        assert img.size == target_size(150)
+    assert os.path.getsize(path) < len(png_bytes())
+
+
+@patch('app.services.images.requests.get')
+def test_identical_images_share_one_object(mock_get, tmp_path):
+    mock_get.return_value = MagicMock(status_code=200, content=png_bytes())
+    image_cache = ImageCache(str(tmp_path), dpi=72)
+
+    first = image_cache.get(COVER_URL)
+    second = image_cache.get(COVER_URL.replace('pic1', 'pic1-mirror'))
+
+    assert first == second
+    assert len(os.listdir(tmp_path / 'objects')) == 1
+
+
+@patch('app.services.images.requests.get')
+def test_failed_fetch_is_not_cached(mock_get, tmp_path):
+    mock_get.return_value = MagicMock(status_code=404, content=b'')
+    image_cache = ImageCache(str(tmp_path))
+
+    assert image_cache.get(COVER_URL) is None
+    assert image_cache.lookup(COVER_URL) is None
+
+
+@patch('app.services.images.requests.get')
+def test_prefetch_skips_non_images_and_cached_urls(mock_get, tmp_path):
+    mock_get.return_value = MagicMock(status_code=200, content=png_bytes())
+    settings = {'root': str(tmp_path), 'dpi': 72}
+
+    prefetch([COVER_URL, None, 'https://example.com/page'], settings)
+    prefetch([COVER_URL], settings)
+
+    assert mock_get.call_count == 1
+
+
+@patch('app.services.images.requests.get')
+def test_concurrent_gets_of_one_cover_all_succeed(mock_get, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    mock_get.return_value = MagicMock(status_code=200, content=png_bytes((200, 150)))
+
+    for round_ in range(20):
+        image_cache = ImageCache(str(tmp_path / str(round_)), dpi=72)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            paths = list(pool.map(lambda _: image_cache.get(COVER_URL), range(4)))
+
+        assert len(set(paths)) == 1 and paths[0] is not None
+        assert not [name for name in os.listdir(tmp_path / str(round_) / 'objects') if name.endswith('.tmp')]
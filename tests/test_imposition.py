@@ -0,0 +1,82 @@
+from io import BytesIO
+from unittest.mock import patch
+import pytest
+from pypdf import PdfReader, PdfWriter
+from app.services import imposition
+from app.services.deck import render_deck_pdf
+from app.services.records import GameRecord
+
+
+def render_cards(html):
+    # One blank bleed-sized PDF page per card in the cards HTML
+    writer = PdfWriter()
+    for _ in range(html.count('class="bleed-page"')):
+        writer.add_blank_page(width=(63.5 + 3) * imposition.MM, height=(88.9 + 3) * imposition.MM)
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_sheet_layout_fits_cards_centred():
+    a4 = imposition.sheet_layout('A4', 1.5, 5, marks=True)
+    letter = imposition.sheet_layout('letter', 1.5, 5, marks=True)
+
+    assert (a4.cols, a4.rows) == (3, 3)
+    assert (letter.cols, letter.rows) == (3, 2)
+    assert round(a4.width) == 595 and round(a4.height) == 842
+    left, bottom = a4.slots[-3]
+    right = left + 3 * (63.5 + 3) * imposition.MM
+    assert abs(left - (a4.width - right)) < 0.01
+    assert a4.slots[0][1] > bottom  # first row is at the top of the sheet
+
+
+def test_sheet_layout_rejects_sheets_too_small():
+    with pytest.raises(ValueError):
+        imposition.sheet_layout('A4', 1.5, 100)
+
+
+def test_sheet_layout_rejects_margins_too_thin_for_crop_marks():
+    # 3 rows of bleed-boxed cards leave Letter under 2mm top and bottom
+    assert imposition.sheet_layout('LETTER', 1.5, 1.5).rows == 3
+    with pytest.raises(ValueError):
+        imposition.sheet_layout('LETTER', 1.5, 1.5, marks=True)
+
+
+def test_card_artwork_runs_into_the_bleed(app):
+    from flask import render_template
+    html = render_template('layouts/cards.html', games=[GameRecord(1, 'Catan').to_context()], options={},
+                           page_width=66.5, page_height=91.9, trim_height=88.9, bleed=1.5)
+
+    assert '.bleed-page .card-container {\n      width: 66.5mm;\n      height: 91.9mm;' in html
+    assert 'class="card-image' in html and 'class="card-stats' in html
+
+
+@patch('app.services.pdf.generate_pdf', side_effect=render_cards)
+def test_imposition_renders_each_card_once(mock_generate, app):
+    app.config.update(PDF_BACKEND='imposition', PDF_RENDER_PROCESSES=1)
+    games = [GameRecord(i % 8, f'Game {i % 8}', description='A game.') for i in range(12)]
+
+    pdf = PdfReader(BytesIO(render_deck_pdf(games, {})))
+
+    assert len(pdf.pages) == 2
+    assert round(float(pdf.pages[0].mediabox.width)) == 595
+    rendered = sum(call.args[0].count('class="bleed-page"') for call in mock_generate.call_args_list)
+    assert rendered == 8  # repeats of a game reuse its card
+    assert b'0.25 w' in pdf.pages[0].get_contents().get_data()  # crop marks
+
+    mock_generate.reset_mock()
+    render_deck_pdf(games[:5], {})
+    mock_generate.assert_not_called()
+
+
+@patch('app.services.pdf.generate_pdf', side_effect=render_cards)
+def test_imposition_settings_change_the_card_keys(mock_generate, app):
+    app.config.update(PDF_BACKEND='imposition', PDF_RENDER_PROCESSES=1)
+    games = [GameRecord(1, 'Catan', description='Trade and build.')]
+
+    render_deck_pdf(games, {})
+    app.config['PDF_SHEET_SIZE'] = 'LETTER'
+    pdf = PdfReader(BytesIO(render_deck_pdf(games, {})))
+
+    assert mock_generate.call_count == 2
+    assert round(float(pdf.pages[0].mediabox.width)) == 612
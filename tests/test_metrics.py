@@ -0,0 +1,34 @@
+from unittest.mock import patch
+from app.services import metrics
+
+
+def test_spans_and_counters_are_exported(client):
+    metrics.reset()
+    with metrics.span('bgg.collection'):
+        pass
+    metrics.cache_result('description', True, 3)
+    metrics.cache_result('description', False)
+
+    body = client.get('/api/metrics').get_data(as_text=True)
+
+    assert 'bggdeck_span_seconds_count{span="bgg.collection"} 1' in body
+    assert 'bggdeck_cache_lookups_total{namespace="description",result="hit"} 3' in body
+    assert 'bggdeck_cache_lookups_total{namespace="description",result="miss"} 1' in body
+    assert 'bggdeck_outbound_workers' in body
+
+
+def test_server_timing_header_lists_request_spans(client):
+    response = client.get('/')
+
+    assert 'render-template;dur=' in response.headers['Server-Timing']
+
+
+def test_disabled_instrumentation_is_a_no_op(app):
+    metrics.reset()
+    with patch.object(metrics, 'ENABLED', False):
+        with metrics.span('db.query'):
+            pass
+        metrics.count('cache_lookups', namespace='x', result='hit')
+
+    assert 'db.query' not in metrics.render_prometheus()
+    assert 'cache_lookups' not in metrics.render_prometheus()
@@ -1,26 +1,14 @@
 import pytest
-from app import create_app, db
 from app.models import Game
 from unittest.mock import patch
-
-@pytest.fixture
-def client():
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    
-    with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-            yield client
+from app.services.bgg_xml import CollectionItem
 
 def test_pagination(client):
     # Mock fetch_collection to return 50 items
-    items = [{'@objectid': str(i), 'name': {'@value': f'Game {i}'}} for i in range(1, 51)]
-    mock_data = {'items': {'item': items}}
+    mock_data = [CollectionItem(i, f'Game {i}', None, None, None, None) for i in range(1, 51)]
     
-    with patch('app.routes.main.fetch_collection', return_value=mock_data) as mock_fetch:
-        with patch('app.routes.main.fetch_things', return_value={'items': {'item': []}}): # Mock details fetch
+    with patch('app.services.bgg.fetch_collection', return_value=mock_data) as mock_fetch:
+        with patch('app.routes.main.fetch_things', return_value=[]): # Mock details fetch
             # Test Page 1
             response = client.post('/collection', data={'username': 'testuser'})
             assert response.status_code == 200
@@ -1,36 +1,25 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from app import create_app
+from app.services.bgg_xml import CollectionItem
 
-@pytest.fixture
-def client():
-    app = create_app()
-    app.config['TESTING'] = True
-    with app.test_client() as client:
-        yield client
-
-@patch('app.routes.main.fetch_collection')
+@patch('app.services.bgg.fetch_collection')
 @patch('app.routes.main.fetch_things')
 @patch('app.services.pdf.generate_pdf')
 def test_download_all(mock_generate_pdf, mock_fetch_things, mock_fetch_collection, client):
     # Setup mocks
-    mock_fetch_collection.return_value = {
-        'items': {
-            'item': [
-                {'@objectid': '1'},
-                {'@objectid': '2'},
-                {'@objectid': '3'}
-            ]
-        }
-    }
-    mock_fetch_things.return_value = {'items': {'item': []}}
+    mock_fetch_collection.return_value = [
+        CollectionItem(1, None, None, None, None, None),
+        CollectionItem(2, None, None, None, None, None),
+        CollectionItem(3, None, None, None, None, None)
+    ]
+    mock_fetch_things.return_value = []
     mock_generate_pdf.return_value = b'%PDF-1.4...'
 
     # Test download_all=true
     response = client.post('/pdf', data={
         'username': 'testuser',
         'download_all': 'true'
-    })
+    }, follow_redirects=True)
 
     assert response.status_code == 200
     assert response.headers['Content-Type'] == 'application/pdf'
@@ -41,12 +30,12 @@ def test_download_all(mock_generate_pdf, mock_fetch_things, mock_fetch_collectio
     # Verify fetch_things was called with all IDs
     mock_fetch_things.assert_called_with(['1', '2', '3'])
 
-@patch('app.routes.main.fetch_collection')
+@patch('app.services.bgg.fetch_collection')
 @patch('app.routes.main.fetch_things')
 @patch('app.services.pdf.generate_pdf')
 def test_download_selected(mock_generate_pdf, mock_fetch_things, mock_fetch_collection, client):
     # Setup mocks
-    mock_fetch_things.return_value = {'items': {'item': []}}
+    mock_fetch_things.return_value = []
     mock_generate_pdf.return_value = b'%PDF-1.4...'
 
     # Test download_all=false with selected_ids
@@ -54,7 +43,7 @@ def test_download_selected(mock_generate_pdf, mock_fetch_things, mock_fetch_coll
         'username': 'testuser',
         'download_all': 'false',
         'selected_ids': '["10", "20"]'
-    })
+    }, follow_redirects=True)
 
     assert response.status_code == 200
     
@@ -63,3 +52,69 @@ def test_download_selected(mock_generate_pdf, mock_fetch_things, mock_fetch_coll
     
     # Verify fetch_things was called with selected IDs
     mock_fetch_things.assert_called_with(['10', '20'])
+
+
+@patch('app.routes.main.fetch_things')
+@patch('app.services.pdf.generate_pdf')
+def test_repeat_download_is_served_from_store(mock_generate_pdf, mock_fetch_things, client):
+    from app.services.records import GameRecord
+    mock_fetch_things.return_value = [GameRecord(10, 'Catan', description='Trade and build.')]
+    mock_generate_pdf.return_value = b'%PDF-1.4 catan'
+    form = {'username': 'testuser', 'selected_ids': '["10"]'}
+
+    first = client.post('/pdf', data=form)
+    second = client.post('/pdf', data=form)
+
+    assert first.status_code == 303
+    assert second.headers['Location'] == first.headers['Location']
+    assert mock_generate_pdf.call_count == 1
+
+    download = client.get(first.headers['Location'])
+    assert download.data == b'%PDF-1.4 catan'
+    assert download.headers['Content-Length'] == str(len(b'%PDF-1.4 catan'))
+    etag = download.headers['ETag']
+
+    assert client.get(first.headers['Location'], headers={'If-None-Match': etag}).status_code == 304
+    partial = client.get(first.headers['Location'], headers={'Range': 'bytes=9-'})
+    assert partial.status_code == 206
+    assert partial.data == b'catan'
+
+
+def test_unknown_pdf_key_is_404(client):
+    assert client.get('/pdf/' + '0' * 64).status_code == 404
+    assert client.get('/pdf/not-a-key').status_code == 404
+
+
+@patch('app.routes.main.fetch_things')
+@patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4 deck')
+def test_least_recently_used_decks_are_evicted(mock_generate_pdf, mock_fetch_things, app, client):
+    import os
+    from app.services.records import GameRecord
+    app.config['PDF_DECK_CACHE_MAX_FILES'] = 2
+    locations = []
+    for i, gid in enumerate([10, 20, 30]):
+        mock_fetch_things.return_value = [GameRecord(gid, f'Game {gid}', description='A game.')]
+        location = client.post('/pdf', data={'username': 'testuser', 'selected_ids': f'["{gid}"]'}).headers['Location']
+        locations.append(location)
+        path = os.path.join(app.config['PDF_CACHE_DIR'], location.split('/')[-1].split('?')[0] + '.pdf')
+        os.utime(path, (1000 + i, 1000 + i))
+        if i == 1:
+            assert client.get(locations[0]).status_code == 200  # downloading the first deck marks it as used
+
+    assert client.get(locations[0]).status_code == 200
+    assert client.get(locations[1]).status_code == 404
+    assert client.get(locations[2]).status_code == 200
+
+
+@patch('app.routes.main.fetch_things')
+@patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4 deck')
+def test_page_html_is_rendered_once_per_download(mock_generate_pdf, mock_fetch_things, app, client):
+    from app.services import deck
+    from app.services.records import GameRecord
+    mock_fetch_things.return_value = [GameRecord(10, 'Catan', description='Trade and build.')]
+
+    with patch('app.services.deck.render_deck_html', wraps=deck.render_deck_html) as mock_html:
+        client.post('/pdf', data={'username': 'testuser', 'selected_ids': '["10"]'})
+
+    # One pass for the page key, one for the render of the missing page
+    assert mock_html.call_count == 2
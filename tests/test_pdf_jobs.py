@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import patch
+from app.models import PdfJob
+from app.services.bgg import BGGQueued
+from app.services.records import GameRecord
+
+
+def fake_fetch_things(ids):
+    return [GameRecord(int(i), f'Game {i}', description='A game.') for i in ids]
+
+
+@patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4 job')
+@patch('app.services.bgg.fetch_things', side_effect=fake_fetch_things)
+def test_job_builds_and_downloads_pdf(mock_fetch_things, mock_render, client):
+    response = client.post('/api/pdf/jobs', data={
+        'username': 'testuser',
+        'selected_ids': '["10", "20"]',
+        'include_players': 'on'
+    })
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job['status'] == 'done'
+
+    status = client.get(job['status_url']).get_json()
+    assert status['progress'] == 100
+
+    download = client.get(status['download_url'])
+    assert download.status_code == 200
+    assert download.data == b'%PDF-1.4 job'
+    mock_fetch_things.assert_called_once_with(['10', '20'])
+
+
+@patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4 job')
+@patch('app.services.bgg.fetch_things', side_effect=fake_fetch_things)
+def test_identical_request_is_served_from_store(mock_fetch_things, mock_render, client):
+    client.post('/api/pdf/jobs', data={'username': 'testuser', 'selected_ids': '["10", "20"]'})
+    second = client.post('/api/pdf/jobs', data={'username': 'other', 'selected_ids': '["10", "20"]'}).get_json()
+
+    assert second['status'] == 'done'
+    assert second['stage'] == 'cached'
+    assert mock_render.call_count == 1
+
+    # The deck is keyed by its content, so a reordered selection is a different deck
+    reordered = client.post('/api/pdf/jobs', data={'username': 'other', 'selected_ids': '["20", "10"]'}).get_json()
+    assert reordered['stage'] == 'done'
+    assert mock_render.call_count == 2
+
+
+@patch('app.services.bgg.fetch_collection', side_effect=BGGQueued('queued'))
+def test_job_failure_is_reported(mock_fetch_collection, client):
+    job = client.post('/api/pdf/jobs', data={'username': 'queued', 'download_all': 'true'}).get_json()
+
+    assert job['status'] == 'failed'
+    assert 'still processing' in job['error']
+
+
+def test_unknown_job_returns_404(client):
+    assert client.get('/api/pdf/jobs/missing').status_code == 404
+
+
+def test_cancelled_job_stops_before_next_stage(client, app):
+    from app.services import jobs
+
+    app.config['PDF_JOBS_EAGER'] = False
+    with patch.object(jobs, '_get_executor') as mock_executor:
+        job = client.post('/api/pdf/jobs', data={'username': 'testuser', 'selected_ids': '["10"]'}).get_json()
+    cancelled = client.post(job['cancel_url']).get_json()
+    assert cancelled['status'] == 'cancelled'
+
+    # The worker picks the job up after the page has gone
+    with patch('app.services.deck.load_games') as mock_load:
+        _, job_id = mock_executor.return_value.submit.call_args.args[1:]
+        jobs._run(app, job_id)
+
+    mock_load.assert_not_called()
+    assert client.get(job['status_url']).get_json()['status'] == 'cancelled'
@@ -0,0 +1,82 @@
+from io import BytesIO
+from unittest.mock import patch
+from pypdf import PdfReader, PdfWriter
+from app.services.deck import render_deck_pdf
+from app.services.records import GameRecord
+
+
+def blank_pdf(pages, width):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=width, height=100)
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def test_merge_pdfs_keeps_shard_order():
+    from app.services.pdf import merge_pdfs
+
+    merged = PdfReader(BytesIO(merge_pdfs([blank_pdf(2, 100), blank_pdf(1, 200)])))
+
+    assert [float(page.mediabox.width) for page in merged.pages] == [100, 100, 200]
+
+
+@patch('app.services.pdf.generate_pdf_sharded', return_value=b'%PDF-1.4 merged')
+def test_large_decks_render_in_whole_page_shards(mock_sharded, app):
+    app.config['PDF_PAGE_CACHE'] = False
+    app.config['PDF_SHARD_PAGES'] = 2
+    games = [GameRecord(i, f'Game {i}') for i in range(40)]
+
+    assert render_deck_pdf(games, {}) == b'%PDF-1.4 merged'
+
+    shards = mock_sharded.call_args.args[0]
+    assert len(shards) == 3  # 18 + 18 + 4 cards
+    assert shards[0].count('class="card-container') == 18
+
+
+@patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4 single')
+@patch('app.services.pdf.generate_pdf_sharded')
+def test_small_decks_render_in_one_pass(mock_sharded, mock_generate, app):
+    app.config['PDF_PAGE_CACHE'] = False
+    games = [GameRecord(i, f'Game {i}') for i in range(5)]
+
+    assert render_deck_pdf(games, {}) == b'%PDF-1.4 single'
+    mock_sharded.assert_not_called()
+
+
+def render_sheets(html):
+    # One blank PDF page per sheet in the deck HTML
+    return blank_pdf(html.count('content-start pdf-page'), 100)
+
+
+@patch('app.services.pdf.generate_pdf', side_effect=render_sheets)
+def test_only_changed_pages_are_rendered(mock_generate, app):
+    app.config['PDF_RENDER_PROCESSES'] = 1
+    games = [GameRecord(i, f'Game {i}') for i in range(20)]
+
+    first = PdfReader(BytesIO(render_deck_pdf(games, {})))
+    assert len(first.pages) == 3
+    assert mock_generate.call_count == 1  # one shard of 3 pages, split and stored per page
+
+    mock_generate.reset_mock()
+    assert len(PdfReader(BytesIO(render_deck_pdf(games, {}))).pages) == 3
+    mock_generate.assert_not_called()
+
+    games[10] = GameRecord(10, 'Renamed')
+    render_deck_pdf(games, {})
+    assert mock_generate.call_count == 1
+    changed_html = mock_generate.call_args.args[0]
+    assert 'Renamed' in changed_html and changed_html.count('class="card-container') == 9
+
+
+@patch('app.services.pdf.generate_pdf', side_effect=render_sheets)
+def test_option_changes_rerender_every_page(mock_generate, app):
+    app.config['PDF_RENDER_PROCESSES'] = 1
+    games = [GameRecord(i, f'Game {i}') for i in range(10)]
+
+    render_deck_pdf(games, {'include_weight': True})
+    mock_generate.reset_mock()
+    render_deck_pdf(games, {'include_weight': False})
+
+    assert mock_generate.call_args.args[0].count('class="card-container') == 10
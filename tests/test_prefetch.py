@@ -0,0 +1,67 @@
+from unittest.mock import patch
+from app.models import Game
+from app.services import prefetch
+from app.services.bgg_xml import CollectionItem
+from app.services.collection import apply_items
+from app.services.records import GameRecord
+
+
+def add_collection(username, count):
+    apply_items(username, [CollectionItem(i, f'Game {i:02d}', None, None, None, None)
+                           for i in range(1, count + 1)], full=True)
+
+
+def fake_fetch_things(ids):
+    return [GameRecord(int(i), f'Game {int(i):02d}', description='Cached.') for i in ids]
+
+
+def test_neighbour_pages_nearest_first():
+    assert prefetch.neighbour_pages(3, 2, 4) == [4, 2, 1]
+    assert prefetch.neighbour_pages(1, 1, 1) == []
+
+
+@patch('app.services.bgg.fetch_things', side_effect=fake_fetch_things)
+def test_warm_fetches_only_missing_neighbours(mock_fetch, app):
+    app.config['PREFETCH_PAGES'] = 1
+    add_collection('alice', 30)
+
+    fetched = prefetch.warm('alice', page=2, per_page=10)
+
+    requested = [i for call in mock_fetch.call_args_list for i in call.args[0]]
+    assert requested == [str(i) for i in range(21, 31)] + [str(i) for i in range(1, 11)]
+    assert fetched == 20
+    assert Game.query.count() == 20
+
+    # Already stored: a second pass is DB-only
+    mock_fetch.reset_mock()
+    assert prefetch.warm('alice', page=2, per_page=10) == 0
+    mock_fetch.assert_not_called()
+
+
+@patch('app.services.bgg.fetch_things', side_effect=fake_fetch_things)
+def test_warmup_fills_the_whole_collection_in_batches(mock_fetch, app):
+    app.config.update(PREFETCH_PAGES=0, PREFETCH_WARMUP=True, PREFETCH_BATCH_SIZE=8)
+    add_collection('alice', 20)
+
+    assert prefetch.warm('alice', page=1, per_page=10) == 20
+    assert [len(call.args[0]) for call in mock_fetch.call_args_list] == [8, 8, 4]
+    assert Game.query.count() == 20
+
+
+def test_schedule_is_off_in_tests(app):
+    with app.test_request_context():
+        assert prefetch.schedule('alice', 1, 24) is False
+
+
+@patch('app.services.bgg.fetch_things', side_effect=fake_fetch_things)
+def test_prefetched_page_is_served_from_the_db(mock_fetch, app, client):
+    app.config['PREFETCH_PAGES'] = 1
+    add_collection('alice', 30)
+    prefetch.warm('alice', page=1, per_page=24)  # stores page 2's games
+
+    with patch('app.routes.main.fetch_things') as mock_route_fetch:
+        response = client.get('/collection?username=alice&page=2')
+
+    assert response.status_code == 200
+    mock_route_fetch.assert_not_called()
+    assert b'Game 25' in response.data and b'Game 30' in response.data
@@ -0,0 +1,44 @@
+from unittest.mock import patch
+from app.services.profiler import format_report, profile_deck
+from app.services.records import GameRecord
+
+GAMES = [GameRecord(1, 'Catan', description='Trade and build.'), GameRecord(2, 'Carcassonne', description='Tiles.')]
+
+
+@patch('app.services.pdf.layout_pdf', return_value=(0.02, 0.01, b'%PDF-1.4 deck'))
+def test_report_covers_deck_and_cards(mock_layout, app):
+    with app.test_request_context():
+        report = profile_deck(GAMES, {}, per_card=True)
+
+    assert report['cards'] == 2
+    assert report['pdf_bytes'] == len(b'%PDF-1.4 deck')
+    assert report['layout_ms'] == 20.0
+    assert report['peak_memory'] > 0
+    assert [card['description_chars'] for card in report['card_details']] == [16, 6]
+    assert all(card['pdf_bytes'] == len(b'%PDF-1.4 deck') for card in report['card_details'])
+    assert mock_layout.call_count == 3  # the deck, then each card alone
+    assert 'Catan' in format_report(report)
+
+
+@patch('app.services.deck.load_games', return_value=GAMES)
+@patch('app.services.pdf.layout_pdf', return_value=(0.02, 0.01, b'%PDF-1.4 deck'))
+def test_profile_deck_command(mock_layout, mock_load, runner):
+    result = runner.invoke(args=['profile-deck', 'alice', '--ids', '1,2', '--no-per-card'])
+
+    assert result.exit_code == 0
+    mock_load.assert_called_with(['1', '2'])
+    assert 'Peak traced memory' in result.output
+    assert mock_layout.call_count == 1
+
+
+@patch('app.routes.main.fetch_things', return_value=GAMES)
+@patch('app.services.pdf.layout_pdf', return_value=(0.02, 0.01, b'%PDF-1.4 deck'))
+def test_profile_flag_needs_profiling_enabled(mock_layout, mock_fetch, app, client):
+    form = {'username': 'alice', 'selected_ids': '["1", "2"]'}
+    app.config['PDF_PROFILING_ENABLED'] = True
+    response = client.post('/pdf?profile=1', data=form)
+    assert response.get_json()['cards'] == 2
+
+    app.config['PDF_PROFILING_ENABLED'] = False
+    with patch('app.services.pdf.generate_pdf', return_value=b'%PDF-1.4'):
+        assert client.post('/pdf?profile=1', data=form).status_code == 303
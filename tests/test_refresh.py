@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db
+from app.models import Game
+from app.services.records import GameRecord
+from app.services.refresh import stale_game_ids, refresh_stale_games
+
+
+def add_game(bgg_id, age_hours, description='Stored'):
+    db.session.add(Game(bgg_id=bgg_id, name=f'Game {bgg_id}', description=description,
+                        average_weight=1.0,
+                        last_updated=datetime.utcnow() - timedelta(hours=age_hours)))
+    db.session.commit()
+
+
+def thing(bgg_id, weight):
+    return GameRecord(bgg_id, f'Game {bgg_id} v2', average_weight=weight)
+
+
+def test_stale_games_are_ordered_stalest_first(app):
+    add_game(1, age_hours=200)
+    add_game(2, age_hours=500)
+    add_game(3, age_hours=1)
+
+    assert stale_game_ids(timedelta(hours=168), limit=10) == [2, 1]
+    assert stale_game_ids(timedelta(hours=168), limit=1) == [2]
+
+
+@patch('app.services.bgg.fetch_things_checked')
+def test_refresh_updates_rows_and_keeps_descriptions(mock_fetch_things, app):
+    add_game(1, age_hours=200)
+    add_game(2, age_hours=300)
+    mock_fetch_things.return_value = ([thing(1, 3.5)], [])
+
+    assert refresh_stale_games(max_age=timedelta(hours=168)) == 1
+
+    refreshed = Game.query.filter_by(bgg_id=1).one()
+    assert refreshed.name == 'Game 1 v2'
+    assert refreshed.average_weight == 3.5
+    assert refreshed.description == 'Stored'
+    # Not returned by BGG, but stamped so it leaves the head of the queue
+    assert stale_game_ids(timedelta(hours=168), limit=10) == []
+
+
+@patch('app.services.bgg.get_client')
+def test_refresh_leaves_games_stale_when_bgg_is_down(mock_client, app):
+    mock_client.return_value.get_with_retry.side_effect = ConnectionError('BGG is down')
+    mock_client.return_value.map = lambda fn, items: map(fn, items)
+    add_game(1, age_hours=200)
+    add_game(2, age_hours=300)
+    add_game(3, age_hours=400)
+
+    assert refresh_stale_games(max_age=timedelta(hours=168)) == 0
+
+    assert stale_game_ids(timedelta(hours=168), limit=10) == [3, 2, 1]
+
+
+@patch('app.services.bgg.fetch_things_checked', return_value=([], []))
+def test_refresh_games_cli(mock_fetch_things, runner):
+    result = runner.invoke(args=['refresh-games', '--max-age-hours', '1'])
+
+    assert result.exit_code == 0
+    assert 'Refreshed 0 games.' in result.output
@@ -1,5 +1,8 @@
 import pytest
 from unittest.mock import patch, MagicMock
+from app.services.bgg import BGGQueued
+from app.services.bgg_xml import CollectionItem
+from app.services.records import GameRecord
 
 def test_index(client):
     """Test that the index page loads."""
@@ -7,56 +10,30 @@ def test_index(client):
     assert response.status_code == 200
     assert b"La Matatena" in response.data
 
-@patch('app.routes.main.fetch_collection')
+@patch('app.services.bgg.fetch_collection')
 @patch('app.routes.main.fetch_things')
 def test_collection_success(mock_fetch_things, mock_fetch_collection, client):
     """Test successful collection fetching."""
     # Mock BGG collection response
-    mock_fetch_collection.return_value = {
-        'items': {
-            'item': [
-                {'@objectid': '1', 'name': {'@value': 'Game 1'}},
-                {'@objectid': '2', 'name': {'@value': 'Game 2'}}
-            ]
-        }
-    }
+    mock_fetch_collection.return_value = [
+        CollectionItem(1, 'Game 1', None, None, None, None),
+        CollectionItem(2, 'Game 2', None, None, None, None)
+    ]
     
     # Mock BGG things response
-    mock_fetch_things.return_value = {
-        'items': {
-            'item': [
-                {
-                    '@id': '1',
-                    'name': [{'@value': 'Game 1'}],
-                    'image': 'http://example.com/1.jpg',
-                    'yearpublished': {'@value': '2020'},
-                    'minplayers': {'@value': '2'},
-                    'maxplayers': {'@value': '4'},
-                    'playingtime': {'@value': '60'},
-                    'statistics': {'ratings': {'averageweight': {'@value': '2.5'}}},
-                    'link': []
-                },
-                {
-                    '@id': '2',
-                    'name': [{'@value': 'Game 2'}],
-                    'image': 'http://example.com/2.jpg',
-                    'yearpublished': {'@value': '2021'},
-                    'minplayers': {'@value': '1'},
-                    'maxplayers': {'@value': '5'},
-                    'playingtime': {'@value': '30'},
-                    'statistics': {'ratings': {'averageweight': {'@value': '1.5'}}},
-                    'link': []
-                }
-            ]
-        }
-    }
+    mock_fetch_things.return_value = [
+        GameRecord(1, 'Game 1', image='http://example.com/1.jpg', year_published=2020,
+                   min_players=2, max_players=4, playing_time=60, average_weight=2.5),
+        GameRecord(2, 'Game 2', image='http://example.com/2.jpg', year_published=2021,
+                   min_players=1, max_players=5, playing_time=30, average_weight=1.5)
+    ]
 
     response = client.post('/collection', data={'username': 'testuser'})
     assert response.status_code == 200
     assert b"Game 1" in response.data
     assert b"Game 2" in response.data
 
-@patch('app.routes.main.fetch_collection')
+@patch('app.services.bgg.fetch_collection')
 def test_collection_not_found(mock_fetch_collection, client):
     """Test collection not found."""
     mock_fetch_collection.return_value = None
@@ -64,10 +41,10 @@ def test_collection_not_found(mock_fetch_collection, client):
     assert response.status_code == 200
     assert b"No games found" in response.data
 
-@patch('app.routes.main.fetch_collection')
+@patch('app.services.bgg.fetch_collection')
 def test_collection_processing(mock_fetch_collection, client):
     """Test BGG processing (202)."""
-    mock_fetch_collection.return_value = {'status': 202}
+    mock_fetch_collection.side_effect = BGGQueued('processing')
     response = client.post('/collection', data={'username': 'processing'})
     assert response.status_code == 200
     assert b"Processing Collection" in response.data
@@ -0,0 +1,123 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+from unittest.mock import patch, MagicMock
+from app import db
+from app.models import CacheEntry, FetchLease
+from app.services import cache
+from app.services.bgg import THING_CACHE_NAMESPACE, fetch_collection, fetch_things
+from app.services.records import GameRecord
+
+COLLECTION_XML = b"""<?xml version="1.0" encoding="utf-8"?>
+<items totalitems="1"><item objectid="13" subtype="boardgame"><name sortindex="1">Catan</name></item></items>"""
+
+
+def thing_xml(ids):
+    items = ''.join(f'<item type="boardgame" id="{i}"><name type="primary" value="Game {i}"/></item>'
+                    for i in ids)
+    return f'<items>{items}</items>'.encode()
+
+
+class SlowClient:
+    """Stands in for BGGClient: every request takes a moment and is recorded."""
+
+    def __init__(self):
+        self.requested = []
+        self.times = []
+        self.lock = threading.Lock()
+
+    def get_with_retry(self, url, params=None, **kwargs):
+        with self.lock:
+            self.requested.append(params)
+            self.times.append(time.monotonic())
+        time.sleep(0.1)
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {}
+        if 'id' in params:
+            response.content = thing_xml(params['id'].split(','))
+        else:
+            response.raw = BytesIO(COLLECTION_XML)
+        return response
+
+    def map(self, fn, items):
+        return [fn(item) for item in items]
+
+
+def run_concurrently(*calls):
+    results = [None] * len(calls)
+
+    def run(i, call):
+        results[i] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_overlapping_thing_fetches_share_game_ids():
+    client = SlowClient()
+    with patch('app.services.bgg.get_client', return_value=client):
+        first, second = run_concurrently(lambda: fetch_things([1, 2]), lambda: fetch_things([2, 3]))
+
+    requested = [bgg_id for params in client.requested for bgg_id in params['id'].split(',')]
+    assert sorted(requested) == ['1', '2', '3']
+    assert [game.bgg_id for game in first] == [1, 2]
+    assert [game.bgg_id for game in second] == [2, 3]
+
+
+def test_concurrent_collection_fetches_make_one_request():
+    client = SlowClient()
+    with patch('app.services.bgg.get_client', return_value=client):
+        results = run_concurrently(*[lambda: fetch_collection('Alice')] * 3)
+
+    assert len(client.requested) == 1
+    assert all(items[0].bgg_id == 13 for items in results)
+
+
+def test_waits_for_lease_held_by_another_process(app):
+    app.config['FETCH_LEASE_WAIT'] = 5
+    db.session.add(FetchLease(key='thing:7', owner='other', waiters=0,
+                              expires_at=datetime.utcnow() + timedelta(seconds=0.3)))
+    db.session.commit()
+    cache.store(THING_CACHE_NAMESPACE, 'thing:7', GameRecord(7, 'Shared').to_fields(), ttl=60)
+
+    with patch('app.services.bgg.get_client') as mock_client:
+        games = fetch_things([7])
+
+    assert not mock_client.called
+    assert games == [GameRecord(7, 'Shared')]
+    assert db.session.get(FetchLease, 'thing:7').waiters == 1
+
+
+def test_lease_holder_publishes_results_for_waiters(app):
+    client = SlowClient()
+    with patch('app.services.bgg.get_client', return_value=client), \
+         patch('app.services.leases.watched', return_value={'thing:1'}):
+        fetch_things([1, 2])
+
+    entry = CacheEntry.query.filter_by(namespace=THING_CACHE_NAMESPACE).one()
+    assert entry.key == 'thing:1'
+    assert GameRecord(*cache.load(entry)).name == 'Game 1'
+    assert FetchLease.query.count() == 0
+
+
+def test_leased_keys_are_fetched_before_waiting_on_foreign_leases(app):
+    app.config['FETCH_LEASE_WAIT'] = 5
+    db.session.add(FetchLease(key='thing:2', owner='other', waiters=0,
+                              expires_at=datetime.utcnow() + timedelta(seconds=1)))
+    db.session.commit()
+    client = SlowClient()
+    started = time.monotonic()
+
+    with patch('app.services.bgg.get_client', return_value=client):
+        games = fetch_things([1, 2])
+
+    assert [params['id'] for params in client.requested] == ['1', '2']
+    assert client.times[0] - started < 0.5  # not held up by the foreign lease on 2
+    assert [game.bgg_id for game in games] == [1, 2]
@@ -0,0 +1,52 @@
+import os
+from unittest.mock import patch
+from app.services import styles
+
+TAILWIND_CSS = r"""
+*, ::before { box-sizing: border-box; }
+.card-container { width: 63.5mm; }
+.h-\[55\%\] { height: 55%; }
+.unused-utility { color: red; }
+.bg-black\/80, .another-unused { opacity: .8; }
+@media (min-width: 640px) { .sm\:grid { display: grid; } .flex { display: flex; } }
+"""
+
+
+def test_prune_css_keeps_only_used_classes():
+    pruned = styles.prune_css(TAILWIND_CSS, {'card-container', 'h-[55%]', 'bg-black/80', 'flex'})
+
+    assert 'box-sizing' in pruned
+    assert '63.5mm' in pruned
+    assert 'height:55%' in pruned.replace(' ', '')
+    assert 'unused-utility' not in pruned
+    assert 'another-unused' not in pruned
+    assert 'sm\\:grid' not in pruned
+    assert '@media' in pruned and 'display: flex' in pruned
+
+
+def test_template_classes_reads_card_template(app):
+    classes = styles.template_classes()
+
+    assert 'card-container' in classes
+    assert 'h-[55%]' in classes
+    assert not any('{' in c for c in classes)
+
+
+def test_deck_css_is_cached_until_file_changes(app, tmp_path):
+    css_path = tmp_path / 'output.css'
+    css_path.write_text(TAILWIND_CSS)
+
+    with patch('app.services.styles.prune_css', wraps=styles.prune_css) as mock_prune:
+        first = styles.deck_css(str(css_path))
+        second = styles.deck_css(str(css_path))
+        assert first is second
+        assert mock_prune.call_count == 1
+
+        css_path.write_text(TAILWIND_CSS + '.card-container { height: 88.9mm; }')
+        os.utime(css_path, ns=(0, os.stat(css_path).st_mtime_ns + 1_000_000))
+        assert '88.9mm' in styles.deck_css(str(css_path))
+        assert mock_prune.call_count == 2
+
+
+def test_missing_stylesheet_returns_none(app, tmp_path):
+    assert styles.deck_css(str(tmp_path / 'missing.css')) is None
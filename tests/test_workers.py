@@ -0,0 +1,78 @@
+import threading
+import time
+import pytest
+from app.services.workers import SharedExecutor, Cancelled, cancel_scope
+
+
+def test_per_host_limit_caps_concurrency():
+    executor = SharedExecutor(max_workers=8, per_host=2)
+    active, peak = [], []
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            active.append(n)
+            peak.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(n)
+        return n
+
+    assert executor.map(work, range(8), host='example.com') == list(range(8))
+    assert max(peak) == 2
+    assert executor.stats() == {'workers': 8, 'queued': 0, 'active': 0, 'hosts': {'example.com': 0}}
+
+
+def test_queue_depth_is_reported():
+    executor = SharedExecutor(max_workers=1)
+    release = threading.Event()
+    seen = []
+
+    def work(n):
+        release.wait(1)
+        return n
+
+    thread = threading.Thread(target=lambda: seen.extend(executor.map(work, range(3))))
+    thread.start()
+    time.sleep(0.05)
+    stats = executor.stats()
+    release.set()
+    thread.join()
+
+    assert (stats['active'], stats['queued']) == (1, 2)
+    assert seen == [0, 1, 2]
+
+
+def test_cancel_scope_drops_queued_work():
+    executor = SharedExecutor(max_workers=1)
+    cancel = threading.Event()
+    ran = []
+
+    def work(n):
+        ran.append(n)
+        cancel.set()
+        time.sleep(0.05)
+        return n
+
+    with cancel_scope(cancel), pytest.raises(Cancelled):
+        executor.map(work, range(5))
+
+    time.sleep(0.1)
+    assert ran == [0]
+    assert executor.stats()['queued'] == 0
+
+
+def test_busy_host_does_not_hold_threads_other_hosts_need():
+    executor = SharedExecutor(max_workers=2, per_host=1)
+    slow = threading.Thread(target=lambda: executor.map(lambda n: time.sleep(0.2), range(4), host='slow.example'))
+    slow.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    assert executor.map(lambda n: n, range(2), host='fast.example') == [0, 1]
+    elapsed = time.monotonic() - start
+    stats = executor.stats()
+    slow.join()
+
+    assert elapsed < 0.15
+    assert stats['hosts']['slow.example'] == 1